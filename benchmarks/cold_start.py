@@ -0,0 +1,85 @@
+"""
+Cold-start import benchmark for the Lambda handlers.
+
+Every sample imports one handler's lambda_function in a fresh interpreter
+(as a new Lambda container does) and records the import time, plus which of
+the heavy dependencies ended up loaded. Nothing talks to AWS: clients are
+only built on first use, so importing a handler must not touch the network.
+
+    python benchmarks/cold_start.py
+    python benchmarks/cold_start.py --runs 20 --json > cold_start.json
+    python benchmarks/cold_start.py scan-attendance generate-qr
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+LAMBDAS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'lambdas'))
+LAYER_DIR = os.path.join(LAMBDAS_DIR, 'layer')  # mounted at /opt/python on Lambda
+
+HEAVY_MODULES = ('boto3', 'botocore.session', 'qrcode', 'PIL', 'jose', 'orjson', 'pyarrow')
+
+_PROBE = '''
+import sys, time, json
+sys.path[:0] = [{path!r}, {layer!r}]
+start = time.perf_counter()
+import lambda_function
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000,
+                  "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+'''
+
+
+def handlers():
+    return sorted(
+        name for name in os.listdir(LAMBDAS_DIR)
+        if os.path.isfile(os.path.join(LAMBDAS_DIR, name, 'lambda_function.py'))
+    )
+
+
+def measure(handler, runs):
+    path = os.path.join(LAMBDAS_DIR, handler)
+    env = {**os.environ, 'AWS_DEFAULT_REGION': os.environ.get('AWS_DEFAULT_REGION', 'us-east-1')}
+    samples, loaded = [], []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', _PROBE.format(path=path, layer=LAYER_DIR, heavy=HEAVY_MODULES)],
+            cwd=path, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        samples.append(result['ms'])
+        loaded = result['loaded']
+    return {
+        'handler': handler,
+        'runs': runs,
+        'median_ms': round(statistics.median(samples), 1),
+        'min_ms': round(min(samples), 1),
+        'max_ms': round(max(samples), 1),
+        'loaded': loaded,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('handlers', nargs='*', help='handler directories (default: all)')
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per handler')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args(argv)
+
+    results = [measure(handler, args.runs) for handler in (args.handlers or handlers())]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'handler':<32}{'median ms':>10}{'min':>8}{'max':>8}  heavy modules loaded")
+    for r in results:
+        print(f"{r['handler']:<32}{r['median_ms']:>10}{r['min_ms']:>8}{r['max_ms']:>8}  "
+              f"{', '.join(r['loaded']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
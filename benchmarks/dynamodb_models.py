@@ -0,0 +1,114 @@
+"""
+Attendance read-path benchmark: resource-style decoding vs slotted models.
+
+Decodes the same wire-format query page (what the low-level client returns)
+three ways and reports throughput and the memory retained per 10k items:
+
+- resource: boto3's TypeDeserializer per attribute (as Table.query does)
+  followed by serialize_item, the path every read used before
+- models: Attendance.from_item, kept as slotted objects
+- models_to_dict: Attendance.from_item(...).to_dict(), the records
+  get_attendance_page now returns
+
+    python benchmarks/dynamodb_models.py
+    python benchmarks/dynamodb_models.py --items 50000 --runs 10 --json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import tracemalloc
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'lambdas', 'layer')))
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer  # noqa: E402
+
+from shared.dynamodb_utils import serialize_item  # noqa: E402
+from shared.models import Attendance  # noqa: E402
+
+
+def wire_items(n):
+    """Attendance items as the low-level client returns them."""
+    serializer = TypeSerializer()
+    items = []
+    for i in range(n):
+        item = {
+            'attendance_id': f'att-{i:06d}',
+            'session_id': f'sess-{i % 40:03d}',
+            'class_id': 'class-abc',
+            'student_id': f'stu-{i:06d}',
+            'scan_timestamp': '2025-11-20T10:00:00.000000',
+            'location': {'lat': Decimal('40.7128'), 'lng': Decimal('-74.0060')} if i % 2 else None,
+            'device_info': 'Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X)',
+        }
+        items.append({k: serializer.serialize(v) for k, v in item.items()})
+    return items
+
+
+def resource_path(items):
+    deserializer = TypeDeserializer()
+    return [serialize_item({k: deserializer.deserialize(v) for k, v in item.items()}) for item in items]
+
+
+def models_path(items):
+    return [Attendance.from_item(item) for item in items]
+
+
+def models_to_dict_path(items):
+    return [Attendance.from_item(item).to_dict() for item in items]
+
+
+PATHS = [('resource', resource_path), ('models', models_path), ('models_to_dict', models_to_dict_path)]
+
+
+def throughput(fn, items, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(items)
+        samples.append(time.perf_counter() - start)
+    return round(len(items) / statistics.median(samples))
+
+
+def retained_bytes(fn, items):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn(items)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del result
+    return retained
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--runs', type=int, default=5, help='timed runs per path (median reported)')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args(argv)
+
+    items = wire_items(args.items)
+    assert resource_path(items[:100]) == models_to_dict_path(items[:100])
+
+    results = [{
+        'path': name,
+        'items_per_s': throughput(fn, items, args.runs),
+        'kib_per_10k': round(retained_bytes(fn, items) / args.items * 10000 / 1024),
+    } for name, fn in PATHS]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    base = results[0]
+    print(f"{'path':<16}{'items/s':>12}{'speedup':>10}{'KiB / 10k':>12}")
+    for r in results:
+        print(f"{r['path']:<16}{r['items_per_s']:>12}{r['items_per_s'] / base['items_per_s']:>9.1f}x"
+              f"{r['kib_per_10k']:>12}")
+
+
+if __name__ == '__main__':
+    main()
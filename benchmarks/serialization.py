@@ -0,0 +1,110 @@
+"""
+Response serialization benchmark for large attendance lists.
+
+Compares the old path (serialize_item's json.dumps/json.loads round trip per
+item, then json.dumps of the body with a Decimal default=) against the shared
+codec (one from_dynamodb walk, one dumps). The new path is timed with the
+stdlib encoder and, when installed, with orjson.
+
+    python benchmarks/serialization.py
+    python benchmarks/serialization.py --records 5000 20000 --runs 20 --json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'lambdas', 'layer')))
+
+from shared import json_utils  # noqa: E402
+
+
+def attendance_items(n):
+    """Attendance items shaped like boto3 returns them (numbers as Decimal)."""
+    return [{
+        'attendance_id': f'att-{i:06d}',
+        'session_id': f'sess-{i % 40:03d}',
+        'class_id': 'class-abc',
+        'student_id': f'stu-{i:06d}',
+        'student_email': f'stu-{i:06d}@example.edu',
+        'scan_timestamp': '2025-11-20T10:00:00.000000',
+        'activity_epoch': Decimal(i % 3),
+        'location': {'lat': Decimal('40.7128'), 'lng': Decimal('-74.0060')},
+    } for i in range(n)]
+
+
+def _decimal_default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError
+
+
+def _handler_default(obj):
+    if isinstance(obj, Decimal):
+        return int(obj) if obj % 1 == 0 else float(obj)
+    raise TypeError
+
+
+def round_trip(items):
+    records = [json.loads(json.dumps(item, default=_decimal_default)) for item in items]
+    return json.dumps({'attendance_records': records}, default=_handler_default)
+
+
+def single_pass(items):
+    records = [json_utils.from_dynamodb(item) for item in items]
+    return json_utils.dumps({'attendance_records': records})
+
+
+def single_pass_stdlib(items):
+    orjson, json_utils._orjson = json_utils._orjson, False
+    try:
+        return single_pass(items)
+    finally:
+        json_utils._orjson = orjson
+
+
+def time_ms(fn, items, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(items)
+        samples.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(samples), 2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--runs', type=int, default=10, help='timed runs per case (median reported)')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args(argv)
+
+    paths = [('round_trip', round_trip), ('single_pass_stdlib', single_pass_stdlib)]
+    if json_utils.get_orjson() is not None:
+        paths.append(('single_pass_orjson', single_pass))
+
+    results = []
+    for n in args.records:
+        items = attendance_items(n)
+        assert json.loads(round_trip(items)) == json.loads(single_pass(items))
+        row = {'records': n}
+        row.update({name: time_ms(fn, items, args.runs) for name, fn in paths})
+        results.append(row)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    names = [name for name, _ in paths]
+    print(f"{'records':>8}" + ''.join(f'{name + " ms":>24}' for name in names) + f"{'speedup':>10}")
+    for r in results:
+        best = min(r[name] for name in names[1:])
+        print(f"{r['records']:>8}" + ''.join(f'{r[name]:>24}' for name in names)
+              + f"{r['round_trip'] / best:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
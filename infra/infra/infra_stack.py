@@ -10,7 +10,12 @@ from aws_cdk import (
     aws_cognito as cognito,
     aws_iam as iam,
     aws_cloudfront as cloudfront,
-    aws_cloudfront_origins as origins
+    aws_cloudfront_origins as origins,
+    aws_events as events,
+    aws_events_targets as targets,
+    aws_secretsmanager as secretsmanager,
+    aws_sqs as sqs,
+    aws_lambda_event_sources as event_sources
 )
 from aws_cdk.aws_lambda_python_alpha import PythonFunction, PythonLayerVersion
 from constructs import Construct
@@ -79,7 +84,9 @@ class InfraStack(Stack):
         sessions_table = ddb.Table(
             self, "SessionsTable",
             partition_key={"name": "session_id", "type": ddb.AttributeType.STRING},
-            billing_mode=ddb.BillingMode.PAY_PER_REQUEST
+            billing_mode=ddb.BillingMode.PAY_PER_REQUEST,
+            # only QR revocation items carry it; they expire once the codes they reject have
+            time_to_live_attribute="revoked_until"
         )
         sessions_table.add_global_secondary_index(
             index_name="class_id-index",
@@ -89,7 +96,9 @@ class InfraStack(Stack):
         attendance_table = ddb.Table(
             self, "AttendanceTable",
             partition_key={"name": "attendance_id", "type": ddb.AttributeType.STRING},
-            billing_mode=ddb.BillingMode.PAY_PER_REQUEST
+            billing_mode=ddb.BillingMode.PAY_PER_REQUEST,
+            # new attendance items feed the notifier (SNS is kept off the scan path)
+            stream=ddb.StreamViewType.NEW_IMAGE
         )
         for index in [
             ("session_id-index", "session_id"),
@@ -139,7 +148,29 @@ class InfraStack(Stack):
             self, "LectureMaterialsBucket",
             versioned=True,
             auto_delete_objects=True,
-            removal_policy=RemovalPolicy.DESTROY
+            removal_policy=RemovalPolicy.DESTROY,
+            # browsers PUT multipart parts straight to presigned URLs and need the ETag back
+            cors=[s3.CorsRule(
+                allowed_methods=[s3.HttpMethods.PUT],
+                allowed_origins=["*"],
+                allowed_headers=["*"],
+                exposed_headers=["ETag"],
+                max_age=3000
+            )],
+            lifecycle_rules=[s3.LifecycleRule(
+                abort_incomplete_multipart_upload_after=Duration.days(1)
+            )]
+        )
+
+        # Attendance exports are written once, downloaded through a presigned URL and then expire
+        exports_bucket = s3.Bucket(
+            self, "AttendanceExportsBucket",
+            auto_delete_objects=True,
+            removal_policy=RemovalPolicy.DESTROY,
+            lifecycle_rules=[s3.LifecycleRule(
+                expiration=Duration.days(1),
+                abort_incomplete_multipart_upload_after=Duration.days(1)
+            )]
         )
 
         # SNS Topic for attendance notifications
@@ -163,11 +194,6 @@ class InfraStack(Stack):
             )
         )
 
-        authorizer = apigw.CognitoUserPoolsAuthorizer(
-            self, "ClassBitsAuthorizer",
-            cognito_user_pools=[user_pool]
-        )
-
         # Cognito App Client
         user_pool_client = user_pool.add_client(
             "ClassBitsAppClient",
@@ -188,6 +214,24 @@ class InfraStack(Stack):
                                  group_name="students"
                                  )
 
+        # HMAC key for signed QR tokens (verified in scan-attendance without a DB read)
+        qr_signing_secret = secretsmanager.Secret(
+            self, "QrSigningSecret",
+            generate_secret_string=secretsmanager.SecretStringGenerator(
+                password_length=48,
+                exclude_punctuation=True
+            )
+        )
+
+        # HMAC key for list-endpoint cursors (next_token), see shared/pagination.py
+        page_token_secret = secretsmanager.Secret(
+            self, "PageTokenSecret",
+            generate_secret_string=secretsmanager.SecretStringGenerator(
+                password_length=48,
+                exclude_punctuation=True
+            )
+        )
+
         # Shared environment variables
         env_vars = {
             "CLASSES_TABLE": classes_table.table_name,
@@ -196,16 +240,29 @@ class InfraStack(Stack):
             "QR_CODE_BUCKET": qr_bucket.bucket_name,
             "CLOUDFRONT_DOMAIN": qr_distribution.domain_name,
             "LECTURE_MATERIALS_BUCKET": lecture_materials_bucket.bucket_name,
+            "EXPORTS_BUCKET": exports_bucket.bucket_name,
             "USER_POOL_ID": user_pool.user_pool_id,
             "COGNITO_CLIENT_ID": user_pool_client.user_pool_client_id,
             "ATTENDANCE_TOPIC_ARN": attendance_topic.topic_arn,
+            # only the ARNs: functions granted read access fetch the keys at runtime (shared/secret_utils.py)
+            "QR_SIGNING_SECRET_ARN": qr_signing_secret.secret_arn,
+            "PAGE_TOKEN_SECRET_ARN": page_token_secret.secret_arn,
             # "AWS_REGION": self.region
         }
 
-        # Shared Lambda Layer (Uses PythonLayerVersion to bundle dependencies from requirements.txt)
+        # Hot read paths cache class/session items per container (see dynamodb_utils)
+        cached_read_env_vars = {
+            **env_vars,
+            "CLASSES_CACHE_TTL": "300",
+            "SESSIONS_CACHE_TTL": "30",
+        }
+
+        # Shared Lambda Layer: the `shared` package plus its dependencies from requirements.txt,
+        # mounted at /opt/python so every function imports it as `shared.<module>`.
+        # Functions carry only their handler; nothing else is bundled per function.
         shared_layer = PythonLayerVersion(
             self, "SharedLayer",
-            entry="../lambdas/shared",  # Directory containing your shared code AND requirements.txt
+            entry="../lambdas/layer",  # shared/ package, requirements.txt and pyproject.toml
             compatible_runtimes=[_lambda.Runtime.PYTHON_3_11],
             description="Shared utilities for all Lambdas"
         )
@@ -232,7 +289,10 @@ class InfraStack(Stack):
             index="lambda_function.py",
             handler="lambda_handler",
             environment=env_vars,
-            layers=[shared_layer]
+            layers=[shared_layer],
+            # bulk schedules render and upload QR codes for a whole term in one request
+            memory_size=1024,
+            timeout=Duration.seconds(29)
         )
 
         lambdas["upload_lecture_materials"] = PythonFunction(
@@ -243,8 +303,8 @@ class InfraStack(Stack):
             handler="lambda_handler",
             environment=env_vars,
             layers=[shared_layer],
-            # Boost memory and timeout for Base64/ZIP processing
-            memory_size=512,
+            # inline base64 bodies are decoded and uploaded in bounded chunks
+            memory_size=256,
             timeout=Duration.seconds(30)
         )
 
@@ -261,7 +321,7 @@ class InfraStack(Stack):
             runtime=_lambda.Runtime.PYTHON_3_11,
             index="lambda_function.py",
             handler="lambda_handler",
-            environment=env_vars,
+            environment=cached_read_env_vars,
             layers=[shared_layer]
         )
 
@@ -281,7 +341,7 @@ class InfraStack(Stack):
             runtime=_lambda.Runtime.PYTHON_3_11,
             index="lambda_function.py",
             handler="lambda_handler",
-            environment=env_vars,
+            environment=cached_read_env_vars,
             layers=[shared_layer]
         )
 
@@ -297,7 +357,7 @@ class InfraStack(Stack):
 
         lambdas["get_attendance"].add_to_role_policy(
             iam.PolicyStatement(
-                actions=["cognito-idp:AdminGetUser"],
+                actions=["cognito-idp:AdminGetUser", "cognito-idp:ListUsers"],
                 resources=[user_pool.user_pool_arn]
             )
         )
@@ -312,6 +372,93 @@ class InfraStack(Stack):
             layers=[shared_layer]
         )
 
+        lambdas["export_attendance"] = PythonFunction(
+            self, "ExportAttendanceLambda",
+            entry="../lambdas/export-attendance",  # requirements.txt bundles pyarrow for Parquet
+            runtime=_lambda.Runtime.PYTHON_3_11,
+            index="lambda_function.py",
+            handler="lambda_handler",
+            environment=env_vars,
+            layers=[shared_layer],
+            # records and output parts are streamed; memory holds a few upload parts
+            memory_size=1024,
+            timeout=Duration.seconds(29)
+        )
+
+        # Background job: rebuild session attendance counters from the attendance table
+        lambdas["reconcile_attendance_counters"] = PythonFunction(
+            self, "ReconcileAttendanceCountersLambda",
+            entry="../lambdas/reconcile-attendance-counters",
+            runtime=_lambda.Runtime.PYTHON_3_11,
+            index="lambda_function.py",
+            handler="lambda_handler",
+            environment=env_vars,
+            layers=[shared_layer],
+            timeout=Duration.minutes(5)
+        )
+
+        events.Rule(
+            self, "ReconcileAttendanceCountersSchedule",
+            schedule=events.Schedule.cron(minute="0", hour="7"),
+            targets=[targets.LambdaFunction(lambdas["reconcile_attendance_counters"])]
+        )
+
+        # TOKEN authorizer: verifies the ID token once and passes roles and owned
+        # class ids to the handlers; API Gateway caches the result per token
+        authorizer_fn = PythonFunction(
+            self, "AuthorizerLambda",
+            entry="../lambdas/authorizer",
+            runtime=_lambda.Runtime.PYTHON_3_11,
+            index="lambda_function.py",
+            handler="lambda_handler",
+            environment={
+                key: env_vars[key] for key in ("CLASSES_TABLE", "USER_POOL_ID", "COGNITO_CLIENT_ID")
+            },
+            layers=[shared_layer],
+            memory_size=256,
+            timeout=Duration.seconds(10)
+        )
+        # only reads the professor's class ids
+        classes_table.grant_read_data(authorizer_fn)
+
+        authorizer = apigw.TokenAuthorizer(
+            self, "ClassBitsAuthorizer",
+            handler=authorizer_fn,
+            identity_source=apigw.IdentitySource.header("Authorization"),
+            results_cache_ttl=Duration.minutes(5)
+        )
+
+        # Outbox: attendance confirmations are sent from the attendance table's stream
+        lambdas["attendance_notifier"] = PythonFunction(
+            self, "AttendanceNotifierLambda",
+            entry="../lambdas/attendance-notifier",
+            runtime=_lambda.Runtime.PYTHON_3_11,
+            index="lambda_function.py",
+            handler="lambda_handler",
+            environment=cached_read_env_vars,
+            layers=[shared_layer],
+            timeout=Duration.seconds(60)
+        )
+
+        attendance_notifier_dlq = sqs.Queue(
+            self, "AttendanceNotifierDLQ",
+            retention_period=Duration.days(14)
+        )
+
+        lambdas["attendance_notifier"].add_event_source(
+            event_sources.DynamoEventSource(
+                attendance_table,
+                starting_position=_lambda.StartingPosition.LATEST,
+                batch_size=100,
+                max_batching_window=Duration.seconds(1),
+                retry_attempts=5,
+                bisect_batch_on_error=True,
+                report_batch_item_failures=True,
+                on_failure=event_sources.SqsDlq(attendance_notifier_dlq),
+                filters=[_lambda.FilterCriteria.filter({"eventName": _lambda.FilterRule.is_equal("INSERT")})]
+            )
+        )
+
         # Grant permissions
         for fn in lambdas.values():
             classes_table.grant_read_write_data(fn)
@@ -324,6 +471,16 @@ class InfraStack(Stack):
         lecture_materials_bucket.grant_read_write(lambdas["upload_lecture_materials"])
         lecture_materials_bucket.grant_read(lambdas["get_lecture_materials"])
         lecture_materials_bucket.grant_read(lambdas["scan_attendance"])
+        lecture_materials_bucket.grant_read(lambdas["attendance_notifier"])
+        exports_bucket.grant_read_write(lambdas["export_attendance"])
+
+        # QR signing key: functions that issue or verify signed QR codes
+        for name in ("generate_qr", "manage_sessions", "scan_attendance"):
+            qr_signing_secret.grant_read(lambdas[name])
+
+        # Page token key: functions that issue or accept next_token cursors
+        for name in ("manage_sessions", "get_attendance", "get_analytics"):
+            page_token_secret.grant_read(lambdas[name])
 
         # ------------------------------------------------------------
         # FRONTEND HOSTING: S3 Bucket + CloudFront Distribution
@@ -376,12 +533,32 @@ class InfraStack(Stack):
 
         session_id = sessions.add_resource("{session_id}")
 
+        bulk_sessions = sessions.add_resource("bulk")
+
+        bulk_sessions.add_method(
+            "POST",
+            create_lambda_integration(lambdas["manage_sessions"]),
+            authorization_type=apigw.AuthorizationType.CUSTOM,
+            authorizer=authorizer,
+            method_responses=[cors_method_response]
+        )
+
         qr_code = session_id.add_resource("generate-qr")
 
         qr_code.add_method(
             "POST",
             create_lambda_integration(lambdas["generate_qr"]),
-            authorization_type=apigw.AuthorizationType.COGNITO,
+            authorization_type=apigw.AuthorizationType.CUSTOM,
+            authorizer=authorizer,
+            method_responses=[cors_method_response]
+        )
+
+        rotating_qr = session_id.add_resource("rotating-qr")
+
+        rotating_qr.add_method(
+            "GET",
+            create_lambda_integration(lambdas["generate_qr"]),
+            authorization_type=apigw.AuthorizationType.CUSTOM,
             authorizer=authorizer,
             method_responses=[cors_method_response]
         )
@@ -389,7 +566,7 @@ class InfraStack(Stack):
         session_id.add_method(
             "GET",
             create_lambda_integration(lambdas["manage_sessions"]),
-            authorization_type=apigw.AuthorizationType.COGNITO,
+            authorization_type=apigw.AuthorizationType.CUSTOM,
             authorizer=authorizer,
             method_responses=[cors_method_response]
         )
@@ -397,28 +574,28 @@ class InfraStack(Stack):
         sessions.add_method(
             "GET",
             create_lambda_integration(lambdas["manage_sessions"]),
-            authorization_type=apigw.AuthorizationType.COGNITO,
+            authorization_type=apigw.AuthorizationType.CUSTOM,
             authorizer=authorizer,
             method_responses=[cors_method_response]
         )
         sessions.add_method(
             "POST",
             create_lambda_integration(lambdas["manage_sessions"]),
-            authorization_type=apigw.AuthorizationType.COGNITO,
+            authorization_type=apigw.AuthorizationType.CUSTOM,
             authorizer=authorizer,
             method_responses=[cors_method_response]
         )
         sessions.add_method(
             "PUT",
             create_lambda_integration(lambdas["manage_sessions"]),
-            authorization_type=apigw.AuthorizationType.COGNITO,
+            authorization_type=apigw.AuthorizationType.CUSTOM,
             authorizer=authorizer,
             method_responses=[cors_method_response]
         )
         sessions.add_method(
             "DELETE",
             create_lambda_integration(lambdas["manage_sessions"]),
-            authorization_type=apigw.AuthorizationType.COGNITO,
+            authorization_type=apigw.AuthorizationType.CUSTOM,
             authorizer=authorizer,
             method_responses=[cors_method_response]
         )
@@ -428,10 +605,18 @@ class InfraStack(Stack):
         attendance.add_method(
             "GET",
             create_lambda_integration(lambdas["get_attendance"]),
-            authorization_type=apigw.AuthorizationType.COGNITO,
+            authorization_type=apigw.AuthorizationType.CUSTOM,
+            authorizer=authorizer,
+            method_responses=[cors_method_response]
+        )
+        attendance.add_resource("export").add_method(
+            "POST",
+            create_lambda_integration(lambdas["export_attendance"]),
+            authorization_type=apigw.AuthorizationType.CUSTOM,
             authorizer=authorizer,
             method_responses=[cors_method_response]
         )
+
         scan = attendance.add_resource("scan")
 
         scan.add_method(
@@ -439,7 +624,7 @@ class InfraStack(Stack):
             create_lambda_integration(
                 lambdas["scan_attendance"]
             ),
-            authorization_type=apigw.AuthorizationType.COGNITO,
+            authorization_type=apigw.AuthorizationType.CUSTOM,
             authorizer=authorizer,
             method_responses=[cors_method_response]
         )
@@ -449,7 +634,7 @@ class InfraStack(Stack):
         analytics.add_method(
             "GET",
             create_lambda_integration(lambdas["get_analytics"]),
-            authorization_type=apigw.AuthorizationType.COGNITO,
+            authorization_type=apigw.AuthorizationType.CUSTOM,
             authorizer=authorizer,
             method_responses=[cors_method_response]
         )
@@ -459,7 +644,7 @@ class InfraStack(Stack):
         materials.add_method(
             "POST",
             create_lambda_integration(lambdas["upload_lecture_materials"]),
-            authorization_type=apigw.AuthorizationType.COGNITO,
+            authorization_type=apigw.AuthorizationType.CUSTOM,
             authorizer=authorizer,
             method_responses=[cors_method_response]
         )
@@ -467,7 +652,26 @@ class InfraStack(Stack):
         materials.add_method(
             "GET",
             create_lambda_integration(lambdas["get_lecture_materials"]),
-            authorization_type=apigw.AuthorizationType.COGNITO,
+            authorization_type=apigw.AuthorizationType.CUSTOM,
+            authorizer=authorizer,
+            method_responses=[cors_method_response]
+        )
+
+        material_uploads = materials.add_resource("uploads")
+
+        for method in ("POST", "DELETE"):
+            material_uploads.add_method(
+                method,
+                create_lambda_integration(lambdas["upload_lecture_materials"]),
+                authorization_type=apigw.AuthorizationType.CUSTOM,
+                authorizer=authorizer,
+                method_responses=[cors_method_response]
+            )
+
+        material_uploads.add_resource("complete").add_method(
+            "POST",
+            create_lambda_integration(lambdas["upload_lecture_materials"]),
+            authorization_type=apigw.AuthorizationType.CUSTOM,
             authorizer=authorizer,
             method_responses=[cors_method_response]
         )
\ No newline at end of file
@@ -0,0 +1,30 @@
+import os
+import sys
+
+# The shared package reaches Lambda through the layer (/opt/python/shared);
+# put the layer directory on the path so tests import it the same way
+LAYER_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'lambdas', 'layer'))
+if LAYER_PATH not in sys.path:
+    sys.path.insert(0, LAYER_PATH)
+
+import pytest
+
+from shared import auth_utils
+
+
+@pytest.fixture(autouse=True)
+def _clear_ownership_cache():
+    auth_utils.clear_ownership_cache()
+    yield
+    auth_utils.clear_ownership_cache()
+
+
+@pytest.fixture
+def class_owners(monkeypatch):
+    """class_id -> professor_id table behind the lookups of assert_owns_class."""
+    owners = {}
+    monkeypatch.setattr(auth_utils, "get_class",
+                        lambda cid: {"class_id": cid, "professor_id": owners[cid]} if cid in owners else None)
+    monkeypatch.setattr(auth_utils, "get_class_ids_by_professor",
+                        lambda pid: [cid for cid, owner in owners.items() if owner == pid])
+    return owners
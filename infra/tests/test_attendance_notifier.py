@@ -0,0 +1,96 @@
+import sys
+import os
+import json
+import pytest
+
+# Robust path handling
+LAMBDA_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'lambdas', 'attendance-notifier'))
+if LAMBDA_PATH not in sys.path:
+    sys.path.append(LAMBDA_PATH)
+
+import lambda_function as notifier_lambda
+from shared import sns_utils
+
+
+class FakeSNS:
+    def __init__(self, fail_students=()):
+        self.fail_students = set(fail_students)
+        self.requests = []
+
+    def publish_batch(self, TopicArn, PublishBatchRequestEntries):
+        self.requests.append(PublishBatchRequestEntries)
+        successful, failed = [], []
+        for entry in PublishBatchRequestEntries:
+            if any(s in entry["Message"] for s in self.fail_students):
+                failed.append({"Id": entry["Id"], "Code": "InvalidParameter", "SenderFault": True})
+            else:
+                successful.append({"Id": entry["Id"], "MessageId": f"m-{entry['Id']}"})
+        return {"Successful": successful, "Failed": failed}
+
+
+def stream_record(sequence_number, student_id, event_name="INSERT"):
+    return {
+        "eventName": event_name,
+        "dynamodb": {
+            "SequenceNumber": sequence_number,
+            "NewImage": {
+                "attendance_id": {"S": f"att-{student_id}"},
+                "session_id": {"S": "sess-123"},
+                "class_id": {"S": "class-abc"},
+                "student_id": {"S": student_id}
+            }
+        }
+    }
+
+
+@pytest.fixture
+def sns(monkeypatch):
+    monkeypatch.setattr(notifier_lambda, "ATTENDANCE_TOPIC_ARN", "arn:aws:sns:us-east-1:123:topic")
+    monkeypatch.setattr(notifier_lambda, "get_session",
+                        lambda sid: {"session_id": sid, "lecture_material_key": "lectures/sess-123/a.zip"})
+    monkeypatch.setattr(notifier_lambda, "get_lecture_material_presigned_url",
+                        lambda session_id, key, expiration: f"https://s3/{key}")
+    fake = FakeSNS()
+    monkeypatch.setattr(sns_utils, "sns_client", fake)
+    return fake
+
+
+def sent_messages(fake):
+    return [json.loads(entry["Message"]) for request in fake.requests for entry in request]
+
+
+# Stream Flow: every new attendance item produces one notification with the material link
+def test_notifies_new_attendance(sns):
+    result = notifier_lambda.lambda_handler({"Records": [
+        stream_record("1", "stu-1"),
+        stream_record("2", "stu-2", event_name="MODIFY"),
+        stream_record("3", "stu-3"),
+    ]}, None)
+
+    assert result == {"batchItemFailures": []}
+    assert len(sns.requests) == 1
+    sent = sent_messages(sns)
+    assert [n["student_id"] for n in sent] == ["stu-1", "stu-3"]
+    assert sent[0]["lecture_material_url"] == "https://s3/lectures/sess-123/a.zip"
+
+
+# Batching: a full stream batch of 25 inserts takes three PublishBatch calls
+def test_batches_notifications(sns):
+    result = notifier_lambda.lambda_handler({"Records": [
+        stream_record(str(i), f"stu-{i}") for i in range(25)]}, None)
+
+    assert result == {"batchItemFailures": []}
+    assert [len(r) for r in sns.requests] == [10, 10, 5]
+
+
+# Failure Flow: the earliest failed entry is reported so the retry resumes there
+def test_reports_first_failure(sns):
+    sns.fail_students = {"stu-2", "stu-3"}
+
+    result = notifier_lambda.lambda_handler({"Records": [
+        stream_record("1", "stu-1"),
+        stream_record("2", "stu-2"),
+        stream_record("3", "stu-3"),
+    ]}, None)
+
+    assert result == {"batchItemFailures": [{"itemIdentifier": "2"}]}
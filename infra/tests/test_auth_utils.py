@@ -0,0 +1,129 @@
+import json
+import time
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from shared import auth_utils
+
+ISSUER = "https://cognito-idp.us-east-1.amazonaws.com/us-east-1_test"
+CLIENT_ID = "client-123"
+
+
+def rsa_key(kid):
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption())
+    public_pem = private.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+    public_jwk = {**jwk.construct(public_pem, "RS256").to_dict(), "kid": kid, "use": "sig"}
+    return private_pem, public_jwk
+
+
+KEY_1 = rsa_key("kid-1")
+KEY_2 = rsa_key("kid-2")
+
+
+def make_token(key=KEY_1, exp_in=3600, **claims):
+    private_pem, public_jwk = key
+    payload = {"sub": "user-1", "aud": CLIENT_ID, "iss": ISSUER, "token_use": "id",
+               "exp": int(time.time()) + exp_in, **claims}
+    return jwt.encode(payload, private_pem, algorithm="RS256", headers={"kid": public_jwk["kid"]})
+
+
+@pytest.fixture
+def jwks(monkeypatch, tmp_path):
+    """Serves a local JWKS file through JWKS_URL and counts the fetches."""
+    path = tmp_path / "jwks.json"
+    fetches = []
+
+    def publish(*keys):
+        path.write_text(json.dumps({"keys": [public_jwk for _, public_jwk in keys]}))
+
+    original_fetch = auth_utils.fetch_jwks
+
+    def counting_fetch():
+        fetches.append(1)
+        return original_fetch()
+
+    publish(KEY_1)
+    monkeypatch.setattr(auth_utils, "JWKS_URL", path.as_uri())
+    monkeypatch.setattr(auth_utils, "ISSUER", ISSUER)
+    monkeypatch.setattr(auth_utils, "CLIENT_ID", CLIENT_ID)
+    monkeypatch.setattr(auth_utils, "fetch_jwks", counting_fetch)
+    auth_utils.clear_token_caches()
+    yield publish, fetches
+    auth_utils.clear_token_caches()
+
+
+def test_verifies_token_and_caches_result(monkeypatch, jwks):
+    _, fetches = jwks
+    decodes = []
+    original_decode = jwt.decode
+    monkeypatch.setattr(jwt, "decode", lambda *a, **k: decodes.append(1) or original_decode(*a, **k))
+
+    token = make_token()
+    first = auth_utils.verify_token(token)
+    second = auth_utils.verify_token(token)
+
+    assert first["sub"] == second["sub"] == "user-1"
+    assert len(decodes) == 1
+    assert len(fetches) == 1
+
+
+def test_rejects_expired_foreign_and_tampered_tokens(jwks):
+    assert auth_utils.verify_token(make_token(exp_in=-60)) is None
+    assert auth_utils.verify_token(make_token(aud="other-client")) is None
+
+    header, payload, signature = make_token().split(".")
+    assert auth_utils.verify_token(f"{header}.{payload}.{signature[::-1]}") is None
+
+
+def test_unknown_kid_refreshes_once_per_interval(monkeypatch, jwks):
+    publish, fetches = jwks
+    assert auth_utils.verify_token(make_token()) is not None
+
+    # the pool rotates its signing key
+    publish(KEY_1, KEY_2)
+    monkeypatch.setattr(auth_utils, "JWKS_MIN_REFRESH_SECONDS", 0)
+    assert auth_utils.verify_token(make_token(KEY_2))["sub"] == "user-1"
+    assert len(fetches) == 2
+
+    # a kid the pool does not have is not allowed to trigger a fetch per request
+    monkeypatch.setattr(auth_utils, "JWKS_MIN_REFRESH_SECONDS", 60)
+    stranger = rsa_key("kid-unknown")
+    assert auth_utils.verify_token(make_token(stranger)) is None
+    assert auth_utils.verify_token(make_token(stranger)) is None
+    assert len(fetches) == 2
+
+
+# Ownership index: owned classes are answered from the per-container cache
+def test_assert_owns_class_reads_index_once(monkeypatch, class_owners):
+    class_owners.update({"class-a": "prof-1", "class-b": "prof-1", "class-x": "prof-2"})
+    reads = []
+    lookup = auth_utils.get_class_ids_by_professor
+    monkeypatch.setattr(auth_utils, "get_class_ids_by_professor", lambda pid: reads.append(pid) or lookup(pid))
+    monkeypatch.setattr(auth_utils, "get_class", lambda cid: pytest.fail("owned classes need no class read"))
+
+    auth_utils.assert_owns_class("prof-1", "class-a")
+    auth_utils.assert_owns_class("prof-1", "class-b")
+
+    assert reads == ["prof-1"]
+
+
+def test_assert_owns_class_refreshes_for_new_class_then_rejects(class_owners):
+    class_owners.update({"class-a": "prof-1", "class-x": "prof-2"})
+    auth_utils.assert_owns_class("prof-1", "class-a")
+
+    # created after the index was cached
+    class_owners["class-new"] = "prof-1"
+    auth_utils.assert_owns_class("prof-1", "class-new")
+
+    with pytest.raises(auth_utils.ClassAccessError) as forbidden:
+        auth_utils.assert_owns_class("prof-1", "class-x")
+    with pytest.raises(auth_utils.ClassAccessError) as missing:
+        auth_utils.assert_owns_class("prof-1", "class-gone")
+
+    assert forbidden.value.status_code == 403
+    assert missing.value.status_code == 404
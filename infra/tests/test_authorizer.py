@@ -0,0 +1,65 @@
+import sys
+import os
+import pytest
+
+# Robust path handling
+LAMBDA_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'lambdas', 'authorizer'))
+if LAMBDA_PATH not in sys.path:
+    sys.path.append(LAMBDA_PATH)
+
+import lambda_function as authorizer_lambda
+from shared.auth_utils import get_user_from_event, owned_class_ids
+
+METHOD_ARN = "arn:aws:execute-api:us-east-1:123456789012:abc123/prod/GET/sessions/sess-1/generate-qr"
+
+
+def token_event(token="Bearer header.payload.sig"):
+    return {"type": "TOKEN", "authorizationToken": token, "methodArn": METHOD_ARN}
+
+
+def claims(groups):
+    return {"sub": "prof-001", "email": "prof@example.edu", "cognito:username": "prof",
+            "cognito:groups": groups}
+
+
+# Valid Flow: a professor gets a stage-wide policy and their class ids in the context
+def test_professor_context(monkeypatch):
+    tokens = []
+    monkeypatch.setattr(authorizer_lambda, "verify_token", lambda t: tokens.append(t) or claims(["professors"]))
+    monkeypatch.setattr(authorizer_lambda, "get_class_ids_by_professor", lambda pid: ["class-b", "class-a"])
+
+    result = authorizer_lambda.lambda_handler(token_event(), None)
+
+    assert tokens == ["header.payload.sig"]
+    assert result["principalId"] == "prof-001"
+    statement = result["policyDocument"]["Statement"][0]
+    assert statement["Effect"] == "Allow"
+    assert statement["Resource"] == "arn:aws:execute-api:us-east-1:123456789012:abc123/prod/*"
+    assert result["context"]["owned_class_ids"] == "class-a,class-b"
+    assert result["context"]["is_professor"] is True
+
+    # API Gateway passes the context to the handler with values turned into strings
+    context = {k: str(v).lower() if isinstance(v, bool) else v for k, v in result["context"].items()}
+    user = get_user_from_event({"requestContext": {"authorizer": {**context, "principalId": "prof-001"}}})
+    assert user["user_id"] == "prof-001" and user["is_professor"] and not user["is_student"]
+    assert owned_class_ids(user) == {"class-a", "class-b"}
+
+
+def test_student_context_skips_class_lookup(monkeypatch):
+    monkeypatch.setattr(authorizer_lambda, "verify_token", lambda t: claims(["students"]))
+    monkeypatch.setattr(authorizer_lambda, "get_class_ids_by_professor",
+                        lambda pid: pytest.fail("students own no classes"))
+
+    result = authorizer_lambda.lambda_handler(token_event(), None)
+
+    assert result["context"]["is_student"] is True
+    assert result["context"]["owned_class_ids"] == ""
+
+
+# Invalid Flow: API Gateway turns the 'Unauthorized' error into a 401
+@pytest.mark.parametrize("token", ["Bearer bad.token.value", ""])
+def test_rejects_invalid_token(monkeypatch, token):
+    monkeypatch.setattr(authorizer_lambda, "verify_token", lambda t: None)
+
+    with pytest.raises(Exception, match="^Unauthorized$"):
+        authorizer_lambda.lambda_handler(token_event(token), None)
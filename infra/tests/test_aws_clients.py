@@ -0,0 +1,31 @@
+import sys
+import os
+import subprocess
+import boto3
+
+from shared import aws_clients
+
+LAYER_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'lambdas', 'layer'))
+
+
+# Cold Start: importing the shared modules must not load boto3, qrcode, PIL, jose, orjson or pyarrow
+def test_shared_modules_import_without_heavy_dependencies():
+    probe = (
+        "import sys; sys.path.insert(0, %r)\n"
+        "from shared import auth_utils, dynamodb_utils, qr_generator, s3_utils, sns_utils, bulk_sessions, json_utils, exports, secret_utils\n"
+        "print(','.join(m for m in ('boto3', 'qrcode', 'PIL', 'jose', 'orjson', 'pyarrow') if m in sys.modules))"
+    ) % LAYER_PATH
+    output = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == ""
+
+
+def test_clients_are_built_once_per_service(monkeypatch):
+    built = []
+    monkeypatch.setattr(aws_clients, "_clients", {})
+    monkeypatch.setattr(boto3, "client", lambda name: built.append(name) or object())
+
+    first = aws_clients.client("s3")
+    assert aws_clients.client("s3") is first
+    aws_clients.client("sns")
+
+    assert built == ["s3", "sns"]
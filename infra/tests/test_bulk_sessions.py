@@ -0,0 +1,93 @@
+import pytest
+from datetime import datetime
+
+from shared import bulk_sessions
+from shared import qr_generator
+
+
+def schedule(**overrides):
+    data = {
+        "class_id": "class-abc",
+        "start_date": "2026-01-12",
+        "end_date": "2026-01-25",
+        "days": ["MON", "WED"],
+        "start_time": "10:00",
+        "end_time": "11:15",
+        "skip_dates": ["2026-01-19"],
+        "timezone": "America/New_York"
+    }
+    data.update(overrides)
+    return data
+
+
+# Expansion: recurring weekdays over the range, minus skipped dates
+def test_expand_schedule_dates():
+    sessions = bulk_sessions.expand_schedule(schedule())
+
+    assert [s["session_date"] for s in sessions] == ["2026-01-12", "2026-01-14", "2026-01-21"]
+    assert len({s["session_id"] for s in sessions}) == 3
+    assert all(s["start_time"] == "10:00" and s["end_time"] == "11:15" for s in sessions)
+
+
+@pytest.mark.parametrize("overrides", [
+    {"days": []},
+    {"days": ["FUNDAY"]},
+    {"end_date": "2026-01-01"},
+    {"start_time": "10am"},
+    {"end_time": "09:00"},
+    {"timezone": "Mars/Olympus"},
+])
+def test_expand_schedule_rejects_bad_input(overrides):
+    with pytest.raises(ValueError):
+        bulk_sessions.expand_schedule(schedule(**overrides))
+
+
+def test_expand_schedule_limit(monkeypatch):
+    monkeypatch.setattr(bulk_sessions, "MAX_SESSIONS_PER_SCHEDULE", 2)
+    with pytest.raises(ValueError):
+        bulk_sessions.expand_schedule(schedule())
+
+
+# Validity: local class times converted to UTC with the grace period on both ends
+def test_qr_validity_window_uses_timezone():
+    session = bulk_sessions.expand_schedule(schedule())[0]
+    valid_from, expires_at = bulk_sessions.qr_validity_window(session)
+
+    assert valid_from == datetime(2026, 1, 12, 14, 45)
+    assert expires_at == datetime(2026, 1, 12, 16, 30)
+
+
+# Pipeline: every session rendered, uploaded and written in one batch
+def test_pregenerate_sessions(monkeypatch):
+    uploaded, written, progress = [], [], []
+    monkeypatch.setattr(qr_generator, "QR_SIGNING_SECRET", "test-signing-secret")
+    monkeypatch.setattr(qr_generator, "render_qr_image",
+                        lambda qr_string, image_format: f"{image_format}:{qr_string}".encode())
+
+    def fake_upload(qr_string, image, image_format):
+        assert image == f"svg:{qr_string}".encode()
+        uploaded.append(qr_string)
+        return None if len(uploaded) == 1 else f"https://bucket/{qr_generator.qr_image_key(qr_string, image_format)}"
+
+    monkeypatch.setattr(qr_generator, "put_qr_image", fake_upload)
+
+    def fake_batch(sessions):
+        written.append(list(sessions))
+        return {"statusCode": 200, "count": len(sessions)}
+
+    monkeypatch.setattr(bulk_sessions, "batch_create_sessions", fake_batch)
+
+    result = bulk_sessions.pregenerate_sessions(
+        schedule(), upload_workers=1, progress=lambda *args: progress.append(args), image_format="svg")
+
+    assert result["statusCode"] == 200
+    assert result["created"] == 3
+    assert result["failed_uploads"] == 1
+    assert len(written) == 1 and len(written[0]) == 3
+    assert sorted(uploaded) == sorted(s["qr_code_data"] for s in written[0])
+    assert [s["is_active"] for s in written[0]].count(False) == 1
+    assert ("uploaded", 3, 3) in progress and ("rendered", 3, 3) in progress
+
+    # the stored payload is a signed token that opens shortly before class
+    decoded = qr_generator.decode_qr_token(written[0][0]["qr_code_data"])
+    assert decoded["valid_from"] == "2026-01-12T14:45:00"
@@ -0,0 +1,334 @@
+import pytest
+from decimal import Decimal
+
+from shared import dynamodb_utils
+
+
+class FakeTable:
+    """Serves pre-built pages and records every query call."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def query(self, **kwargs):
+        self.calls.append(dict(kwargs))
+        index = len(self.calls) - 1
+        page = {'Items': self.pages[index]}
+        if index + 1 < len(self.pages):
+            page['LastEvaluatedKey'] = {'attendance_id': f"last-{index}"}
+        return page
+
+
+def make_pages(page_count, per_page):
+    return [
+        [{'attendance_id': f"a-{p}-{i}", 'count': Decimal(i)} for i in range(per_page)]
+        for p in range(page_count)
+    ]
+
+
+# Pagination: every page is read and items are serialized
+def test_query_iter_follows_last_evaluated_key():
+    table = FakeTable(make_pages(3, 2))
+    items = list(dynamodb_utils.query_iter(table, IndexName='session_id-index'))
+
+    assert len(items) == 6
+    assert len(table.calls) == 3
+    assert table.calls[1]['ExclusiveStartKey'] == {'attendance_id': 'last-0'}
+    # integral Decimals come back as int, fractional ones as float
+    assert type(items[1]['count']) is int
+
+
+# Laziness + cap: no page beyond the cap is requested
+def test_query_iter_respects_max_items():
+    table = FakeTable(make_pages(3, 2))
+    iterator = dynamodb_utils.query_iter(table, max_items=3)
+    assert table.calls == []
+
+    items = list(iterator)
+    assert [item['attendance_id'] for item in items] == ['a-0-0', 'a-0-1', 'a-1-0']
+    assert len(table.calls) == 2
+    assert table.calls[1]['Limit'] == 1
+
+
+# Paged endpoints: one page per call, or the whole query when no limit was asked for
+def test_query_page_with_and_without_limit():
+    table = FakeTable(make_pages(3, 2))
+    items, last_key = dynamodb_utils.query_page(table, 2)
+    assert len(items) == 2 and last_key == {'attendance_id': 'last-0'}
+    assert table.calls[0]['Limit'] == 2
+
+    table = FakeTable(make_pages(3, 2))
+    items, last_key = dynamodb_utils.query_page(table, None)
+    assert len(items) == 6 and last_key is None
+    assert len(table.calls) == 3 and 'Limit' not in table.calls[0]
+
+
+def test_query_iter_builds_projection_expression():
+    table = FakeTable(make_pages(1, 1))
+    list(dynamodb_utils.query_iter(
+        table,
+        projection=['session_id', 'location'],
+        ExpressionAttributeNames={'#k': 'class_id'}
+    ))
+
+    call = table.calls[0]
+    assert call['ProjectionExpression'] == '#p0, #p1'
+    assert call['ExpressionAttributeNames'] == {'#k': 'class_id', '#p0': 'session_id', '#p1': 'location'}
+
+
+def wire_attendance(n):
+    return {'attendance_id': {'S': f"a-{n}"}, 'session_id': {'S': "sess-123"}, 'class_id': {'S': "class-1"},
+            'student_id': {'S': f"stu-{n}"}, 'scan_timestamp': {'S': "2025-11-20T10:00:00"},
+            'location': {'NULL': True}}
+
+
+# Low-level path: wire-format pages decode straight into models
+def test_iter_attendance_models_reads_all_pages(monkeypatch):
+    client = FakeTable([[wire_attendance(n) for n in range(3)], [wire_attendance(n) for n in range(3, 6)]])
+    monkeypatch.setattr(dynamodb_utils, "get_client", lambda: client)
+
+    records = list(dynamodb_utils.iter_attendance_models_by_class("class-1"))
+
+    assert [r.student_id for r in records] == [f"stu-{n}" for n in range(6)]
+    assert records[0].location is None and records[0].device_info is None
+    assert client.calls[0]['TableName'] == dynamodb_utils.ATTENDANCE_TABLE
+    assert client.calls[0]['ExpressionAttributeValues'] == {':cid': {'S': "class-1"}}
+    assert client.calls[1]['ExclusiveStartKey'] == {'attendance_id': 'last-0'}
+
+
+class RecordingTable(FakeTable):
+    def __init__(self, pages=None):
+        super().__init__(pages or [[]])
+        self.updates = []
+
+    def update_item(self, **kwargs):
+        self.updates.append(kwargs)
+
+
+# Reconciliation recomputes count and scan window from the session index
+class CounterTable(RecordingTable):
+    """Sessions table whose counter can move under a reconcile (a racing scan)."""
+
+    def __init__(self, count, last_scan_at='2025-11-20T10:09:00', races=0):
+        super().__init__()
+        self.item = {'attendance_count': Decimal(count), 'last_scan_at': last_scan_at}
+        self.races = races
+
+    def get_item(self, Key, ProjectionExpression, ConsistentRead):
+        assert ConsistentRead
+        return {'Item': dict(self.item)}
+
+    def update_item(self, **kwargs):
+        from botocore.exceptions import ClientError
+        super().update_item(**kwargs)
+        if self.races:
+            self.races -= 1
+            self.item['attendance_count'] += 1
+        if kwargs['ExpressionAttributeValues'][':expected'] != self.item['attendance_count']:
+            raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException'}}, 'UpdateItem')
+
+
+def scan_pages():
+    return [[{'scan_timestamp': '2025-11-20T10:05:00'}, {'scan_timestamp': '2025-11-20T10:01:00'}],
+            [{'scan_timestamp': '2025-11-20T10:09:00'}]]
+
+
+def test_reconcile_session_attendance(monkeypatch):
+    attendance = RecordingTable(scan_pages())
+    sessions = CounterTable(2)
+    tables = {dynamodb_utils.ATTENDANCE_TABLE: attendance, dynamodb_utils.SESSIONS_TABLE: sessions}
+    monkeypatch.setattr(dynamodb_utils, "get_table", lambda name: tables[name])
+
+    result = dynamodb_utils.reconcile_session_attendance("sess-123")
+
+    assert result['attendance_count'] == 3
+    assert result['first_scan_at'] == '2025-11-20T10:01:00'
+    assert result['last_scan_at'] == '2025-11-20T10:09:00'
+    values = sessions.updates[0]['ExpressionAttributeValues']
+    assert values[':c'] == 3
+    # only overwrites the counter it read
+    assert sessions.updates[0]['ConditionExpression'] == 'attendance_count = :expected'
+    assert values[':expected'] == 2
+
+
+# A scan counted mid-recount fails the conditional write; the session is recounted, not clobbered
+def test_reconcile_retries_when_a_scan_races(monkeypatch):
+    sessions = CounterTable(2, races=1)
+    monkeypatch.setattr(dynamodb_utils, "get_table", lambda name: sessions if name == dynamodb_utils.SESSIONS_TABLE
+                        else RecordingTable(scan_pages()))
+
+    assert dynamodb_utils.reconcile_session_attendance("sess-123")['attendance_count'] == 3
+    assert [u['ExpressionAttributeValues'][':expected'] for u in sessions.updates] == [2, 3]
+
+    always_racing = CounterTable(2, races=10)
+    monkeypatch.setattr(dynamodb_utils, "get_table", lambda name: always_racing
+                        if name == dynamodb_utils.SESSIONS_TABLE else RecordingTable(scan_pages()))
+    assert dynamodb_utils.reconcile_session_attendance("sess-123") is None
+    assert len(always_racing.updates) == dynamodb_utils.RECONCILE_ATTEMPTS
+
+
+def test_reconcile_skips_recently_scanned_session(monkeypatch):
+    from datetime import datetime
+    sessions = CounterTable(2, last_scan_at=datetime.utcnow().isoformat())
+    monkeypatch.setattr(dynamodb_utils, "get_table", lambda name: sessions if name == dynamodb_utils.SESSIONS_TABLE
+                        else pytest.fail("recounted a session that is still being scanned"))
+
+    assert dynamodb_utils.reconcile_session_attendance("sess-123") == {'session_id': 'sess-123', 'skipped': True}
+    assert not sessions.updates
+
+
+def test_attendance_id_is_deterministic():
+    first = dynamodb_utils.attendance_id_for("sess-1", "stu-1")
+    assert first == dynamodb_utils.attendance_id_for("sess-1", "stu-1")
+    assert first != dynamodb_utils.attendance_id_for("sess-1", "stu-2")
+
+
+# A failed attribute_not_exists condition maps to the 409 path
+def test_create_attendance_conflict(monkeypatch):
+    from botocore.exceptions import ClientError
+
+    class ConflictTable:
+        def put_item(self, **kwargs):
+            assert kwargs['ConditionExpression'] == 'attribute_not_exists(attendance_id)'
+            raise ClientError({'Error': {'Code': 'ConditionalCheckFailedException'}}, 'PutItem')
+
+    monkeypatch.setattr(dynamodb_utils, "get_table", lambda name: ConflictTable())
+    result = dynamodb_utils.create_attendance({'attendance_id': 'a-1'})
+    assert result['statusCode'] == 409
+
+
+class ItemTable:
+    def __init__(self, item):
+        self.item = item
+        self.reads = 0
+        self.updates = []
+
+    def get_item(self, Key):
+        self.reads += 1
+        return {'Item': dict(self.item)}
+
+    def update_item(self, **kwargs):
+        self.updates.append(kwargs)
+
+
+# Read-through cache: repeat reads are served from memory until invalidated
+def test_session_cache_hits_and_invalidation(monkeypatch):
+    table = ItemTable({'session_id': 'sess-1', 'is_active': True})
+    monkeypatch.setattr(dynamodb_utils, "get_table", lambda name: table)
+    cache = dynamodb_utils._item_caches[dynamodb_utils.SESSIONS_TABLE]
+    monkeypatch.setattr(cache, "ttl", 30)
+    dynamodb_utils.clear_item_cache()
+
+    first = dynamodb_utils.get_session("sess-1")
+    first['is_active'] = False  # callers get their own copy
+    second = dynamodb_utils.get_session("sess-1")
+
+    assert second['is_active'] is True
+    assert table.reads == 1
+    assert dynamodb_utils.get_item_cache_stats()[dynamodb_utils.SESSIONS_TABLE]['hits'] == 1
+
+    dynamodb_utils.update_session("sess-1", {'end_time': '11:30'})
+    dynamodb_utils.get_session("sess-1")
+    assert table.reads == 2
+
+
+def test_item_cache_disabled_by_default(monkeypatch):
+    table = ItemTable({'class_id': 'class-1'})
+    monkeypatch.setattr(dynamodb_utils, "get_table", lambda name: table)
+    dynamodb_utils.clear_item_cache()
+
+    dynamodb_utils.get_class("class-1")
+    dynamodb_utils.get_class("class-1")
+    assert table.reads == 2
+
+
+def test_get_attendance_page_queries_one_page(monkeypatch):
+    client = FakeTable([[wire_attendance(0), wire_attendance(1)], []])
+    monkeypatch.setattr(dynamodb_utils, "get_client", lambda: client)
+
+    records, last_key = dynamodb_utils.get_attendance_page(
+        'student_class-index', {'student_id': 'stu-1', 'class_id': 'class-1'}, 2,
+        start_key={'attendance_id': {'S': 'a-9'}})
+
+    assert [r['attendance_id'] for r in records] == ['a-0', 'a-1']
+    assert last_key == {'attendance_id': 'last-0'}
+    call = client.calls[0]
+    assert len(client.calls) == 1 and call['Limit'] == 2
+    assert call['KeyConditionExpression'] == 'student_id = :k0 AND class_id = :k1'
+    assert call['ExpressionAttributeValues'] == {':k0': {'S': 'stu-1'}, ':k1': {'S': 'class-1'}}
+    assert call['ExclusiveStartKey'] == {'attendance_id': {'S': 'a-9'}}
+
+
+def test_get_attendance_page_projects_fields(monkeypatch):
+    projected = {k: v for k, v in wire_attendance(0).items() if k in ('attendance_id', 'location')}
+    client = FakeTable([[projected]])
+    monkeypatch.setattr(dynamodb_utils, "get_client", lambda: client)
+
+    records, _ = dynamodb_utils.get_attendance_page(
+        'session_id-index', {'session_id': 'sess-123'}, 10, projection=['attendance_id', 'location'])
+
+    assert records == [{'attendance_id': 'a-0', 'location': None}]
+    call = client.calls[0]
+    assert call['ProjectionExpression'] == '#p0, #p1'
+    assert call['ExpressionAttributeNames'] == {'#p0': 'attendance_id', '#p1': 'location'}
+
+
+# Export date range: scan_timestamp bounds become a FilterExpression on class_id-index
+def test_iter_attendance_models_by_class_filters_scan_range(monkeypatch):
+    client = FakeTable([[wire_attendance(0)]])
+    monkeypatch.setattr(dynamodb_utils, "get_client", lambda: client)
+
+    records = list(dynamodb_utils.iter_attendance_models_by_class(
+        "class-1", scanned_from="2025-11-01", scanned_before="2025-12-01"))
+
+    assert [r.attendance_id for r in records] == ['a-0']
+    call = client.calls[0]
+    assert call['IndexName'] == 'class_id-index'
+    assert call['FilterExpression'] == 'scan_timestamp >= :scanned_from AND scan_timestamp < :scanned_before'
+    assert call['ExpressionAttributeValues'] == {
+        ':cid': {'S': "class-1"}, ':scanned_from': {'S': "2025-11-01"}, ':scanned_before': {'S': "2025-12-01"}}
+
+
+# Deactivation bumps the epoch and publishes it; plain updates cannot deactivate
+def test_deactivate_session_publishes_revocation(monkeypatch):
+    class EpochTable(RecordingTable):
+        def update_item(self, **kwargs):
+            super().update_item(**kwargs)
+            return {'Attributes': {'activity_epoch': Decimal(3), 'qr_code_data': 'QC1.token'}}
+
+    table = EpochTable()
+    monkeypatch.setattr(dynamodb_utils, "get_table", lambda name: table)
+    monkeypatch.setattr(dynamodb_utils, "revocation_horizon", lambda qr: 1_700_000_000 if qr == 'QC1.token' else 0)
+
+    assert dynamodb_utils.deactivate_session("sess-1", "2025-11-20T10:00:00") == 3
+    assert ':false' in table.updates[0]['ExpressionAttributeValues']
+    # the session's own revocation item, each attribute only ever raised
+    assert [u['Key'] for u in table.updates[1:]] == [{'session_id': '__revoked__#sess-1'}] * 2
+    assert [u['ExpressionAttributeValues'] for u in table.updates[1:]] == [{':v': 3}, {':v': 1_700_000_000}]
+    assert table.updates[2]['ConditionExpression'] == 'attribute_not_exists(revoked_until) OR revoked_until < :v'
+
+    with pytest.raises(ValueError):
+        dynamodb_utils.update_session("sess-1", {'is_active': False})
+
+
+# Scans read only the scanned session's revocation, once per container per TTL
+def test_get_revoked_epoch_reads_one_cached_key(monkeypatch):
+    class RevocationTable:
+        def __init__(self):
+            self.keys = []
+
+        def get_item(self, Key, ProjectionExpression):
+            self.keys.append(Key['session_id'])
+            return {'Item': {'min_epoch': Decimal(2)}} if Key['session_id'] == '__revoked__#sess-1' else {}
+
+    table = RevocationTable()
+    monkeypatch.setattr(dynamodb_utils, "get_table", lambda name: table)
+    dynamodb_utils._revocation_cache.clear()
+
+    assert dynamodb_utils.get_revoked_epoch("sess-1") == 2
+    assert dynamodb_utils.get_revoked_epoch("sess-2") == 0
+    assert dynamodb_utils.get_revoked_epoch("sess-1") == 2
+    assert dynamodb_utils.get_revoked_epoch("sess-2") == 0
+    assert table.keys == ['__revoked__#sess-1', '__revoked__#sess-2']
+    dynamodb_utils._revocation_cache.clear()
@@ -0,0 +1,152 @@
+import sys
+import os
+import io
+import csv
+import json
+import pytest
+
+# Robust path handling
+LAMBDA_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'lambdas', 'export-attendance'))
+if LAMBDA_PATH not in sys.path:
+    sys.path.append(LAMBDA_PATH)
+
+import lambda_function as export_lambda
+from shared import exports, s3_utils
+from shared.models import Attendance
+
+
+class FakeS3:
+    """Keeps uploaded objects (single or multipart) and signs download URLs."""
+
+    def __init__(self):
+        self.objects = {}
+        self.parts = {}
+
+    def put_object(self, Bucket, Key, Body, ContentType, ChecksumSHA256):
+        self.objects[Key] = (Body, ContentType)
+
+    def create_multipart_upload(self, Bucket, Key, ContentType, ChecksumAlgorithm):
+        self.content_type = ContentType
+        return {"UploadId": "up-1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, ChecksumAlgorithm, ChecksumSHA256):
+        self.parts[PartNumber] = Body
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        body = b"".join(self.parts[p["PartNumber"]] for p in MultipartUpload["Parts"])
+        self.objects[Key] = (body, self.content_type)
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        return f"https://s3/{Params['Bucket']}/{Params['Key']}"
+
+
+def records(n):
+    return [Attendance(attendance_id=f"a-{i}", session_id=f"sess-{i % 3}", class_id="class-abc",
+                       student_id=f"stu-{i}", scan_timestamp=f"2025-11-20T10:00:{i % 60:02d}.000000",
+                       location={"lat": 40.5, "lng": -74.0} if i % 2 else None, device_info="iPhone")
+            for i in range(n)]
+
+
+def export_event(**body):
+    return {"httpMethod": "POST", "body": json.dumps({"class_id": "class-abc", **body})}
+
+
+@pytest.fixture
+def professor(monkeypatch, class_owners):
+    monkeypatch.setattr(export_lambda, "get_user_from_event", lambda e: {"user_id": "prof-001", "is_professor": True})
+    class_owners["class-abc"] = "prof-001"
+    fake_s3 = FakeS3()
+    monkeypatch.setattr(s3_utils, "s3_client", fake_s3)
+    return fake_s3
+
+
+# CSV: every record is streamed into one object and a download URL comes back
+def test_export_csv(monkeypatch, professor):
+    calls = []
+
+    def fake_iter(class_id, **kwargs):
+        calls.append((class_id, kwargs))
+        return iter(records(5))
+
+    monkeypatch.setattr(export_lambda, "iter_attendance_models_by_class", fake_iter)
+
+    response = export_lambda.lambda_handler(export_event(**{"from": "2025-11-01", "to": "2025-11-30"}), None)
+    body = json.loads(response["body"])
+
+    assert response["statusCode"] == 200
+    assert body["rows"] == 5 and body["format"] == "csv"
+    assert body["download_url"] == f"https://s3/{s3_utils.EXPORTS_BUCKET}/{body['key']}"
+    # to is inclusive: the filter stops before the next day
+    assert calls == [("class-abc", {"scanned_from": "2025-11-01", "scanned_before": "2025-12-01"})]
+
+    content, content_type = professor.objects[body["key"]]
+    rows = list(csv.DictReader(io.StringIO(content.decode("utf-8"))))
+    assert content_type.startswith("text/csv") and body["size"] == len(content)
+    assert [row["student_id"] for row in rows] == [f"stu-{i}" for i in range(5)]
+    assert rows[0]["location"] == "" and json.loads(rows[1]["location"]) == {"lat": 40.5, "lng": -74.0}
+
+
+def test_csv_chunks_are_bounded():
+    chunks = list(exports.iter_csv_chunks(exports.export_rows(records(200)), chunk_chars=1024))
+
+    assert len(chunks) > 10
+    assert all(len(chunk) < 1024 + 200 for chunk in chunks)
+    assert len(list(csv.reader(io.StringIO(b"".join(chunks).decode("utf-8"))))) == 201
+
+
+# Client-sent location/device_info must not become spreadsheet formulas
+def test_csv_neutralises_formula_cells():
+    record = records(1)[0]
+    record.device_info = '=HYPERLINK("http://evil","x")'
+    record.location = "@SUM(1)"
+    chunks = exports.iter_csv_chunks(exports.export_rows([record]))
+    row = list(csv.DictReader(io.StringIO(b"".join(chunks).decode("utf-8"))))[0]
+
+    assert row["device_info"] == "'=HYPERLINK(\"http://evil\",\"x\")"
+    assert row["location"] == "'@SUM(1)"
+    assert row["student_id"] == "stu-0"
+
+
+# Parquet: row groups are flushed as they are written and read back as one table
+def test_parquet_chunks_round_trip():
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    chunks = list(exports.iter_parquet_chunks(exports.export_rows(records(25)), row_group_rows=10))
+    parquet_file = pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+
+    assert len(chunks) == 4 and parquet_file.metadata.num_row_groups == 3
+    table = parquet_file.read()
+    assert table.column("student_id").to_pylist() == [f"stu-{i}" for i in range(25)]
+    assert str(table.schema.field("scan_timestamp").type) == "timestamp[us, tz=UTC]"
+
+
+def test_export_parquet_unavailable(monkeypatch, professor):
+    monkeypatch.setattr(export_lambda, "get_pyarrow", lambda: None)
+
+    response = export_lambda.lambda_handler(export_event(format="parquet"), None)
+
+    assert response["statusCode"] == 501
+    assert not professor.objects
+
+
+@pytest.mark.parametrize("body", [
+    {"format": "xlsx"},
+    {"from": "20-11-2025"},
+    {"from": "2025-11-30", "to": "2025-11-01"},
+])
+def test_export_rejects_bad_request(professor, body):
+    response = export_lambda.lambda_handler(export_event(**body), None)
+
+    assert response["statusCode"] == 400
+    assert not professor.objects
+
+
+def test_export_requires_class_owner(monkeypatch, professor, class_owners):
+    class_owners["class-abc"] = "prof-999"
+    monkeypatch.setattr(export_lambda, "iter_attendance_models_by_class",
+                        lambda *a, **k: pytest.fail("attendance read before the ownership check"))
+
+    response = export_lambda.lambda_handler(export_event(), None)
+
+    assert response["statusCode"] == 403
@@ -9,6 +9,7 @@ if LAMBDA_PATH not in sys.path:
     sys.path.append(LAMBDA_PATH)
 
 import lambda_function as analytics_lambda
+from shared.models import Attendance
 
 
 def mock_event(session_id="sess-123", username="prof-001"):
@@ -26,7 +27,7 @@ def mock_event(session_id="sess-123", username="prof-001"):
     }
 
 
-def test_get_session_analytics_success(monkeypatch):
+def test_get_session_analytics_success(monkeypatch, class_owners):
     # Mocking standard auth and DB functions
     monkeypatch.setattr(analytics_lambda, "get_user_from_event", lambda e: {"role": "professor", "id": "prof-001"})
     monkeypatch.setattr(analytics_lambda, "require_professor", lambda u: True)
@@ -35,11 +36,11 @@ def test_get_session_analytics_success(monkeypatch):
         "session_id": sid,
         "class_id": "class-abc"
     })
-    monkeypatch.setattr(analytics_lambda, "get_class", lambda cid: {"class_id": cid, "professor_id": "prof-001"})
-    monkeypatch.setattr(analytics_lambda, "get_attendance_by_session", lambda sid: [
+    class_owners["class-abc"] = "prof-001"
+    monkeypatch.setattr(analytics_lambda, "get_attendance_page", lambda index, keys, limit, start, fields=None: ([
         {"student_id": "stu-01", "scan_timestamp": "2025-11-20T10:00:00Z"},
         {"student_id": "stu-02", "scan_timestamp": "2025-11-20T10:01:00Z"}
-    ])
+    ], None))
 
     response = analytics_lambda.lambda_handler(mock_event(), None)
     body = json.loads(response["body"])
@@ -50,7 +51,7 @@ def test_get_session_analytics_success(monkeypatch):
 
 
 # Security Path: Professor attempts to get analytics for a class they DON'T own
-def test_get_session_analytics_forbidden(monkeypatch):
+def test_get_session_analytics_forbidden(monkeypatch, class_owners):
     monkeypatch.setattr(analytics_lambda, "get_user_from_event", lambda e: {"role": "professor", "id": "prof-001"})
     monkeypatch.setattr(analytics_lambda, "require_professor", lambda u: True)
     monkeypatch.setattr(analytics_lambda, "get_user_id", lambda u: u["id"])
@@ -60,9 +61,102 @@ def test_get_session_analytics_forbidden(monkeypatch):
         "class_id": "class-other"  # Different class
     })
     # Professor ID in DB does not match prof-001
-    monkeypatch.setattr(analytics_lambda, "get_class", lambda cid: {"class_id": cid, "professor_id": "prof-999"})
+    class_owners["class-other"] = "prof-999"
 
     response = analytics_lambda.lambda_handler(mock_event(), None)
     assert response["statusCode"] == 403
     body = json.loads(response["body"])
-    assert "own this class" in body["error"]
\ No newline at end of file
+    assert "own this class" in body["error"]
+
+# Class analytics: attendance is fetched once for the whole class, not per session
+def test_get_class_analytics_single_query(monkeypatch):
+    monkeypatch.setattr(analytics_lambda, "get_user_from_event", lambda e: {"role": "professor", "id": "prof-001"})
+    monkeypatch.setattr(analytics_lambda, "require_professor", lambda u: True)
+    monkeypatch.setattr(analytics_lambda, "get_user_id", lambda u: u["id"])
+    monkeypatch.setattr(analytics_lambda, "get_class", lambda cid: {
+        "class_id": cid, "class_name": "Intro", "professor_id": "prof-001"
+    })
+    monkeypatch.setattr(analytics_lambda, "get_sessions_by_class", lambda cid: [
+        {"session_id": "sess-1", "session_date": "2025-11-20", "is_active": False},
+        {"session_id": "sess-2", "session_date": "2025-11-21", "is_active": True}
+    ])
+
+    calls = []
+
+    def fake_class_attendance(cid, projection=None):
+        calls.append(cid)
+        return iter([
+            Attendance("a-1", "sess-1", cid, "stu-01", "2025-11-20T10:00:00"),
+            Attendance("a-2", "sess-1", cid, "stu-02", "2025-11-20T10:00:00"),
+            Attendance("a-3", "sess-2", cid, "stu-01", "2025-11-21T10:00:00")
+        ])
+
+    def fail_per_session(*args):
+        raise AssertionError("class analytics should not query per session")
+
+    monkeypatch.setattr(analytics_lambda, "iter_attendance_models_by_class", fake_class_attendance)
+    monkeypatch.setattr(analytics_lambda, "get_attendance_page", fail_per_session)
+
+    event = mock_event()
+    event["queryStringParameters"] = {"class_id": "class-abc"}
+    response = analytics_lambda.lambda_handler(event, None)
+    body = json.loads(response["body"])
+
+    assert response["statusCode"] == 200
+    assert calls == ["class-abc"]
+    analytics = body["analytics"]
+    assert [s["present_count"] for s in analytics["session_analytics"]] == [2, 1]
+    assert analytics["total_students"] == 2
+    assert analytics["student_attendance_rates"] == {"stu-01": 100.0, "stu-02": 50.0}
+
+
+# Counters come back from DynamoDB as Decimal; the shared encoder writes them as ints
+def test_class_summary_encodes_decimal_counters(monkeypatch):
+    from decimal import Decimal
+
+    monkeypatch.setattr(analytics_lambda, "get_user_from_event", lambda e: {"role": "professor", "id": "prof-001"})
+    monkeypatch.setattr(analytics_lambda, "require_professor", lambda u: True)
+    monkeypatch.setattr(analytics_lambda, "get_user_id", lambda u: u["id"])
+    monkeypatch.setattr(analytics_lambda, "get_classes_by_professor", lambda uid: [
+        {"class_id": "class-abc", "class_name": "Intro"}
+    ])
+    monkeypatch.setattr(analytics_lambda, "get_sessions_by_class", lambda cid: [
+        {"session_id": "sess-1", "attendance_count": Decimal(12)},
+        {"session_id": "sess-2", "attendance_count": Decimal(9)}
+    ])
+
+    event = mock_event()
+    event["queryStringParameters"] = {}
+    response = analytics_lambda.lambda_handler(event, None)
+    body = json.loads(response["body"])
+
+    assert response["statusCode"] == 200
+    assert response["headers"] == analytics_lambda.CORS_HEADERS
+    assert body["classes"] == [{"class_id": "class-abc", "class_name": "Intro",
+                                "total_sessions": 2, "total_attendance_records": 21}]
+
+
+# Sessions without a counter: the class total is a COUNT query, not a read of every record
+def test_class_summary_counts_without_reading_records(monkeypatch):
+    monkeypatch.setattr(analytics_lambda, "get_user_from_event", lambda e: {"role": "professor", "id": "prof-001"})
+    monkeypatch.setattr(analytics_lambda, "require_professor", lambda u: True)
+    monkeypatch.setattr(analytics_lambda, "get_user_id", lambda u: u["id"])
+    monkeypatch.setattr(analytics_lambda, "get_classes_by_professor", lambda uid: [
+        {"class_id": "class-abc", "class_name": "Intro"}
+    ])
+    monkeypatch.setattr(analytics_lambda, "get_sessions_by_class", lambda cid: [
+        {"session_id": "sess-1", "attendance_count": 12},
+        {"session_id": "sess-2"}
+    ])
+    counted = []
+    monkeypatch.setattr(analytics_lambda, "get_attendance_count",
+                        lambda index, keys: counted.append((index, keys)) or 40)
+    monkeypatch.setattr(analytics_lambda, "iter_attendance_models_by_class",
+                        lambda *a, **kw: pytest.fail("summary read attendance records"))
+
+    event = mock_event()
+    event["queryStringParameters"] = {}
+    body = json.loads(analytics_lambda.lambda_handler(event, None)["body"])
+
+    assert counted == [("class_id-index", {"class_id": "class-abc"})]
+    assert body["classes"][0]["total_attendance_records"] == 40
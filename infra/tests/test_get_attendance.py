@@ -9,6 +9,7 @@ if LAMBDA_PATH not in sys.path:
     sys.path.append(LAMBDA_PATH)
 
 import lambda_function as attendance_lambda
+from shared import pagination
 
 
 def mock_event(session_id="sess-123"):
@@ -26,7 +27,7 @@ def mock_event(session_id="sess-123"):
     }
 
 
-def test_professor_get_attendance_success(monkeypatch):
+def test_professor_get_attendance_success(monkeypatch, class_owners):
     # Mock Identity Enrichment
     # This prevents the test from trying to connect to real Cognito
     monkeypatch.setattr(attendance_lambda, "get_email_from_sub", lambda sub: f"{sub}@example.com")
@@ -37,11 +38,11 @@ def test_professor_get_attendance_success(monkeypatch):
     monkeypatch.setattr(attendance_lambda, "require_student", lambda u: False)
     monkeypatch.setattr(attendance_lambda, "get_user_id", lambda u: u["id"])
     monkeypatch.setattr(attendance_lambda, "get_session", lambda sid: {"session_id": sid, "class_id": "class-abc"})
-    monkeypatch.setattr(attendance_lambda, "get_class", lambda cid: {"class_id": cid, "professor_id": "prof-001"})
-    monkeypatch.setattr(attendance_lambda, "get_attendance_by_session", lambda sid: [
+    class_owners["class-abc"] = "prof-001"
+    monkeypatch.setattr(attendance_lambda, "get_attendance_page", lambda index, keys, limit, start, fields=None: ([
         {"student_id": "stu-001"},
         {"student_id": "stu-002"}
-    ])
+    ], None))
 
     response = attendance_lambda.lambda_handler(mock_event(), None)
     body = json.loads(response["body"])
@@ -54,7 +55,7 @@ def test_professor_get_attendance_success(monkeypatch):
     assert body["total_present"] == 2
 
 
-def test_professor_get_attendance_unauthorized(monkeypatch):
+def test_professor_get_attendance_unauthorized(monkeypatch, class_owners):
     # Simulate a professor trying to access a session for a class they don't own
     monkeypatch.setattr(attendance_lambda, "get_user_from_event", lambda e: {"role": "professor", "id": "prof-001"})
     monkeypatch.setattr(attendance_lambda, "require_professor", lambda u: True)
@@ -62,7 +63,158 @@ def test_professor_get_attendance_unauthorized(monkeypatch):
     monkeypatch.setattr(attendance_lambda, "get_session", lambda sid: {"session_id": sid, "class_id": "class-abc"})
 
     # Mock class owned by someone else
-    monkeypatch.setattr(attendance_lambda, "get_class", lambda cid: {"class_id": cid, "professor_id": "diff-prof-999"})
+    class_owners["class-abc"] = "diff-prof-999"
 
     response = attendance_lambda.lambda_handler(mock_event(), None)
-    assert response["statusCode"] == 403
\ No newline at end of file
+    assert response["statusCode"] == 403
+
+class FakeCognito:
+    def __init__(self):
+        self.calls = []
+
+    def admin_get_user(self, UserPoolId, Username):
+        self.calls.append(Username)
+        return {"UserAttributes": [{"Name": "email", "Value": f"{Username}@school.edu"}]}
+
+
+# Identity resolution: duplicates collapse to one lookup and warm calls hit the cache
+def test_resolve_student_emails_dedupes_and_caches(monkeypatch):
+    fake = FakeCognito()
+    monkeypatch.setattr(attendance_lambda, "cognito", fake)
+    attendance_lambda._email_cache.clear()
+
+    records = [{"student_id": "stu-001"}, {"student_id": "stu-002"}, {"student_id": "stu-001"}]
+    attendance_lambda.attach_student_emails(records)
+
+    assert [r["student_email"] for r in records] == [
+        "stu-001@school.edu", "stu-002@school.edu", "stu-001@school.edu"
+    ]
+    assert sorted(fake.calls) == ["stu-001", "stu-002"]
+
+    attendance_lambda.resolve_student_emails(["stu-001", "stu-002"])
+    assert len(fake.calls) == 2
+
+
+# Everything cached: no thread pool and no Cognito call
+def test_resolve_student_emails_all_cached(monkeypatch):
+    monkeypatch.setattr(attendance_lambda, "cognito", FakeCognito())
+    monkeypatch.setattr(attendance_lambda, "ThreadPoolExecutor",
+                        lambda **k: pytest.fail("thread pool started for cached emails"))
+    attendance_lambda._email_cache.clear()
+    attendance_lambda._email_cache.set("stu-001", "one@school.edu")
+
+    assert attendance_lambda.resolve_student_emails(["stu-001", None, "stu-001"]) == {"stu-001": "one@school.edu"}
+
+
+# Misses are looked up one user at a time, at most MAX_EMAIL_LOOKUPS per request
+def test_resolve_student_emails_caps_lookups(monkeypatch):
+    fake = FakeCognito()
+    monkeypatch.setattr(attendance_lambda, "cognito", fake)
+    monkeypatch.setattr(attendance_lambda, "MAX_EMAIL_LOOKUPS", 3)
+    attendance_lambda._email_cache.clear()
+    subs = [f"stu-{n}" for n in range(5)]
+
+    first = attendance_lambda.resolve_student_emails(subs)
+    assert sorted(fake.calls) == ["stu-0", "stu-1", "stu-2"]
+    assert first["stu-2"] == "stu-2@school.edu" and first["stu-4"] == "stu-4"
+
+    # deferred subs are not cached as themselves: the next request resolves them
+    second = attendance_lambda.resolve_student_emails(subs)
+    assert sorted(fake.calls) == subs
+    assert second["stu-4"] == "stu-4@school.edu"
+
+
+# Cursor pagination: next_token carries the page's LastEvaluatedKey, signed and scoped to the class
+def test_class_attendance_pages_with_signed_token(monkeypatch, class_owners):
+    monkeypatch.setattr(pagination, "PAGE_TOKEN_SECRET", "test-secret")
+    monkeypatch.setattr(attendance_lambda, "get_user_from_event", lambda e: {"id": "prof-001", "is_professor": True})
+    monkeypatch.setattr(attendance_lambda, "require_professor", lambda u: True)
+    monkeypatch.setattr(attendance_lambda, "require_student", lambda u: False)
+    monkeypatch.setattr(attendance_lambda, "get_user_id", lambda u: u["id"])
+    monkeypatch.setattr(attendance_lambda, "attach_student_emails", lambda records: None)
+    class_owners.update({"class-abc": "prof-001", "class-xyz": "prof-001"})
+
+    records = [{"attendance_id": f"a-{n}", "student_id": f"stu-{n}"} for n in range(5)]
+    calls = []
+
+    def fake_page(index, keys, limit, start_key, fields=None):
+        calls.append((index, keys, limit, start_key))
+        offset = int(start_key["attendance_id"]["S"][2:]) + 1 if start_key else 0
+        page = records[offset:offset + limit]
+        last = {"attendance_id": {"S": page[-1]["attendance_id"]}} if offset + limit < len(records) else None
+        return page, last
+
+    monkeypatch.setattr(attendance_lambda, "get_attendance_page", fake_page)
+    monkeypatch.setattr(attendance_lambda, "get_sessions_by_class", lambda class_id: [{"attendance_count": 5}])
+
+    def get(**params):
+        event = {"httpMethod": "GET", "queryStringParameters": params}
+        response = attendance_lambda.lambda_handler(event, None)
+        return response["statusCode"], json.loads(response["body"])
+
+    status, first = get(class_id="class-abc", limit="3")
+    assert status == 200 and [r["attendance_id"] for r in first["attendance_records"]] == ["a-0", "a-1", "a-2"]
+
+    status, second = get(class_id="class-abc", limit="3", next_token=first["next_token"])
+    assert [r["attendance_id"] for r in second["attendance_records"]] == ["a-3", "a-4"]
+    assert second["next_token"] is None
+    assert calls[1] == ("class_id-index", {"class_id": "class-abc"}, 3, {"attendance_id": {"S": "a-2"}})
+
+    # tampered, replayed on another class, or an out-of-range limit
+    payload, signature = first["next_token"].split(".")
+    assert get(class_id="class-abc", next_token=payload[:-2] + "AA." + signature)[0] == 400
+    assert get(class_id="class-xyz", next_token=first["next_token"])[0] == 400
+    assert get(class_id="class-abc", limit="0")[0] == 400
+    assert len(calls) == 2
+
+
+# total_present counts the whole query on every page, not the page that was returned
+@pytest.mark.parametrize("params, sessions, expected_counts", [
+    ({"class_id": "class-abc"}, [{"attendance_count": 3}, {"attendance_count": 2}], []),
+    ({"class_id": "class-abc"}, [{"attendance_count": 3}, {}],
+     [("class_id-index", {"class_id": "class-abc"})]),
+    ({"class_id": "class-abc", "student_id": "stu-001"}, [],
+     [("student_class-index", {"student_id": "stu-001", "class_id": "class-abc"})]),
+    ({"student_id": "stu-001"}, [], [("student_id-index", {"student_id": "stu-001"})]),
+])
+def test_total_present_spans_page_boundary(monkeypatch, class_owners, params, sessions, expected_counts):
+    monkeypatch.setattr(pagination, "PAGE_TOKEN_SECRET", "test-secret")
+    monkeypatch.setattr(attendance_lambda, "get_user_from_event", lambda e: {"id": "prof-001", "is_professor": True})
+    monkeypatch.setattr(attendance_lambda, "require_professor", lambda u: True)
+    monkeypatch.setattr(attendance_lambda, "require_student", lambda u: False)
+    monkeypatch.setattr(attendance_lambda, "get_user_id", lambda u: u["id"])
+    monkeypatch.setattr(attendance_lambda, "attach_student_emails", lambda records: None)
+    monkeypatch.setattr(attendance_lambda, "get_email_from_sub", lambda sub: f"{sub}@school.edu")
+    monkeypatch.setattr(attendance_lambda, "get_sessions_by_class", lambda class_id: sessions)
+    class_owners["class-abc"] = "prof-001"
+
+    records = [{"attendance_id": f"a-{n}", "student_id": "stu-001"} for n in range(5)]
+    counts = []
+
+    def fake_page(index, keys, limit, start_key, fields=None):
+        offset = int(start_key["attendance_id"]["S"][2:]) + 1 if start_key else 0
+        page = records[offset:offset + limit]
+        last = {"attendance_id": {"S": page[-1]["attendance_id"]}} if offset + limit < len(records) else None
+        return page, last
+
+    def fake_count(index, keys):
+        counts.append((index, keys))
+        return len(records)
+
+    monkeypatch.setattr(attendance_lambda, "get_attendance_page", fake_page)
+    monkeypatch.setattr(attendance_lambda, "get_attendance_count", fake_count)
+
+    def get(**extra):
+        event = {"httpMethod": "GET", "queryStringParameters": {**params, **extra}}
+        return json.loads(attendance_lambda.lambda_handler(event, None)["body"])
+
+    first = get(limit="3")
+    second = get(limit="3", next_token=first["next_token"])
+
+    assert len(first["attendance_records"]) == 3 and len(second["attendance_records"]) == 2
+    assert first["total_present"] == second["total_present"] == 5
+    assert counts == expected_counts * 2
+
+    # one page holding everything is counted without another query
+    assert get(limit="10")["total_present"] == 5
+    assert len(counts) == len(expected_counts) * 2
@@ -0,0 +1,44 @@
+import json
+from decimal import Decimal
+import pytest
+
+from shared import json_utils
+
+ITEM = {
+    "session_id": "sess-1",
+    "attendance_count": Decimal("12"),
+    "ratio": Decimal("0.25"),
+    "tags": {"a"},
+    "scans": [{"n": Decimal("3")}, {"n": Decimal("4.5")}],
+}
+
+
+def test_from_dynamodb_converts_in_one_walk():
+    item = json_utils.from_dynamodb(ITEM)
+
+    assert item == {"session_id": "sess-1", "attendance_count": 12, "ratio": 0.25,
+                    "tags": ["a"], "scans": [{"n": 3}, {"n": 4.5}]}
+    assert type(item["attendance_count"]) is int
+    # the boto3 item is left untouched
+    assert ITEM["scans"][0]["n"] == Decimal("3")
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_encodes_leftover_decimals(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(json_utils, "_orjson", False)
+    elif json_utils.get_orjson() is None:
+        pytest.skip("orjson is not installed")
+
+    body = json_utils.dumps({"count": Decimal("5"), "rate": Decimal("0.5"), "name": "Intro"})
+
+    assert json.loads(body) == {"count": 5, "rate": 0.5, "name": "Intro"}
+
+
+def test_json_response_encodes_body_once():
+    headers = {"Access-Control-Allow-Origin": "*"}
+    response = json_utils.json_response(200, {"records": [ITEM]}, headers)
+
+    assert response["statusCode"] == 200
+    assert response["headers"] is headers
+    assert json.loads(response["body"])["records"][0]["attendance_count"] == 12
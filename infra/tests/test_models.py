@@ -0,0 +1,44 @@
+from decimal import Decimal
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+from shared import models
+from shared.json_utils import from_dynamodb
+
+ATTENDANCE = {
+    "attendance_id": "a-1", "session_id": "sess-1", "class_id": "class-1", "student_id": "stu-1",
+    "scan_timestamp": "2025-11-20T10:00:00",
+    "location": {"lat": Decimal("40.7128"), "lng": Decimal("-74"), "tags": ["gps"]},
+    "device_info": None,
+}
+
+
+def wire(item):
+    serializer = TypeSerializer()
+    return {k: serializer.serialize(v) for k, v in item.items()}
+
+
+# The hand-written converters agree with boto3's TypeDeserializer + from_dynamodb
+def test_attendance_from_item_matches_resource_path():
+    deserializer = TypeDeserializer()
+    item = wire(ATTENDANCE)
+
+    record = models.Attendance.from_item(item)
+    expected = from_dynamodb({k: deserializer.deserialize(v) for k, v in item.items()})
+
+    assert record.to_dict() == expected
+    assert record.location == {"lat": 40.7128, "lng": -74, "tags": ["gps"]}
+
+
+def test_to_item_round_trips_and_omits_missing_attributes():
+    record = models.Attendance("a-1", "sess-1", "class-1", "stu-1", "2025-11-20T10:00:00", location={"lat": 1.5})
+    item = record.to_item()
+
+    assert "device_info" not in item
+    assert models.Attendance.from_item(item) == record
+
+
+def test_models_are_slotted():
+    record = models.Attendance.from_item(wire(ATTENDANCE))
+    assert not hasattr(record, "__dict__")
+    assert models.decode_number("12") == 12 and models.decode_number("1.5") == 1.5
+    assert models.decode_number("1E+1") == 10
@@ -0,0 +1,73 @@
+import pytest
+
+from shared import pagination
+
+KEY = {"attendance_id": {"S": "a-2"}, "class_id": {"S": "class-abc"}}
+
+
+def test_token_round_trips_within_its_scope():
+    token = pagination.encode_page_token(KEY, "attendance:class_id-index:class-abc", secret="s1")
+
+    assert pagination.decode_page_token(token, "attendance:class_id-index:class-abc", secret="s1") == KEY
+    assert pagination.encode_page_token(None, "any", secret="s1") is None
+
+
+@pytest.mark.parametrize("mangle, scope, secret", [
+    (lambda t: t, "attendance:class_id-index:class-other", "s1"),   # replayed on another query
+    (lambda t: t, "attendance:class_id-index:class-abc", "s2"),     # signed with another key
+    (lambda t: "x" + t, "attendance:class_id-index:class-abc", "s1"),
+    (lambda t: t.split(".")[0], "attendance:class_id-index:class-abc", "s1"),
+])
+def test_rejects_foreign_or_tampered_tokens(mangle, scope, secret):
+    token = pagination.encode_page_token(KEY, "attendance:class_id-index:class-abc", secret="s1")
+    with pytest.raises(pagination.PageRequestError):
+        pagination.decode_page_token(mangle(token), scope, secret=secret)
+
+
+def test_page_params_limits(monkeypatch):
+    monkeypatch.setattr(pagination, "DEFAULT_PAGE_SIZE", 50)
+    monkeypatch.setattr(pagination, "MAX_PAGE_SIZE", 100)
+
+    # no limit and no cursor: an unpaged client gets everything
+    assert pagination.page_params(None, "scope") == (None, None)
+    assert pagination.page_params({"limit": "20"}, "scope") == (20, None)
+    monkeypatch.setattr(pagination, "PAGE_TOKEN_SECRET", "s1")
+    token = pagination.encode_page_token(KEY, "scope")
+    assert pagination.page_params({"next_token": token}, "scope") == (50, KEY)
+    for bad in ("0", "101", "ten"):
+        with pytest.raises(pagination.PageRequestError):
+            pagination.page_params({"limit": bad}, "scope")
+
+
+# No key configured: nothing is issued or accepted, and the QR signing key is never reused
+def test_fails_closed_without_page_token_secret(monkeypatch):
+    from shared import secret_utils
+
+    monkeypatch.setattr(pagination, "PAGE_TOKEN_SECRET", "")
+    monkeypatch.delenv("PAGE_TOKEN_SECRET_ARN", raising=False)
+    monkeypatch.setenv("QR_SIGNING_SECRET", "qr-key")
+    secret_utils.clear_secret_cache()
+    token = pagination.encode_page_token(KEY, "scope", secret="qr-key")
+
+    with pytest.raises(ValueError):
+        pagination.encode_page_token(KEY, "scope")
+    with pytest.raises(pagination.PageRequestError):
+        pagination.decode_page_token(token, "scope")
+
+
+def test_page_token_secret_fetched_from_secrets_manager(monkeypatch):
+    from shared import aws_clients, secret_utils
+
+    class FakeSecretsManager:
+        def get_secret_value(self, SecretId):
+            assert SecretId == "arn:aws:secretsmanager:us-east-1:123:secret:page"
+            return {"SecretString": "page-key"}
+
+    monkeypatch.setattr(pagination, "PAGE_TOKEN_SECRET", "")
+    monkeypatch.setenv("PAGE_TOKEN_SECRET_ARN", "arn:aws:secretsmanager:us-east-1:123:secret:page")
+    monkeypatch.setattr(aws_clients, "_clients", {"secretsmanager": FakeSecretsManager()})
+    secret_utils.clear_secret_cache()
+
+    token = pagination.encode_page_token(KEY, "scope")
+    assert pagination.decode_page_token(token, "scope", secret="page-key") == KEY
+    secret_utils.clear_secret_cache()
@@ -1,15 +1,8 @@
 import pytest
 from datetime import datetime, timedelta
 import json
-import sys
-import os
 
-# Ensuring path to shared utilities
-SHARED_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'lambdas', 'shared'))
-if SHARED_PATH not in sys.path:
-    sys.path.append(SHARED_PATH)
-
-from qr_generator import validate_qr_code_data
+from shared.qr_generator import validate_qr_code_data
 
 # Valid Flow
 def test_valid_qr_code():
@@ -49,4 +42,196 @@ def test_incomplete_qr_data():
 def test_invalid_json_format():
     qr_string = "not-a-json-string-but-a-spoof-attempt"
     result = validate_qr_code_data(qr_string)
-    assert result is None
\ No newline at end of file
+    assert result is None
+
+from shared import qr_generator
+
+SECRET = "test-signing-secret"
+
+
+def signed_token(minutes=10, activity_epoch=0, secret=SECRET):
+    qr_data = qr_generator.generate_qr_code_data(
+        "0b8f6c52-2a57-4c1e-9f0e-3d7a1b2c4d5e", "class-abc", minutes, activity_epoch)
+    return qr_generator.encode_qr_token(qr_data, secret=secret)
+
+
+# Signed Flow: compact token verifies locally and round-trips its fields
+def test_signed_token_round_trip(monkeypatch):
+    monkeypatch.setattr(qr_generator, "QR_SIGNING_SECRET", SECRET)
+    token = signed_token(activity_epoch=3)
+
+    result = validate_qr_code_data(token)
+    assert result["session_id"] == "0b8f6c52-2a57-4c1e-9f0e-3d7a1b2c4d5e"
+    assert result["class_id"] == "class-abc"
+    assert result["activity_epoch"] == 3
+    assert result["signed"] is True
+    # smaller than the JSON payload it replaces
+    assert len(token) < len(json.dumps(qr_generator.generate_qr_code_data("0b8f6c52-2a57-4c1e-9f0e-3d7a1b2c4d5e", "class-abc")))
+
+
+# Tamper Flow: a token signed with another key is rejected
+def test_signed_token_wrong_secret(monkeypatch):
+    monkeypatch.setattr(qr_generator, "QR_SIGNING_SECRET", SECRET)
+    assert validate_qr_code_data(signed_token(secret="attacker-secret")) is None
+
+
+def test_signed_token_expired(monkeypatch):
+    monkeypatch.setattr(qr_generator, "QR_SIGNING_SECRET", SECRET)
+    assert validate_qr_code_data(signed_token(minutes=-1)) is None
+
+
+# Pre-generated Flow: a code for a future session is refused until its window opens
+def test_signed_token_not_yet_valid(monkeypatch):
+    monkeypatch.setattr(qr_generator, "QR_SIGNING_SECRET", SECRET)
+    now = datetime.utcnow()
+    future = qr_generator.generate_qr_code_data(
+        "sess-123", "class-abc",
+        valid_from=now + timedelta(days=7), expires_at=now + timedelta(days=7, hours=1))
+    current = qr_generator.generate_qr_code_data(
+        "sess-123", "class-abc",
+        valid_from=now - timedelta(minutes=5), expires_at=now + timedelta(hours=1))
+
+    assert validate_qr_code_data(qr_generator.encode_qr_token(future)) is None
+    result = validate_qr_code_data(qr_generator.encode_qr_token(current))
+    assert result["valid_from"] == current["valid_from"]
+    assert result["expiry"] == current["expiry"]
+
+
+# Revocation Flow: tokens from before the session's current activity epoch are refused
+def test_signed_token_revoked(monkeypatch):
+    monkeypatch.setattr(qr_generator, "QR_SIGNING_SECRET", SECRET)
+    token = signed_token(activity_epoch=0)
+    revoked = {"0b8f6c52-2a57-4c1e-9f0e-3d7a1b2c4d5e": 1}.get
+
+    assert validate_qr_code_data(token, revoked_epoch=revoked) is None
+    assert validate_qr_code_data(signed_token(activity_epoch=1), revoked_epoch=revoked) is not None
+    # a forged token is rejected before the revocation lookup
+    assert validate_qr_code_data(token[:-2] + "AA", revoked_epoch=lambda sid: pytest.fail("looked up")) is None
+
+
+# A revocation only has to outlive the stored static code and the live rotating windows
+def test_revocation_horizon(monkeypatch):
+    monkeypatch.setattr(qr_generator, "QR_SIGNING_SECRET", SECRET)
+    now = datetime.utcnow().replace(microsecond=0)
+    rotating_horizon = (qr_generator.current_rotation_window() + 2) * qr_generator.ROTATION_WINDOW_SECONDS
+    static = qr_generator.encode_qr_token(qr_generator.generate_qr_code_data(
+        "sess-123", "class-abc", expires_at=now + timedelta(hours=3)))
+
+    assert qr_generator.revocation_horizon(None) == rotating_horizon
+    assert qr_generator.revocation_horizon(static) == qr_generator._to_epoch((now + timedelta(hours=3)).isoformat())
+    assert qr_generator.revocation_horizon('{"session_id": "sess-123"}') == rotating_horizon
+
+
+# Rotating Flow: current and previous windows are accepted, older ones are not
+def test_rotating_token_windows(monkeypatch):
+    monkeypatch.setattr(qr_generator, "QR_SIGNING_SECRET", SECRET)
+    now = 60000
+    monkeypatch.setattr(qr_generator, "current_rotation_window", lambda now=None: 60000)
+
+    def token(window):
+        return qr_generator.encode_rotating_token("sess-123", "class-abc", window=window)
+
+    current = validate_qr_code_data(token(now))
+    assert current["session_id"] == "sess-123"
+    assert current["rotating"] is True
+    assert validate_qr_code_data(token(now - 1)) is not None
+    assert validate_qr_code_data(token(now - 2)) is None
+
+
+def test_rotating_token_wrong_session_key(monkeypatch):
+    monkeypatch.setattr(qr_generator, "QR_SIGNING_SECRET", SECRET)
+    token = qr_generator.encode_rotating_token("sess-123", "class-abc", secret="other-secret")
+    assert validate_qr_code_data(token) is None
+
+
+def test_rotating_code_needs_no_upload(monkeypatch):
+    monkeypatch.setattr(qr_generator, "QR_SIGNING_SECRET", SECRET)
+    monkeypatch.setattr(qr_generator, "put_qr_image",
+                        lambda *a: pytest.fail("rotating codes must not be uploaded"))
+
+    code = qr_generator.get_rotating_qr_code("sess-123", "class-abc")
+    assert code["window_seconds"] == qr_generator.ROTATION_WINDOW_SECONDS
+    assert validate_qr_code_data(code["qr_data"])["class_id"] == "class-abc"
+
+
+# Renderers: PNG, SVG and matrix output all come from the same cached matrix
+def test_renderers_share_matrix():
+    qr_string = "QC1.renderer-test-payload"
+    matrix = qr_generator.build_qr_matrix(qr_string)
+    assert qr_generator.build_qr_matrix(qr_string) is matrix
+
+    png = qr_generator.render_qr_image(qr_string, "png")
+    svg = qr_generator.render_qr_image(qr_string, "svg")
+    raw = json.loads(qr_generator.render_qr_image(qr_string, "matrix"))
+
+    assert png.startswith(b"\x89PNG")
+    assert svg.startswith(b"<svg")
+    assert raw["size"] == len(matrix)
+    assert raw["rows"][0] == "".join("1" if dark else "0" for dark in matrix[0])
+
+    with pytest.raises(ValueError):
+        qr_generator.render_qr_image(qr_string, "gif")
+
+
+class FakeS3:
+    def __init__(self, existing=()):
+        self.objects = set(existing)
+        self.heads = 0
+        self.puts = []
+
+    def head_object(self, Bucket, Key):
+        from botocore.exceptions import ClientError
+        self.heads += 1
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        return {}
+
+    def put_object(self, **kwargs):
+        self.objects.add(kwargs["Key"])
+        self.puts.append(kwargs)
+
+
+# Content addressing: identical payloads are rendered and uploaded once
+def test_store_qr_image_is_content_addressed(monkeypatch):
+    fake_s3 = FakeS3()
+    monkeypatch.setattr(qr_generator, "s3_client", fake_s3)
+    qr_generator._stored_keys.clear()
+
+    url = qr_generator.store_qr_image("payload-a", "svg")
+    assert qr_generator.store_qr_image("payload-a", "svg") == url
+    assert url.endswith(qr_generator.qr_image_key("payload-a", "svg"))
+    assert len(fake_s3.puts) == 1 and fake_s3.heads == 1
+    assert fake_s3.puts[0]["ContentType"] == "image/svg+xml"
+
+    # another container finds the object with a HEAD and skips rendering
+    qr_generator._stored_keys.clear()
+    monkeypatch.setattr(qr_generator, "render_qr_image", lambda *a: pytest.fail("must not re-render"))
+    assert qr_generator.store_qr_image("payload-a", "svg") == url
+    assert len(fake_s3.puts) == 1
+
+    assert qr_generator.qr_image_key("payload-b", "svg") != qr_generator.qr_image_key("payload-a", "svg")
+    assert qr_generator.qr_image_key("payload-a", "png") != qr_generator.qr_image_key("payload-a", "svg")
+
+
+# Deployed key: read once from Secrets Manager by ARN, never from the environment
+def test_signing_secret_fetched_from_secrets_manager(monkeypatch):
+    from shared import aws_clients, secret_utils
+
+    class FakeSecretsManager:
+        calls = 0
+
+        def get_secret_value(self, SecretId):
+            FakeSecretsManager.calls += 1
+            assert SecretId == "arn:aws:secretsmanager:us-east-1:123:secret:qr"
+            return {"SecretString": SECRET}
+
+    monkeypatch.setattr(qr_generator, "QR_SIGNING_SECRET", "")
+    monkeypatch.setenv("QR_SIGNING_SECRET_ARN", "arn:aws:secretsmanager:us-east-1:123:secret:qr")
+    monkeypatch.setattr(aws_clients, "_clients", {"secretsmanager": FakeSecretsManager()})
+    secret_utils.clear_secret_cache()
+
+    token = qr_generator.encode_qr_payload(qr_generator.generate_qr_code_data("sess-1", "class-abc"))
+    assert token.startswith(qr_generator.SIGNED_TOKEN_PREFIX)
+    assert validate_qr_code_data(token)["session_id"] == "sess-1"
+    assert FakeSecretsManager.calls == 1
+    secret_utils.clear_secret_cache()
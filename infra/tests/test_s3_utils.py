@@ -0,0 +1,165 @@
+import os
+import base64
+import hashlib
+import pytest
+
+from shared import s3_utils
+
+
+class FakeS3:
+    """Records uploads and checks every part checksum like S3 does."""
+
+    def __init__(self, fail_part=None):
+        self.fail_part = fail_part
+        self.parts = {}
+        self.objects = {}
+        self.aborted = []
+
+    def put_object(self, Bucket, Key, Body, ContentType, ChecksumSHA256):
+        assert ChecksumSHA256 == base64.b64encode(hashlib.sha256(Body).digest()).decode()
+        self.objects[Key] = Body
+
+    def create_multipart_upload(self, **kwargs):
+        assert kwargs["ChecksumAlgorithm"] == "SHA256"
+        return {"UploadId": "up-1"}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, ChecksumAlgorithm, ChecksumSHA256):
+        from botocore.exceptions import ClientError
+        if PartNumber == self.fail_part:
+            raise ClientError({"Error": {"Code": "InternalError"}}, "UploadPart")
+        assert ChecksumSHA256 == base64.b64encode(hashlib.sha256(Body).digest()).decode()
+        self.parts[PartNumber] = Body
+        return {"ETag": f"etag-{PartNumber}"}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        numbers = [p["PartNumber"] for p in MultipartUpload["Parts"]]
+        assert numbers == sorted(self.parts)
+        self.objects[Key] = b"".join(self.parts[n] for n in numbers)
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.aborted.append(UploadId)
+
+
+# Chunked decode: whitespace and chunk boundaries do not change the output
+def test_iter_base64_chunks_matches_b64decode():
+    data = os.urandom(10_000)
+    text = base64.encodebytes(data).decode()  # MIME line breaks every 76 chars
+
+    assert b"".join(s3_utils.iter_base64_chunks(text, chunk_chars=100)) == data
+
+    with pytest.raises(ValueError):
+        list(s3_utils.iter_base64_chunks("not*base64!", chunk_chars=4))
+
+
+# Streaming upload: parts reassemble to the original bytes
+def test_upload_base64_stream_multipart(monkeypatch):
+    fake_s3 = FakeS3()
+    monkeypatch.setattr(s3_utils, "s3_client", fake_s3)
+    data = os.urandom(10_500)
+
+    result = s3_utils.upload_base64_stream("bucket", "lectures/s/x.zip", base64.b64encode(data).decode(),
+                                           part_size=1024, max_workers=3)
+
+    assert result == {"key": "lectures/s/x.zip", "size": 10_500, "parts": 11}
+    assert fake_s3.objects["lectures/s/x.zip"] == data
+    assert all(len(fake_s3.parts[n]) == 1024 for n in range(1, 11))
+
+
+def test_upload_base64_stream_single_part(monkeypatch):
+    fake_s3 = FakeS3()
+    monkeypatch.setattr(s3_utils, "s3_client", fake_s3)
+
+    result = s3_utils.upload_base64_stream("bucket", "k", base64.b64encode(b"small").decode(), part_size=1024)
+
+    assert result["parts"] == 1 and fake_s3.objects["k"] == b"small"
+    assert not fake_s3.parts
+
+
+def test_upload_base64_stream_aborts_on_failure(monkeypatch):
+    fake_s3 = FakeS3(fail_part=2)
+    monkeypatch.setattr(s3_utils, "s3_client", fake_s3)
+
+    result = s3_utils.upload_base64_stream("bucket", "k", base64.b64encode(os.urandom(4096)).decode(),
+                                           part_size=1024)
+
+    assert result is None
+    assert fake_s3.aborted == ["up-1"] and "k" not in fake_s3.objects
+
+
+# Generic stream: uneven chunks are re-cut into full parts; a failing producer aborts the upload
+def test_upload_stream_recuts_chunks(monkeypatch):
+    fake_s3 = FakeS3()
+    monkeypatch.setattr(s3_utils, "s3_client", fake_s3)
+    chunks = [os.urandom(n) for n in (300, 2000, 7, 1500)]
+
+    result = s3_utils.upload_stream("bucket", "exports/c/a.csv", iter(chunks), "text/csv", part_size=1024)
+
+    assert result == {"key": "exports/c/a.csv", "size": 3807, "parts": 4}
+    assert fake_s3.objects["exports/c/a.csv"] == b"".join(chunks)
+
+
+def test_upload_stream_aborts_when_producer_fails(monkeypatch):
+    fake_s3 = FakeS3()
+    monkeypatch.setattr(s3_utils, "s3_client", fake_s3)
+
+    def chunks():
+        yield os.urandom(3000)
+        raise RuntimeError("query failed")
+
+    with pytest.raises(RuntimeError):
+        s3_utils.upload_stream("bucket", "k", chunks(), "text/csv", part_size=1024)
+    assert fake_s3.aborted == ["up-1"] and "k" not in fake_s3.objects
+
+
+class SigningS3:
+    def __init__(self):
+        self.signed = []
+        self.deleted = []
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        self.signed.append((Params["Key"], ExpiresIn))
+        return f"https://s3/{Params['Key']}?sig={len(self.signed)}"
+
+    def delete_object(self, Bucket, Key):
+        self.deleted.append(Key)
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+# Presign cache: one signature per key, expiry and issue-time bucket
+def test_presigned_url_reused_within_bucket(monkeypatch):
+    fake_s3, clock = SigningS3(), FakeClock(1_000_000.0)
+    monkeypatch.setattr(s3_utils, "s3_client", fake_s3)
+    monkeypatch.setattr(s3_utils, "time", clock)
+    monkeypatch.setattr(s3_utils, "PRESIGN_BUCKET_SECONDS", 300)
+    s3_utils._presign_cache.clear()
+
+    first = s3_utils.get_presigned_url("bucket", "lectures/s/a.zip", 86400)
+    clock.now += 100
+    assert s3_utils.get_presigned_url("bucket", "lectures/s/a.zip", 86400) == first
+    # signed one bucket longer so a URL handed out late in the bucket still lasts the full expiry
+    assert fake_s3.signed == [("lectures/s/a.zip", 86700)]
+
+    assert s3_utils.get_presigned_url("bucket", "lectures/s/a.zip", 3600) != first
+    clock.now += 300
+    assert s3_utils.get_presigned_url("bucket", "lectures/s/a.zip", 86400) != first
+
+
+def test_presigned_url_evicted_on_delete(monkeypatch):
+    fake_s3 = SigningS3()
+    monkeypatch.setattr(s3_utils, "s3_client", fake_s3)
+    s3_utils._presign_cache.clear()
+
+    first = s3_utils.get_presigned_url("bucket", "lectures/s/a.zip")
+    s3_utils.get_presigned_url("bucket", "lectures/s/b.zip")
+    assert s3_utils.delete_object("bucket", "lectures/s/a.zip")
+
+    assert s3_utils.get_presigned_url("bucket", "lectures/s/a.zip") != first
+    assert len(fake_s3.signed) == 3
+    assert s3_utils.get_presigned_url("bucket", "lectures/s/b.zip").endswith("sig=2")
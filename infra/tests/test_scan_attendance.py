@@ -29,37 +29,53 @@ def mock_event(valid=True):
 def test_valid_scan_success(monkeypatch):
     monkeypatch.setattr(scan_lambda, "get_user_from_event", lambda e: {"role": "student", "id": "student-001"})
     monkeypatch.setattr(scan_lambda, "get_user_id", lambda u: u["id"])
-    monkeypatch.setattr(scan_lambda, "validate_qr_code_data", lambda s: json.loads(s))
+    monkeypatch.setattr(scan_lambda, "validate_qr_code_data", lambda s, **k: json.loads(s))
+    monkeypatch.setattr(scan_lambda, "get_revoked_epoch", lambda sid: 0)
 
     # 🟢 Mock the exact names imported into the lambda namespace
     monkeypatch.setattr(scan_lambda, "get_session", lambda sid: {"is_active": True, "class_id": "class-abc"})
     monkeypatch.setattr(scan_lambda, "get_class", lambda cid: {"class_name": "Test Class"})
-    monkeypatch.setattr(scan_lambda, "check_attendance_exists", lambda sid, uid: False)
-    monkeypatch.setattr(scan_lambda, "create_attendance", lambda d: {"statusCode": 200})
+    recorded = []
+    monkeypatch.setattr(scan_lambda, "create_attendance", lambda d: recorded.append(d) or {"statusCode": 200})
+    increments = []
+    monkeypatch.setattr(scan_lambda, "increment_session_attendance", lambda sid, ts: increments.append(sid) or True)
 
     # Pre-signed URL mock
     monkeypatch.setattr(scan_lambda, "get_lecture_material_presigned_url", lambda **k: "https://dl.com/file")
 
     response = scan_lambda.lambda_handler(mock_event(), None)
     assert response["statusCode"] == 200
+    # session counter bumped exactly once for the recorded scan
+    assert increments == ["sess-123"]
+    # attendance id is derived from session + student, not random
+    assert recorded[0]["attendance_id"] == scan_lambda.attendance_id_for("sess-123", "student-001")
 
 
 def test_scan_duplicate_attendance(monkeypatch):
     monkeypatch.setattr(scan_lambda, "get_user_from_event", lambda e: {"role": "student", "id": "student-001"})
-    monkeypatch.setattr(scan_lambda, "validate_qr_code_data", lambda s: json.loads(s))
+    monkeypatch.setattr(scan_lambda, "validate_qr_code_data", lambda s, **k: json.loads(s))
+    monkeypatch.setattr(scan_lambda, "get_revoked_epoch", lambda sid: 0)
+    monkeypatch.setattr(scan_lambda, "get_user_id", lambda u: u["id"])
     monkeypatch.setattr(scan_lambda, "get_session", lambda sid: {"is_active": True, "class_id": "class-abc"})
-    monkeypatch.setattr(scan_lambda, "check_attendance_exists", lambda sid, uid: True)
+    monkeypatch.setattr(scan_lambda, "get_class", lambda cid: {"class_name": "Test Class"})
+    # the conditional put rejects the repeat scan
+    monkeypatch.setattr(scan_lambda, "create_attendance", lambda d: {"statusCode": 409})
+    monkeypatch.setattr(scan_lambda, "increment_session_attendance",
+                        lambda sid, ts: pytest.fail("duplicate scan must not be counted"))
 
     response = scan_lambda.lambda_handler(mock_event(), None)
     body = json.loads(response["body"])
 
+    assert response["statusCode"] == 409
+
     # 🟢 FIXED: Match actual string 'already marked'
     assert "already marked" in body["message"].lower()
 
 
 def test_scan_inactive_session(monkeypatch):
     monkeypatch.setattr(scan_lambda, "get_user_from_event", lambda e: {"role": "student", "id": "student-001"})
-    monkeypatch.setattr(scan_lambda, "validate_qr_code_data", lambda s: json.loads(s))
+    monkeypatch.setattr(scan_lambda, "validate_qr_code_data", lambda s, **k: json.loads(s))
+    monkeypatch.setattr(scan_lambda, "get_revoked_epoch", lambda sid: 0)
     monkeypatch.setattr(scan_lambda, "get_session", lambda sid: {"is_active": False})
 
     response = scan_lambda.lambda_handler(mock_event(), None)
@@ -67,4 +83,39 @@ def test_scan_inactive_session(monkeypatch):
 
     assert response["statusCode"] == 400
     # 🟢 FIXED: Match actual string 'inactive'
-    assert "inactive" in body["error"].lower()
\ No newline at end of file
+    assert "inactive" in body["error"].lower()
+
+# Signed tokens carry their own validity: no session read before the write,
+# and afterwards only to find lecture materials
+def test_signed_token_skips_session_read(monkeypatch):
+    monkeypatch.setattr(scan_lambda, "get_user_from_event", lambda e: {"role": "student", "id": "student-001"})
+    monkeypatch.setattr(scan_lambda, "get_user_id", lambda u: u["id"])
+    monkeypatch.setattr(scan_lambda, "get_revoked_epoch", lambda sid: 0)
+    monkeypatch.setattr(scan_lambda, "validate_qr_code_data",
+                        lambda s, **k: {"session_id": "sess-123", "class_id": "class-abc", "signed": True})
+    calls = []
+    monkeypatch.setattr(scan_lambda, "get_session",
+                        lambda sid: calls.append("get_session") or {"lecture_material_key": "lectures/sess-123/a.zip"})
+    monkeypatch.setattr(scan_lambda, "get_class", lambda cid: {"class_name": "Test Class"})
+    monkeypatch.setattr(scan_lambda, "create_attendance", lambda d: calls.append("create") or {"statusCode": 200})
+    monkeypatch.setattr(scan_lambda, "increment_session_attendance", lambda sid, ts: True)
+    monkeypatch.setattr(scan_lambda, "get_lecture_material_presigned_url", lambda **k: "https://dl.com/" + k["key"])
+
+    response = scan_lambda.lambda_handler(mock_event(), None)
+    body = json.loads(response["body"])
+
+    assert response["statusCode"] == 200
+    assert calls == ["create", "get_session"]
+    assert body["download_url"] == "https://dl.com/lectures/sess-123/a.zip"
+
+
+def test_signed_token_rejected_scan_reads_nothing(monkeypatch):
+    monkeypatch.setattr(scan_lambda, "get_user_from_event", lambda e: {"role": "student", "id": "student-001"})
+    monkeypatch.setattr(scan_lambda, "get_user_id", lambda u: u["id"])
+    monkeypatch.setattr(scan_lambda, "get_revoked_epoch", lambda sid: 0)
+    monkeypatch.setattr(scan_lambda, "validate_qr_code_data", lambda s, **k: None)
+    monkeypatch.setattr(scan_lambda, "get_session", lambda sid: pytest.fail("session read for a rejected code"))
+
+    response = scan_lambda.lambda_handler(mock_event(), None)
+
+    assert response["statusCode"] == 400
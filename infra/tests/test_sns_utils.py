@@ -0,0 +1,75 @@
+import json
+import pytest
+from botocore.exceptions import ClientError
+
+from shared import sns_utils
+
+TOPIC = "arn:aws:sns:us-east-1:123:topic"
+
+
+class FakeSNS:
+    """Fails the scripted entries per call, like PublishBatch reports them."""
+
+    def __init__(self, script=()):
+        self.script = list(script)
+        self.requests = []
+
+    def publish_batch(self, TopicArn, PublishBatchRequestEntries):
+        self.requests.append([json.loads(e["Message"])["n"] for e in PublishBatchRequestEntries])
+        outcome = self.script.pop(0) if self.script else {}
+        if outcome == "throttle":
+            raise ClientError({"Error": {"Code": "Throttling", "Message": "slow down"}}, "PublishBatch")
+        successful, failed = [], []
+        for entry in PublishBatchRequestEntries:
+            n = json.loads(entry["Message"])["n"]
+            if n in outcome:
+                failed.append({"Id": entry["Id"], "Code": outcome[n][0], "SenderFault": outcome[n][1]})
+            else:
+                successful.append({"Id": entry["Id"], "MessageId": f"m-{n}"})
+        return {"Successful": successful, "Failed": failed}
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(sns_utils.time, "sleep", sleeps.append)
+    return sleeps
+
+
+def test_sends_full_batches_and_flushes_the_rest(monkeypatch, sleeps):
+    fake = FakeSNS()
+    monkeypatch.setattr(sns_utils, "sns_client", fake)
+
+    result = sns_utils.publish_messages(({"n": n} for n in range(23)), topic_arn=TOPIC)
+
+    assert result == {"sent": 23, "failed": 0}
+    assert [len(r) for r in fake.requests] == [10, 10, 3]
+    assert sleeps == []
+
+
+def test_retries_only_transient_entry_failures(monkeypatch, sleeps):
+    fake = FakeSNS([{1: ("InternalError", False), 2: ("InvalidParameter", True)}])
+    monkeypatch.setattr(sns_utils, "sns_client", fake)
+
+    with sns_utils.BatchPublisher(TOPIC, base_delay=0.1) as publisher:
+        for n in range(3):
+            publisher.add({"n": n}, key=f"k{n}")
+
+    assert fake.requests == [[0, 1, 2], [1]]
+    assert publisher.sent == 2
+    assert publisher.failed == [{"key": "k2", "code": "InvalidParameter", "message": None}]
+    assert len(sleeps) == 1 and 0.1 <= sleeps[0] < 0.2
+
+
+def test_gives_up_after_max_attempts(monkeypatch, sleeps):
+    fake = FakeSNS(["throttle", "throttle", "throttle"])
+    monkeypatch.setattr(sns_utils, "sns_client", fake)
+
+    publisher = sns_utils.BatchPublisher(TOPIC, max_attempts=3, base_delay=0.1)
+    publisher.add({"n": 0}, key="k0")
+    failed = publisher.flush()
+
+    assert len(fake.requests) == 3
+    assert failed == [{"key": "k0", "code": "Throttling", "message": failed[0]["message"]}]
+    # exponential backoff with jitter: [0.1, 0.2) then [0.2, 0.4)
+    assert 0.1 <= sleeps[0] < 0.2 and 0.2 <= sleeps[1] < 0.4
@@ -11,6 +11,7 @@ if LAMBDA_PATH not in sys.path:
     sys.path.append(LAMBDA_PATH)
 
 import lambda_function as upload_lambda
+from shared import auth_utils
 
 
 def mock_post_event(session_id="sess-123"):
@@ -37,17 +38,18 @@ def mock_post_event(session_id="sess-123"):
 
 
 # Scenario 1: Professor successfully uploads to their own class
-def test_upload_lecture_material_success(monkeypatch):
+def test_upload_lecture_material_success(monkeypatch, class_owners):
     monkeypatch.setattr(upload_lambda, "get_user_from_event", lambda e: {"role": "professor", "id": "prof-001"})
     monkeypatch.setattr(upload_lambda, "require_professor", lambda u: True)
     monkeypatch.setattr(upload_lambda, "get_user_id", lambda u: u["id"])
 
     # Mock DB lookups
     monkeypatch.setattr(upload_lambda, "get_session", lambda sid: {"class_id": "class-abc"})
-    monkeypatch.setattr(upload_lambda, "get_class", lambda cid: {"class_id": cid, "professor_id": "prof-001"})
+    class_owners["class-abc"] = "prof-001"
 
     # Mock S3 and Update logic
-    monkeypatch.setattr(upload_lambda, "upload_lecture_material", lambda sid, content, fname: f"{sid}/{fname}")
+    monkeypatch.setattr(upload_lambda, "upload_lecture_material_base64",
+                        lambda sid, content_b64, fname: {"key": f"{sid}/{fname}", "size": 21, "parts": 1})
     monkeypatch.setattr(upload_lambda, "update_session", lambda sid, updates: True)
 
     response = upload_lambda.lambda_handler(mock_post_event(), None)
@@ -59,18 +61,128 @@ def test_upload_lecture_material_success(monkeypatch):
     # Or, verify the key exists only if you intend to add it to the handler
     # assert body["session_id"] == "sess-123"
 
-def test_upload_lecture_material_forbidden(monkeypatch):
+def test_upload_lecture_material_forbidden(monkeypatch, class_owners):
     monkeypatch.setattr(upload_lambda, "get_user_from_event", lambda e: {"role": "professor", "id": "prof-001"})
     # Ensure the general auth check passes
     monkeypatch.setattr(upload_lambda, "require_professor", lambda u: True)
     monkeypatch.setattr(upload_lambda, "get_user_id", lambda u: "prof-001")
 
     monkeypatch.setattr(upload_lambda, "get_session", lambda sid: {"class_id": "class-abc"})
-    monkeypatch.setattr(upload_lambda, "get_class", lambda cid: {"class_id": cid, "professor_id": "prof-999"})
+    class_owners["class-abc"] = "prof-999"
 
     response = upload_lambda.lambda_handler(mock_post_event(), None)
     body = json.loads(response["body"])
 
     assert response["statusCode"] == 403
     # Verify the specific ownership error string
-    assert "not own" in body["error"].lower()
\ No newline at end of file
+    assert "not own" in body["error"].lower()
+
+
+def mock_upload_event(resource, body, method="POST"):
+    event = mock_post_event()
+    event.update({"resource": resource, "httpMethod": method, "body": json.dumps(body)})
+    return event
+
+
+def allow_owner(monkeypatch, session=None):
+    monkeypatch.setattr(upload_lambda, "get_user_from_event", lambda e: {"role": "professor", "id": "prof-001"})
+    monkeypatch.setattr(upload_lambda, "require_professor", lambda u: True)
+    monkeypatch.setattr(upload_lambda, "get_user_id", lambda u: u["id"])
+    monkeypatch.setattr(upload_lambda, "get_session", lambda sid: dict(session or {"class_id": "class-abc"}))
+    monkeypatch.setattr(auth_utils, "get_class_ids_by_professor",
+                        lambda pid: ["class-abc"] if pid == "prof-001" else [])
+
+
+# Direct upload: the start endpoint only returns presigned part URLs
+def test_start_direct_upload(monkeypatch):
+    allow_owner(monkeypatch)
+    calls = []
+
+    def fake_create(key, size):
+        calls.append((key, size))
+        return {"upload_id": "up-1", "key": key, "part_size": 16, "parts": [{"part_number": 1, "url": "https://s3/part1"}]}
+
+    monkeypatch.setattr(upload_lambda, "create_presigned_multipart_upload", fake_create)
+
+    response = upload_lambda.lambda_handler(mock_upload_event(
+        "/materials/uploads", {"session_id": "sess-123", "filename": "../week1 slides", "file_size": 300 * 1024 * 1024}), None)
+    body = json.loads(response["body"])
+
+    assert response["statusCode"] == 200
+    (key, size), = calls
+    assert key.startswith("lectures/sess-123/") and key.endswith("/week1 slides.zip")
+    assert size == 300 * 1024 * 1024
+    # each upload stages under its own key, never the session's current object
+    assert upload_lambda.lecture_material_key("sess-123", "week1 slides") != key
+    assert body["upload_id"] == "up-1" and body["parts"][0]["url"] == "https://s3/part1"
+
+
+def test_complete_direct_upload_records_key(monkeypatch):
+    allow_owner(monkeypatch, {"class_id": "class-abc", "lecture_material_key": "lectures/sess-123/old.zip"})
+    deleted, updates = [], []
+    monkeypatch.setattr(upload_lambda, "complete_multipart_upload",
+                        lambda key, upload_id, parts: {"key": key, "size": 1234, "etag": "x"})
+    monkeypatch.setattr(upload_lambda, "is_zip_object", lambda key: True)
+    monkeypatch.setattr(upload_lambda, "delete_lecture_material", lambda key: deleted.append(key))
+    monkeypatch.setattr(upload_lambda, "update_session", lambda sid, u: updates.append((sid, u)) or True)
+
+    response = upload_lambda.lambda_handler(mock_upload_event("/materials/uploads/complete", {
+        "session_id": "sess-123", "upload_id": "up-1", "key": "lectures/sess-123/new.zip",
+        "parts": [{"part_number": 1, "etag": "\"abc\""}]}), None)
+
+    assert response["statusCode"] == 200
+    assert deleted == ["lectures/sess-123/old.zip"]
+    assert updates[0][0] == "sess-123"
+    assert updates[0][1]["lecture_material_key"] == "lectures/sess-123/new.zip"
+
+
+# A staged upload that fails validation is deleted; the session's current material is not
+def test_complete_invalid_upload_keeps_current_material(monkeypatch):
+    allow_owner(monkeypatch, {"class_id": "class-abc", "lecture_material_key": "lectures/sess-123/a1/old.zip"})
+    deleted = []
+    monkeypatch.setattr(upload_lambda, "complete_multipart_upload",
+                        lambda key, upload_id, parts: {"key": key, "size": 1234, "etag": "x"})
+    monkeypatch.setattr(upload_lambda, "is_zip_object", lambda key: False)
+    monkeypatch.setattr(upload_lambda, "delete_lecture_material", lambda key: deleted.append(key))
+    monkeypatch.setattr(upload_lambda, "update_session", lambda sid, u: pytest.fail("invalid upload recorded"))
+
+    def complete(key):
+        return upload_lambda.lambda_handler(mock_upload_event("/materials/uploads/complete", {
+            "session_id": "sess-123", "upload_id": "up-1", "key": key,
+            "parts": [{"part_number": 1, "etag": "\"abc\""}]}), None)
+
+    assert complete("lectures/sess-123/b2/new.zip")["statusCode"] == 400
+    assert deleted == ["lectures/sess-123/b2/new.zip"]
+
+    # the live key can never be the target of a completion
+    assert complete("lectures/sess-123/a1/old.zip")["statusCode"] == 400
+    assert deleted == ["lectures/sess-123/b2/new.zip"]
+
+
+def test_complete_direct_upload_rejects_foreign_key(monkeypatch):
+    allow_owner(monkeypatch)
+    monkeypatch.setattr(upload_lambda, "complete_multipart_upload",
+                        lambda *a: pytest.fail("must not complete another session's upload"))
+
+    response = upload_lambda.lambda_handler(mock_upload_event("/materials/uploads/complete", {
+        "session_id": "sess-123", "upload_id": "up-1", "key": "lectures/sess-999/x.zip",
+        "parts": [{"part_number": 1, "etag": "\"abc\""}]}), None)
+
+    assert response["statusCode"] == 403
+
+
+# Authorizer context: a class listed in owned_class_ids needs no class lookup
+def test_owned_class_from_authorizer_skips_class_read(monkeypatch):
+    allow_owner(monkeypatch)
+    monkeypatch.setattr(upload_lambda, "get_user_from_event",
+                        lambda e: {"id": "prof-001", "is_professor": True, "owned_class_ids": ["class-abc"]})
+    monkeypatch.setattr(auth_utils, "get_class_ids_by_professor",
+                        lambda pid: pytest.fail("ownership came from the authorizer"))
+    monkeypatch.setattr(auth_utils, "get_class", lambda cid: pytest.fail("ownership came from the authorizer"))
+    monkeypatch.setattr(upload_lambda, "create_presigned_multipart_upload",
+                        lambda key, size: {"upload_id": "up-1", "key": key, "part_size": 16, "parts": []})
+
+    response = upload_lambda.lambda_handler(mock_upload_event(
+        "/materials/uploads", {"session_id": "sess-123", "file_size": 1024}), None)
+
+    assert response["statusCode"] == 200
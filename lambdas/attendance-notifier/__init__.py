@@ -0,0 +1,3 @@
+"""
+Attendance notifier Lambda function
+"""
@@ -0,0 +1,83 @@
+from boto3.dynamodb.types import TypeDeserializer
+
+from shared.dynamodb_utils import get_session
+from shared.s3_utils import get_lecture_material_presigned_url
+from shared.sns_utils import (
+    BatchPublisher, build_attendance_message, attendance_subject, ATTENDANCE_TOPIC_ARN
+)
+
+_deserializer = TypeDeserializer()
+
+
+def new_attendance_record(record):
+    """Attendance item from an INSERT stream record, or None for other events."""
+    if record.get('eventName') != 'INSERT':
+        return None
+    image = record.get('dynamodb', {}).get('NewImage') or {}
+    return {key: _deserializer.deserialize(value) for key, value in image.items()}
+
+
+def attendance_message(attendance):
+    session = get_session(attendance['session_id']) or {}
+
+    lecture_material_url = None
+    lecture_material_key = session.get('lecture_material_key')
+    if lecture_material_key:
+        lecture_material_url = get_lecture_material_presigned_url(
+            session_id=attendance['session_id'],
+            key=lecture_material_key,
+            expiration=86400
+        )
+
+    return build_attendance_message(
+        student_id=attendance['student_id'],
+        session_id=attendance['session_id'],
+        class_id=attendance['class_id'],
+        message_type='attendance_confirmed',
+        lecture_material_url=lecture_material_url,
+        lecture_material_key=lecture_material_key
+    )
+
+
+def lambda_handler(event, context):
+    """
+    Sends the attendance confirmation for every new attendance item, fed by
+    the attendance table's DynamoDB stream so scan-attendance never waits on SNS.
+
+    Confirmations go out through publish_batch, ten per request. The earliest
+    record that could not be sent is reported as a batch item failure: Lambda
+    retries from that record and, once retries are exhausted, sends the batch
+    metadata to the dead-letter queue. Later records of the same batch may
+    have been sent already, so delivery is at-least-once.
+    """
+    if not ATTENDANCE_TOPIC_ARN:
+        print("ATTENDANCE_TOPIC_ARN not configured, skipping notifications")
+        return {'batchItemFailures': []}
+
+    records = event.get('Records', [])
+    positions = {}
+    failed = []
+    publisher = BatchPublisher(ATTENDANCE_TOPIC_ARN)
+    subject = attendance_subject('attendance_confirmed')
+
+    for position, record in enumerate(records):
+        sequence_number = record.get('dynamodb', {}).get('SequenceNumber')
+        positions[sequence_number] = position
+        try:
+            attendance = new_attendance_record(record)
+            if attendance is None:
+                continue
+            publisher.add(attendance_message(attendance), subject=subject, key=sequence_number)
+        except Exception as e:
+            print(f"Error notifying for record {sequence_number}: {str(e)}")
+            failed.append(sequence_number)
+            break
+
+    failed.extend(failure['key'] for failure in publisher.flush())
+    if failed:
+        retry_from = min(failed, key=positions.get)
+        print(f"[attendance-notifier] sent={publisher.sent}, retrying from {retry_from}")
+        return {'batchItemFailures': [{'itemIdentifier': retry_from}]}
+
+    print(f"[attendance-notifier] sent={publisher.sent}")
+    return {'batchItemFailures': []}
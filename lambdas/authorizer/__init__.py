@@ -0,0 +1,3 @@
+"""
+API Gateway authorizer Lambda function
+"""
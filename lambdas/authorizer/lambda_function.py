@@ -0,0 +1,68 @@
+from shared.auth_utils import verify_token, user_from_claims
+from shared.dynamodb_utils import get_class_ids_by_professor
+
+
+def bearer_token(event):
+    """The token from 'Authorization: Bearer <token>' (a bare token is accepted too)."""
+    header = (event.get('authorizationToken') or '').strip()
+    if header[:7].lower() == 'bearer ':
+        return header[7:].strip()
+    return header
+
+
+def stage_wildcard(method_arn):
+    """
+    arn:aws:execute-api:region:account:api-id/stage/METHOD/path -> .../api-id/stage/*
+
+    API Gateway caches the policy per token and reuses it for every route, so
+    it has to allow the whole stage rather than the method that was called.
+    """
+    api_and_stage = method_arn.split('/', 2)[:2]
+    return '/'.join(api_and_stage) + '/*'
+
+
+def build_context(claims):
+    """
+    Compact context handed to every handler as requestContext.authorizer.
+    Values must be strings, numbers or booleans, so lists are comma-joined.
+    """
+    user = user_from_claims(claims)
+    context = {
+        'user_id': user['user_id'],
+        'email': user['email'] or '',
+        'username': user['username'] or '',
+        'groups': ','.join(user['groups']),
+        'is_professor': user['is_professor'],
+        'is_student': user['is_student'],
+        'owned_class_ids': ''
+    }
+    if user['is_professor']:
+        context['owned_class_ids'] = ','.join(sorted(get_class_ids_by_professor(user['user_id'])))
+    return context
+
+
+def lambda_handler(event, context):
+    """
+    TOKEN authorizer: verifies the Cognito ID token (see auth_utils.verify_token)
+    and returns an Allow policy for the stage plus the user's context. API
+    Gateway caches the result per token for the authorizer TTL, so handlers
+    read roles and owned classes without verifying or querying anything.
+    """
+    token = bearer_token(event)
+    claims = verify_token(token) if token else None
+    if not claims or not claims.get('sub'):
+        # API Gateway answers 401 for exactly this error message
+        raise Exception('Unauthorized')
+
+    return {
+        'principalId': claims['sub'],
+        'policyDocument': {
+            'Version': '2012-10-17',
+            'Statement': [{
+                'Action': 'execute-api:Invoke',
+                'Effect': 'Allow',
+                'Resource': stage_wildcard(event['methodArn'])
+            }]
+        },
+        'context': build_context(claims)
+    }
@@ -0,0 +1,3 @@
+"""
+Export attendance Lambda function
+"""
@@ -0,0 +1,90 @@
+import json
+
+from shared.dynamodb_utils import iter_attendance_models_by_class
+from shared.auth_utils import (
+    get_user_from_event, require_professor, get_user_id, assert_owns_class, ClassAccessError
+)
+from shared.json_utils import json_response
+from shared.s3_utils import upload_stream, get_presigned_url, EXPORTS_BUCKET
+from shared.exports import (
+    export_format, scan_time_range, export_key, iter_export_chunks, get_pyarrow,
+    CountingIterator, ExportRequestError, EXPORT_FORMATS, EXPORT_URL_EXPIRATION
+)
+
+# Define Universal CORS Headers
+CORS_HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type,Authorization'
+}
+
+
+def response(status_code, body):
+    return json_response(status_code, body, CORS_HEADERS)
+
+
+def lambda_handler(event, context):
+    """
+    POST /attendance/export {class_id, format?, from?, to?}
+
+    Streams the class's attendance (optionally only scans between from and
+    to, inclusive dates) into a CSV or Parquet object in the exports bucket
+    and returns a presigned download URL instead of the records themselves.
+    """
+    try:
+        user = get_user_from_event(event)
+        if not user:
+            return response(401, {'error': 'Unauthorized'})
+
+        if not require_professor(user):
+            return response(403, {'error': 'Only professors can export attendance'})
+
+        body = {}
+        if isinstance(event.get('body'), str):
+            body = json.loads(event['body'])
+        elif event.get('body'):
+            body = event['body']
+
+        class_id = body.get('class_id')
+        if not class_id:
+            return response(400, {'error': 'class_id is required'})
+
+        fmt = export_format(body.get('format'))
+        scanned_from, scanned_before = scan_time_range(body.get('from'), body.get('to'))
+
+        if fmt == 'parquet' and get_pyarrow() is None:
+            return response(501, {'error': 'parquet export is not available'})
+
+        assert_owns_class(get_user_id(user), class_id, user)
+
+        # one page of records and one part of output in memory at a time
+        records = CountingIterator(iter_attendance_models_by_class(
+            class_id, scanned_from=scanned_from, scanned_before=scanned_before))
+        key = export_key(class_id, fmt)
+        result = upload_stream(EXPORTS_BUCKET, key, iter_export_chunks(fmt, records), EXPORT_FORMATS[fmt][1])
+        if not result:
+            return response(500, {'error': 'failed to write export'})
+
+        download_url = get_presigned_url(EXPORTS_BUCKET, key, EXPORT_URL_EXPIRATION)
+        if not download_url:
+            return response(500, {'error': 'failed to sign download url'})
+
+        return response(200, {
+            'class_id': class_id,
+            'format': fmt,
+            'from': body.get('from'),
+            'to': body.get('to'),
+            'rows': records.count,
+            'size': result['size'],
+            'key': key,
+            'download_url': download_url,
+            'expires_in': EXPORT_URL_EXPIRATION
+        })
+
+    except ExportRequestError as e:
+        return response(400, {'error': str(e)})
+    except ClassAccessError as e:
+        return response(e.status_code, {'error': e.message})
+    except Exception as e:
+        print(f"Error: {str(e)}")
+        return response(500, {'error': 'internal server error'})
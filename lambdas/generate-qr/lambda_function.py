@@ -1,22 +1,12 @@
 import json
-import os
-import sys
 import uuid
-import time
 from datetime import datetime
-from shared import auth_utils
-from shared import dynamodb_utils
-from shared import models
-from shared import qr_generator
-from shared import s3_utils
-from shared import sns_utils
 
-# Add shared directory to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared'))
-
-from qr_generator import generate_and_upload_qr_code
-from dynamodb_utils import get_class, create_session, update_session
-from auth_utils import get_user_from_event, require_professor, get_user_id
+from shared.qr_generator import generate_and_upload_qr_code, get_rotating_qr_code, RENDERERS
+from shared.dynamodb_utils import get_class, get_session, create_session, update_session
+from shared.auth_utils import (
+    get_user_from_event, require_professor, get_user_id, assert_owns_class, ClassAccessError
+)
 
 # Define Universal CORS Headers
 CORS_HEADERS = {
@@ -26,10 +16,61 @@ CORS_HEADERS = {
 }
 
 
+def get_rotating_code(event, user):
+    """
+    GET /sessions/{session_id}/rotating-qr
+    Returns the session's current rotating code. Nothing is rendered or written
+    to S3; the professor's screen polls this (or rotates locally with the key).
+    """
+    path_parameters = event.get('pathParameters') or {}
+    session_id = path_parameters.get('session_id')
+    if not session_id:
+        return {
+            'statusCode': 400,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': 'Session ID is missing in path parameters'})
+        }
+
+    session = get_session(session_id)
+    if not session:
+        return {
+            'statusCode': 404,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': 'Session not found'})
+        }
+
+    try:
+        assert_owns_class(get_user_id(user), session['class_id'], user)
+    except ClassAccessError as e:
+        return {
+            'statusCode': e.status_code,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': e.message})
+        }
+
+    if not session.get('is_active', False):
+        return {
+            'statusCode': 400,
+            'headers': CORS_HEADERS,
+            'body': json.dumps({'error': 'Session is inactive'})
+        }
+
+    rotating = get_rotating_qr_code(
+        session_id, session['class_id'],
+        activity_epoch=int(session.get('activity_epoch', 0))
+    )
+    return {
+        'statusCode': 200,
+        'headers': CORS_HEADERS,
+        'body': json.dumps({'session_id': session_id, **rotating})
+    }
+
+
 def lambda_handler(event, context):
     """
     Handles creating a new session for a class and generating a corresponding QR code.
     Triggered by POST /sessions/{session_id}/generate-qr (where session_id is class_id)
+    and GET /sessions/{session_id}/rotating-qr (where session_id is the session)
     """
     try:
         # 1. Authentication Check
@@ -48,6 +89,10 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'Only professors can generate QR codes'})
             }
 
+        http_method = event.get('httpMethod') or event.get('requestContext', {}).get('http', {}).get('method', 'POST')
+        if http_method == 'GET':
+            return get_rotating_code(event, user)
+
         # 2. Extract Class ID from path parameters
         # In CDK, this is mapped from the {session_id} placeholder
         path_parameters = event.get('pathParameters') or {}
@@ -60,6 +105,15 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'Class ID is missing in path parameters'})
             }
 
+        query_params = event.get('queryStringParameters') or {}
+        image_format = query_params.get('format')
+        if image_format and image_format.lower() not in RENDERERS:
+            return {
+                'statusCode': 400,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({'error': f"format must be one of {sorted(RENDERERS)}"})
+            }
+
         # 3. Ownership and Existence Checks
         class_data = get_class(class_id)
         if not class_data:
@@ -105,7 +159,8 @@ def lambda_handler(event, context):
         qr_result = generate_and_upload_qr_code(
             session_id=new_session_id,
             class_id=class_id,
-            expiry_minutes=expiry_minutes
+            expiry_minutes=expiry_minutes,
+            image_format=image_format
         )
 
         if not qr_result.get('qr_code_url'):
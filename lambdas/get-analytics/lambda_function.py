@@ -1,23 +1,15 @@
-import json
-import os
-import sys
 from collections import defaultdict
-from datetime import datetime
-from shared import auth_utils
-from shared import dynamodb_utils
-from shared import models
-from shared import qr_generator
-from shared import s3_utils
-from shared import sns_utils
-
-# add shared directory to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared'))
-
-from dynamodb_utils import (
-    get_attendance_by_session, get_sessions_by_class,
-    get_class, get_classes_by_professor, get_attendance_by_student, get_session
+
+from shared.dynamodb_utils import (
+    get_attendance_page, get_attendance_count, get_attendance_count_by_session, get_sessions_by_class,
+    iter_attendance_models_by_class, get_class, get_classes_by_professor, get_session
+)
+from shared.pagination import page_params, encode_page_token, PageRequestError
+from shared.projection import requested_fields, ATTENDANCE_FIELDS, FieldsRequestError
+from shared.auth_utils import (
+    get_user_from_event, require_professor, get_user_id, assert_owns_class, ClassAccessError
 )
-from auth_utils import get_user_from_event, require_professor, get_user_id
+from shared.json_utils import json_response
 
 CORS_HEADERS = {
     'Content-Type': 'application/json',
@@ -26,6 +18,10 @@ CORS_HEADERS = {
 }
 
 
+def response(status_code, body):
+    return json_response(status_code, body, CORS_HEADERS)
+
+
 def lambda_handler(event, context):
     """
     Query parameters:
@@ -35,18 +31,10 @@ def lambda_handler(event, context):
     try:
         user = get_user_from_event(event)
         if not user:
-            return {
-                'statusCode': 401,
-                'headers': CORS_HEADERS,
-                'body': json.dumps({'error': 'unauthorized'})
-            }
+            return response(401, {'error': 'unauthorized'})
 
         if not require_professor(user):
-            return {
-                'statusCode': 403,
-                'headers': CORS_HEADERS,
-                'body': json.dumps({'error': 'only professors can see analytics'})
-            }
+            return response(403, {'error': 'only professors can see analytics'})
 
         user_id = get_user_id(user)
 
@@ -58,84 +46,77 @@ def lambda_handler(event, context):
             # analytics for a specific session
             session = get_session(session_id)
             if not session:
-                return {
-                    'statusCode': 404,
-                    'headers': CORS_HEADERS,
-                    'body': json.dumps({'error': 'session not found'})
-                }
+                return response(404, {'error': 'session not found'})
 
-            class_data = get_class(session['class_id'])
-            if class_data and class_data.get('professor_id') != user_id:
-                return {
-                    'statusCode': 403,
-                    'headers': CORS_HEADERS,
-                    'body': json.dumps({'error': 'you do not own this class'})
-                }
+            assert_owns_class(user_id, session['class_id'], user)
 
-            attendance_records = get_attendance_by_session(session_id)
+            # records and scan times are paged (limit / next_token); the counts cover the whole session
+            scope = f"analytics:session:{session_id}"
+            limit, start_key = page_params(query_params, scope)
+            fields = requested_fields(query_params, ATTENDANCE_FIELDS, always=('attendance_id', 'scan_timestamp'))
+            attendance_records, last_key = get_attendance_page(
+                'session_id-index', {'session_id': session_id}, limit, start_key, fields)
+            next_token = encode_page_token(last_key, scope)
 
-            total_students = len(attendance_records)
-            present_count = len(attendance_records)
+            if session.get('attendance_count') is not None:
+                present_count = session['attendance_count']
+            elif not next_token and not start_key:
+                present_count = len(attendance_records)
+            else:
+                present_count = get_attendance_count_by_session(session_id)
+            total_students = present_count
             attendance_rate = (present_count / total_students * 100) if total_students > 0 else 0
 
             # group by time intervals (if needed)
             scan_times = [record.get('scan_timestamp') for record in attendance_records]
 
-            return {
-                'statusCode': 200,
-                'headers': CORS_HEADERS,
-                'body': json.dumps({
-                    'session_id': session_id,
-                    'class_id': session['class_id'],
-                    'session_date': session.get('session_date'),
-                    'analytics': {
-                        'total_students': total_students,
-                        'present_count': present_count,
-                        'absent_count': total_students - present_count,
-                        'attendance_rate': round(attendance_rate, 2),
-                        'scan_times': scan_times
-                    },
-                    'attendance_records': attendance_records
-                })
-            }
+            return response(200, {
+                'session_id': session_id,
+                'class_id': session['class_id'],
+                'session_date': session.get('session_date'),
+                'analytics': {
+                    'total_students': total_students,
+                    'present_count': present_count,
+                    'absent_count': total_students - present_count,
+                    'attendance_rate': round(attendance_rate, 2),
+                    'scan_times': scan_times
+                },
+                'attendance_records': attendance_records,
+                'next_token': next_token
+            })
 
         elif class_id:
             # analytics for class (all sessions)
             class_data = get_class(class_id)
             if not class_data:
-                return {
-                    'statusCode': 404,
-                    'headers': CORS_HEADERS,
-                    'body': json.dumps({'error': 'class not found'})
-                }
+                return response(404, {'error': 'class not found'})
 
             if class_data.get('professor_id') != user_id:
-                return {
-                    'statusCode': 403,
-                    'headers': CORS_HEADERS,
-                    'body': json.dumps({'error': 'you do not own this class'})
-                }
+                return response(403, {'error': 'you do not own this class'})
 
             sessions = get_sessions_by_class(class_id)
+            session_ids = {session['session_id'] for session in sessions}
 
-            total_sessions = len(sessions)
-            session_analytics = []
+            # one paginated class_id-index query instead of one query per session,
+            # streamed as slotted records rather than collected into dicts
+            session_counts = defaultdict(int)
             student_attendance = defaultdict(int)
+            for record in iter_attendance_models_by_class(class_id, projection=['session_id', 'student_id']):
+                if record.session_id not in session_ids:
+                    continue
+                session_counts[record.session_id] += 1
+                student_attendance[record.student_id] += 1
 
-            for session in sessions:
-                attendance_records = get_attendance_by_session(session['session_id'])
-                present_count = len(attendance_records)
-
-                session_analytics.append({
+            total_sessions = len(sessions)
+            session_analytics = [
+                {
                     'session_id': session['session_id'],
                     'session_date': session.get('session_date'),
-                    'present_count': present_count,
+                    'present_count': session_counts[session['session_id']],
                     'is_active': session.get('is_active', False)
-                })
-
-                # track per student attendance
-                for record in attendance_records:
-                    student_attendance[record['student_id']] += 1
+                }
+                for session in sessions
+            ]
 
             # calculate overall statistics
             total_students = len(student_attendance)
@@ -147,21 +128,17 @@ def lambda_handler(event, context):
                 for student_id, count in student_attendance.items()
             }
 
-            return {
-                'statusCode': 200,
-                'headers': CORS_HEADERS,
-                'body': json.dumps({
-                    'class_id': class_id,
-                    'class_name': class_data.get('class_name'),
-                    'analytics': {
-                        'total_sessions': total_sessions,
-                        'total_students': total_students,
-                        'average_attendance_per_session': round(avg_attendance_per_session, 2),
-                        'session_analytics': session_analytics,
-                        'student_attendance_rates': student_rates
-                    }
-                })
-            }
+            return response(200, {
+                'class_id': class_id,
+                'class_name': class_data.get('class_name'),
+                'analytics': {
+                    'total_sessions': total_sessions,
+                    'total_students': total_students,
+                    'average_attendance_per_session': round(avg_attendance_per_session, 2),
+                    'session_analytics': session_analytics,
+                    'student_attendance_rates': student_rates
+                }
+            })
 
         else:
             # summary for all professor's classes
@@ -171,11 +148,11 @@ def lambda_handler(event, context):
             for class_item in classes:
                 sessions = get_sessions_by_class(class_item['class_id'])
                 total_sessions = len(sessions)
-
-                total_attendance = 0
-                for session in sessions:
-                    attendance_records = get_attendance_by_session(session['session_id'])
-                    total_attendance += len(attendance_records)
+                if all(session.get('attendance_count') is not None for session in sessions):
+                    total_attendance = sum(session['attendance_count'] for session in sessions)
+                else:
+                    # only the total is needed, so DynamoDB counts instead of returning records
+                    total_attendance = get_attendance_count('class_id-index', {'class_id': class_item['class_id']})
 
                 class_summaries.append({
                     'class_id': class_item['class_id'],
@@ -184,26 +161,15 @@ def lambda_handler(event, context):
                     'total_attendance_records': total_attendance
                 })
 
-            return {
-                'statusCode': 200,
-                'headers': CORS_HEADERS,
-                'body': json.dumps({
-                    'message': 'Please specify class_id or session_id for detailed analytics',
-                    'classes': class_summaries
-                })
-            }
-
+            return response(200, {
+                'message': 'Please specify class_id or session_id for detailed analytics',
+                'classes': class_summaries
+            })
 
+    except (PageRequestError, FieldsRequestError) as e:
+        return response(400, {'error': str(e)})
+    except ClassAccessError as e:
+        return response(e.status_code, {'error': e.message})
     except Exception as e:
-
         print(f"Error getting analytics: {str(e)}")
-
-        return {
-
-            'statusCode': 500,
-
-            'headers': CORS_HEADERS,
-
-            'body': json.dumps({'error': 'internal server error', 'message': str(e)})
-
-        }
\ No newline at end of file
+        return response(500, {'error': 'internal server error', 'message': str(e)})
\ No newline at end of file
@@ -1,23 +1,35 @@
-import json
 import os
-import sys
-import decimal
-import boto3  # 🟢 ADDED: For Cognito IDP client
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import ClientError
 
-# add shared directory to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared'))
-
-from dynamodb_utils import (
-    get_attendance_by_session, get_attendance_by_student,
-    get_session, get_class, get_classes_by_professor
+from shared.dynamodb_utils import (
+    get_attendance_page, get_attendance_count, get_session,
+    get_sessions_by_class, get_classes_by_professor
+)
+from shared.json_utils import dumps
+from shared.pagination import page_params, encode_page_token, PageRequestError
+from shared.projection import requested_fields, ATTENDANCE_FIELDS, FieldsRequestError
+from shared.auth_utils import (
+    get_user_from_event, require_professor, require_student, get_user_id,
+    assert_owns_class, ClassAccessError
 )
-import dynamodb_utils
-from auth_utils import get_user_from_event, require_professor, require_student, get_user_id
+from shared.cache_utils import TTLCache
+from shared import aws_clients
 
-# INITIALIZE COGNITO CLIENT
-cognito = boto3.client('cognito-idp')
+# Cognito IDP client, created on first email lookup (see aws_clients)
+cognito = None
 USER_POOL_ID = os.environ.get('USER_POOL_ID')
 
+# sub -> email, kept across warm invocations of this container
+EMAIL_CACHE_TTL = int(os.environ.get('EMAIL_CACHE_TTL', '900'))
+_email_cache = TTLCache(maxsize=5000, ttl=EMAIL_CACHE_TTL)
+
+# bounded pool for concurrent admin_get_user calls (Cognito throttles bursts)
+EMAIL_LOOKUP_WORKERS = 8
+# Cognito lookups per request; subs past the cap are shown as themselves
+# and resolved (then cached) on a later request
+MAX_EMAIL_LOOKUPS = int(os.environ.get('MAX_EMAIL_LOOKUPS', '100'))
+
 # Define Universal CORS Headers
 CORS_HEADERS = {
     'Content-Type': 'application/json',
@@ -25,27 +37,130 @@ CORS_HEADERS = {
     'Access-Control-Allow-Headers': 'Content-Type,Authorization'
 }
 
-def default_serializer(obj):
-    """Serialize DynamoDB types (like Decimal) to JSON compatible types."""
-    if isinstance(obj, decimal.Decimal):
-        if obj % 1 == 0:
-            return int(obj)
-        else:
-            return float(obj)
-    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+def get_cognito():
+    global cognito
+    if cognito is None:
+        cognito = aws_clients.client('cognito-idp')
+    return cognito
+
+
+def _email_from_attributes(attributes):
+    for attr in attributes:
+        if attr['Name'] == 'email':
+            return attr['Value']
+    return None
+
+
+def _lookup_email_by_sub_filter(sub):
+    """Fallback for pools where the username is not the sub."""
+    response = get_cognito().list_users(
+        UserPoolId=USER_POOL_ID,
+        AttributesToGet=['email'],
+        Filter=f'sub = "{sub}"',
+        Limit=1
+    )
+    users = response.get('Users', [])
+    return _email_from_attributes(users[0].get('Attributes', [])) if users else None
+
 
 def get_email_from_sub(sub):
     """LOOKUP: Fetches email attribute from Cognito User Pool."""
     if not sub:
         return "Unknown"
+
+    cached = _email_cache.get(sub)
+    if cached is not None:
+        return cached
+
     try:
-        response = cognito.admin_get_user(UserPoolId=USER_POOL_ID, Username=sub)
-        for attr in response['UserAttributes']:
-            if attr['Name'] == 'email':
-                return attr['Value']
+        try:
+            response = get_cognito().admin_get_user(UserPoolId=USER_POOL_ID, Username=sub)
+            email = _email_from_attributes(response['UserAttributes'])
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') != 'UserNotFoundException':
+                raise
+            email = _lookup_email_by_sub_filter(sub)
     except Exception as e:
+        # don't cache transient failures such as throttling
         print(f"Cognito lookup error for {sub}: {str(e)}")
-    return sub # Fallback to original ID
+        return sub # Fallback to original ID
+
+    # unknown users are cached as their sub so we stop asking Cognito
+    email = email or sub
+    _email_cache.set(sub, email)
+    return email
+
+
+def resolve_student_emails(subs):
+    """
+    Resolve many subs at once: de-duplicate, serve what we can from the
+    container cache and look up at most MAX_EMAIL_LOOKUPS misses concurrently,
+    one user each (never a walk over the whole pool).
+
+    Returns:
+        Dictionary mapping each sub to an email (or the sub itself as fallback)
+    """
+    emails = {}
+    uncached = []
+    for sub in {sub for sub in subs if sub}:
+        cached = _email_cache.get(sub)
+        if cached is not None:
+            emails[sub] = cached
+        else:
+            uncached.append(sub)
+
+    if not uncached:
+        return emails
+
+    uncached.sort()
+    lookups, deferred = uncached[:MAX_EMAIL_LOOKUPS], uncached[MAX_EMAIL_LOOKUPS:]
+    with ThreadPoolExecutor(max_workers=min(EMAIL_LOOKUP_WORKERS, len(lookups))) as pool:
+        emails.update(zip(lookups, pool.map(get_email_from_sub, lookups)))
+    emails.update((sub, sub) for sub in deferred)
+    return emails
+
+
+def attach_student_emails(attendance_records):
+    emails = resolve_student_emails(record.get('student_id') for record in attendance_records)
+    for record in attendance_records:
+        record['student_email'] = emails.get(record.get('student_id'), "Unknown")
+
+def attendance_page(index_name, key_values, query_params):
+    """
+    One page of attendance from index_name, honouring the limit, next_token
+    and fields query parameters. Tokens are scoped to the index and key
+    values, so a cursor from one class or student cannot be replayed on another.
+    """
+    scope = 'attendance:' + index_name + ':' + ':'.join(key_values[k] for k in sorted(key_values))
+    limit, start_key = page_params(query_params, scope)
+    # student_id is always fetched: professor views attach emails by it
+    fields = requested_fields(query_params, ATTENDANCE_FIELDS, always=('attendance_id', 'student_id'))
+    records, last_key = get_attendance_page(index_name, key_values, limit, start_key, fields)
+    return records, encode_page_token(last_key, scope)
+
+
+def attendance_total(index_name, key_values, records, query_params, next_token):
+    """
+    Present count for the whole query, not just the page that was returned.
+    A single page is counted as is; otherwise a class is summed from its
+    sessions' denormalized attendance_count, falling back to a COUNT query.
+    """
+    if not next_token and not query_params.get('next_token'):
+        return len(records)
+    if index_name == 'class_id-index':
+        sessions = get_sessions_by_class(key_values['class_id'])
+        if sessions and all(session.get('attendance_count') is not None for session in sessions):
+            return int(sum(session['attendance_count'] for session in sessions))
+    return get_attendance_count(index_name, key_values)
+
+
+def session_attendance_total(session, records, query_params, next_token):
+    """Present count for the whole session, not just the page that was returned."""
+    if session.get('attendance_count') is not None:
+        return int(session['attendance_count'])
+    return attendance_total('session_id-index', {'session_id': session['session_id']},
+                            records, query_params, next_token)
+
 
 def lambda_handler(event, context):
     try:
@@ -54,7 +169,7 @@ def lambda_handler(event, context):
             return {
                 'statusCode': 401,
                 'headers': CORS_HEADERS,
-                'body': json.dumps({'error': 'Unauthorized'}, default=default_serializer)
+                'body': dumps({'error': 'Unauthorized'})
             }
 
         query_params = event.get('queryStringParameters') or {}
@@ -70,63 +185,65 @@ def lambda_handler(event, context):
             if session_id:
                 session = get_session(session_id)
                 if not session:
-                    return {'statusCode': 404, 'headers': CORS_HEADERS, 'body': json.dumps({'error': 'not found'}, default=default_serializer)}
+                    return {'statusCode': 404, 'headers': CORS_HEADERS, 'body': dumps({'error': 'not found'})}
 
-                class_data = get_class(session['class_id'])
-                if class_data and class_data.get('professor_id') != user_id:
-                    return {'statusCode': 403, 'headers': CORS_HEADERS, 'body': json.dumps({'error': 'forbidden'}, default=default_serializer)}
+                assert_owns_class(user_id, session['class_id'], user)
 
-                attendance_records = get_attendance_by_session(session_id)
+                attendance_records, next_token = attendance_page(
+                    'session_id-index', {'session_id': session_id}, query_params)
 
                 # ENRICH RECORDS WITH EMAILS
-                for record in attendance_records:
-                    record['student_email'] = get_email_from_sub(record.get('student_id'))
+                attach_student_emails(attendance_records)
 
                 return {
                     'statusCode': 200,
                     'headers': CORS_HEADERS,
-                    'body': json.dumps({
+                    'body': dumps({
                         'session_id': session_id,
-                        'total_present': len(attendance_records),
-                        'attendance_records': attendance_records
-                    }, default=default_serializer)
+                        'total_present': session_attendance_total(session, attendance_records, query_params, next_token),
+                        'attendance_records': attendance_records,
+                        'next_token': next_token
+                    })
                 }
 
             elif class_id:
-                class_data = get_class(class_id)
-                if not class_data or class_data.get('professor_id') != user_id:
-                    return {'statusCode': 403, 'headers': CORS_HEADERS, 'body': json.dumps({'error': 'forbidden'}, default=default_serializer)}
+                assert_owns_class(user_id, class_id, user)
 
                 if student_id:
-                    attendance_records = get_attendance_by_student(student_id, class_id)
+                    index_name, key_values = 'student_class-index', {'student_id': student_id, 'class_id': class_id}
                 else:
-                    attendance_records = dynamodb_utils.get_attendance_by_class(class_id)
+                    index_name, key_values = 'class_id-index', {'class_id': class_id}
+                attendance_records, next_token = attendance_page(index_name, key_values, query_params)
 
                 # ENRICH RECORDS WITH EMAILS
-                for record in attendance_records:
-                    record['student_email'] = get_email_from_sub(record.get('student_id'))
+                attach_student_emails(attendance_records)
 
                 return {
                     'statusCode': 200,
                     'headers': CORS_HEADERS,
-                    'body': json.dumps({
+                    'body': dumps({
                         'class_id': class_id,
-                        'total_present': len(attendance_records),
-                        'attendance_records': attendance_records
-                    }, default=default_serializer)
+                        'total_present': attendance_total(
+                            index_name, key_values, attendance_records, query_params, next_token),
+                        'attendance_records': attendance_records,
+                        'next_token': next_token
+                    })
                 }
 
             elif student_id:
-                attendance_records = get_attendance_by_student(student_id)
+                key_values = {'student_id': student_id}
+                attendance_records, next_token = attendance_page('student_id-index', key_values, query_params)
                 return {
                     'statusCode': 200,
                     'headers': CORS_HEADERS,
-                    'body': json.dumps({
+                    'body': dumps({
                         'student_id': student_id,
                         'student_email': get_email_from_sub(student_id), # Lookup single student email
-                        'total_present': len(attendance_records),
-                        'attendance_records': attendance_records
-                    }, default=default_serializer)
+                        'total_present': attendance_total(
+                            'student_id-index', key_values, attendance_records, query_params, next_token),
+                        'attendance_records': attendance_records,
+                        'next_token': next_token
+                    })
                 }
 
             else:
@@ -134,19 +251,29 @@ def lambda_handler(event, context):
                 return {
                     'statusCode': 200,
                     'headers': CORS_HEADERS,
-                    'body': json.dumps({'classes': classes}, default=default_serializer)
+                    'body': dumps({'classes': classes})
                 }
 
         elif is_student:
-            attendance_records = get_attendance_by_student(user_id, class_id) if class_id else get_attendance_by_student(user_id)
+            if class_id:
+                attendance_records, next_token = attendance_page(
+                    'student_class-index', {'student_id': user_id, 'class_id': class_id}, query_params)
+            else:
+                attendance_records, next_token = attendance_page(
+                    'student_id-index', {'student_id': user_id}, query_params)
             return {
                 'statusCode': 200,
                 'headers': CORS_HEADERS,
-                'body': json.dumps({'attendance_records': attendance_records}, default=default_serializer)
+                'body': dumps({'attendance_records': attendance_records, 'next_token': next_token})
             }
 
-        return {'statusCode': 403, 'headers': CORS_HEADERS, 'body': json.dumps({'error': 'invalid role'}, default=default_serializer)}
+        return {'statusCode': 403, 'headers': CORS_HEADERS, 'body': dumps({'error': 'invalid role'})}
 
+    except (PageRequestError, FieldsRequestError) as e:
+        return {'statusCode': 400, 'headers': CORS_HEADERS, 'body': dumps({'error': str(e)})}
+    except ClassAccessError as e:
+        error = 'forbidden' if e.status_code == 403 else 'not found'
+        return {'statusCode': e.status_code, 'headers': CORS_HEADERS, 'body': dumps({'error': error})}
     except Exception as e:
         print(f"Error: {str(e)}")
-        return {'statusCode': 500, 'headers': CORS_HEADERS, 'body': json.dumps({'error': 'server error'}, default=default_serializer)}
\ No newline at end of file
+        return {'statusCode': 500, 'headers': CORS_HEADERS, 'body': dumps({'error': 'server error'})}
\ No newline at end of file
@@ -1,13 +1,8 @@
 import json
-import os
-import sys
 
-# add shared directory to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared'))
-
-from dynamodb_utils import get_session, check_attendance_exists, get_class
-from auth_utils import get_user_from_event, require_student, get_user_id
-from s3_utils import get_lecture_material_presigned_url
+from shared.dynamodb_utils import get_session, check_attendance_exists, get_class
+from shared.auth_utils import get_user_from_event, require_student, get_user_id
+from shared.s3_utils import get_lecture_material_presigned_url
 
 # Define Universal CORS Headers
 CORS_HEADERS = {
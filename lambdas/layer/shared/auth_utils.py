@@ -0,0 +1,334 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Optional, Dict, FrozenSet
+
+from .cache_utils import TTLCache
+from .dynamodb_utils import get_class, get_class_ids_by_professor
+
+# python-jose and urllib.request are imported inside the verify functions:
+# API Gateway handlers only read authorizer claims and never load them
+
+USER_POOL_ID = os.environ.get('USER_POOL_ID', '')
+CLIENT_ID = os.environ.get('COGNITO_CLIENT_ID', '')
+# pool ids are "<region>_<id>"
+COGNITO_REGION = USER_POOL_ID.split('_', 1)[0] if '_' in USER_POOL_ID else os.environ.get('AWS_REGION', 'us-east-1')
+ISSUER = f"https://cognito-idp.{COGNITO_REGION}.amazonaws.com/{USER_POOL_ID}"
+JWKS_URL = os.environ.get('JWKS_URL', f"{ISSUER}/.well-known/jwks.json")
+
+JWKS_CACHE_TTL = float(os.environ.get('JWKS_CACHE_TTL', '3600'))
+# an unknown kid triggers at most one JWKS fetch per interval
+JWKS_MIN_REFRESH_SECONDS = float(os.environ.get('JWKS_MIN_REFRESH_SECONDS', '60'))
+VERIFIED_TOKEN_CACHE_SIZE = int(os.environ.get('VERIFIED_TOKEN_CACHE_SIZE', '1024'))
+
+# kid -> public key object, built once per fetch
+_jwks_cache = TTLCache(maxsize=1, ttl=JWKS_CACHE_TTL)
+_jwks_lock = threading.Lock()
+_last_jwks_fetch = float('-inf')
+
+# sha256(token) -> verified claims, each entry kept until the token's exp
+_verified_tokens = TTLCache(maxsize=VERIFIED_TOKEN_CACHE_SIZE, ttl=0)
+
+# professor_id -> frozenset of owned class ids, from professor_id-index
+OWNED_CLASSES_CACHE_TTL = float(os.environ.get('OWNED_CLASSES_CACHE_TTL', '300'))
+_owned_classes = TTLCache(maxsize=1024, ttl=OWNED_CLASSES_CACHE_TTL)
+
+
+def load_jwks(jwks: Dict) -> Dict[str, Any]:
+    """
+    Args:
+        jwks: JWKS document ({"keys": [...]})
+
+    Returns:
+        kid -> RS256 public key object; also replaces the cached key set
+    """
+    from jose import jwk
+    keys = {k['kid']: jwk.construct(k, 'RS256') for k in jwks.get('keys', []) if k.get('kid')}
+    _jwks_cache.set('keys', keys)
+    return keys
+
+
+def fetch_jwks() -> Dict:
+    import urllib.request
+    with urllib.request.urlopen(JWKS_URL, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def get_jwks(refresh: bool = False) -> Dict[str, Any]:
+    """
+    Args:
+        refresh: Fetch the key set again (after a key rotation); ignored within
+            JWKS_MIN_REFRESH_SECONDS of the previous fetch
+
+    Returns:
+        kid -> public key object
+    """
+    global _last_jwks_fetch
+    keys = _jwks_cache.get('keys')
+    if keys is not None and not refresh:
+        return keys
+
+    with _jwks_lock:
+        keys = _jwks_cache.get('keys')
+        if keys is not None and time.monotonic() - _last_jwks_fetch < JWKS_MIN_REFRESH_SECONDS:
+            return keys
+        _last_jwks_fetch = time.monotonic()
+        return load_jwks(fetch_jwks())
+
+
+def clear_token_caches() -> None:
+    """Forget the cached key set and verified tokens."""
+    global _last_jwks_fetch
+    _jwks_cache.clear()
+    _verified_tokens.clear()
+    _last_jwks_fetch = float('-inf')
+
+
+def user_from_claims(claims: Dict) -> Dict:
+    """
+    Arg:
+        claims: Cognito ID token claims
+
+    Returns:
+        Dictionary with user information and role flags
+    """
+    raw_groups = claims.get('cognito:groups', '')
+    group_list = raw_groups.split(',') if isinstance(raw_groups, str) else raw_groups
+    return {
+        'user_id': claims.get('sub'),
+        'email': claims.get('email'),
+        'username': claims.get('cognito:username'),
+        'groups': group_list,
+        'is_professor': 'professors' in group_list,
+        'is_student': 'students' in group_list
+    }
+
+
+def _context_flag(value) -> bool:
+    # API Gateway hands authorizer context values to the integration as strings
+    return value is True or str(value).lower() == 'true'
+
+
+def user_from_authorizer_context(context: Dict) -> Dict:
+    """
+    Arg:
+        context: requestContext.authorizer produced by the authorizer Lambda
+
+    Returns:
+        Dictionary with user information, role flags and owned class ids
+    """
+    groups = context.get('groups') or ''
+    owned = context.get('owned_class_ids') or ''
+    return {
+        'user_id': context.get('user_id'),
+        'email': context.get('email') or None,
+        'username': context.get('username') or None,
+        'groups': [g for g in groups.split(',') if g],
+        'is_professor': _context_flag(context.get('is_professor')),
+        'is_student': _context_flag(context.get('is_student')),
+        'owned_class_ids': [c for c in owned.split(',') if c]
+    }
+
+
+def get_user_from_event(event: Dict) -> Optional[Dict]:
+    """
+    Arg:
+        event: API Gateway Lambda event
+    
+    Returns:
+        Dictionary with user information or None if not authenticated
+    """
+    try:
+        if 'requestContext' in event and 'authorizer' in event['requestContext']:
+            authorizer = event['requestContext']['authorizer'] or {}
+
+            # Cognito user pool authorizer claims
+            claims = authorizer.get('claims', {})
+            if claims:
+                return user_from_claims(claims)
+
+            # context precomputed by the authorizer Lambda
+            if authorizer.get('user_id'):
+                return user_from_authorizer_context(authorizer)
+        
+        # fallback: check for identity context (if using IAM authorizer)
+        if 'requestContext' in event and 'identity' in event['requestContext']:
+            identity = event['requestContext']['identity']
+            return {
+                'user_id': identity.get('cognitoIdentityId'),
+                'source_ip': identity.get('sourceIp')
+            }
+        
+        return None
+    except Exception as e:
+        print(f"Error extracting user from event: {e}")
+        return None
+
+
+def verify_token(token: str) -> Optional[Dict]:
+    """
+    Verify and decode a Cognito ID token (RS256) against the user pool's JWKS.
+
+    A token that verified before is answered from an LRU of token hashes
+    until its exp, so repeat calls skip the RSA check. A kid missing from
+    the cached key set triggers one (rate-limited) JWKS refresh.
+
+    Arg:
+        token: JWT token string
+
+    Returns:
+        Decoded token claims or None if invalid
+    """
+    from jose import jwt, JWTError
+
+    digest = hashlib.sha256(token.encode()).digest()
+    claims = _verified_tokens.get(digest)
+    if claims is not None:
+        return dict(claims)
+
+    try:
+        kid = jwt.get_unverified_header(token).get('kid')
+        keys = get_jwks()
+        if kid not in keys:
+            keys = get_jwks(refresh=True)
+        if kid not in keys:
+            print(f"[auth_utils] JWT verification failed: unknown kid {kid}")
+            return None
+
+        claims = jwt.decode(
+            token,
+            keys[kid],
+            algorithms=["RS256"],
+            audience=CLIENT_ID,
+            issuer=ISSUER
+        )
+    except JWTError as e:
+        print(f"[auth_utils] JWT verification failed: {e}")
+        return None
+    except Exception as e:
+        print(f"Unexpected error in token verification: {e}")
+        return None
+
+    ttl = claims.get('exp', 0) - time.time()
+    if ttl > 0:
+        _verified_tokens.set(digest, claims, ttl=ttl)
+    return dict(claims)
+
+
+# former name, kept for existing callers
+verify_jwt = verify_token
+
+
+def require_professor(user: Optional[Dict]) -> bool:
+    """
+    Arg:
+        user: User dictionary from get_user_from_event
+    
+    Returns:
+        True if user is a professor and False otherwise
+    """
+    if not user:
+        return False
+    return user.get('is_professor', False)
+
+
+def require_student(user: Optional[Dict]) -> bool:
+    """
+    Arg:
+        user: User dictionary from get_user_from_event
+    
+    Returns:
+        True if user is a student and False otherwise
+    """
+    if not user:
+        return False
+    return user.get('is_student', False)
+
+
+def get_user_id(user: Optional[Dict]) -> Optional[str]:
+    """
+    Arg:
+        user: User dictionary from get_user_from_event
+    
+    Returns:
+        User ID string or None
+    """
+    if not user:
+        return None
+    return user.get('user_id') or user.get('cognitoIdentityId')
+
+
+def owned_class_ids(user: Optional[Dict]) -> FrozenSet[str]:
+    """
+    Arg:
+        user: User dictionary from get_user_from_event
+
+    Returns:
+        Class ids the authorizer found for this professor. The set may lag
+        behind a class created within the authorizer cache TTL, so a class
+        missing from it still needs a lookup; a class in it is owned.
+    """
+    if not user:
+        return frozenset()
+    return frozenset(user.get('owned_class_ids') or ())
+
+
+class ClassAccessError(Exception):
+    """Raised by assert_owns_class; carries the HTTP status and error message to return."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+def professor_class_ids(professor_id: str, refresh: bool = False) -> FrozenSet[str]:
+    """
+    Args:
+        professor_id: Professor user id
+        refresh: Re-read the index even if the cached set is still fresh
+
+    Returns:
+        Ids of the professor's classes, cached per container for OWNED_CLASSES_CACHE_TTL
+    """
+    owned = None if refresh else _owned_classes.get(professor_id)
+    if owned is None:
+        owned = frozenset(get_class_ids_by_professor(professor_id))
+        _owned_classes.set(professor_id, owned)
+    return owned
+
+
+def clear_ownership_cache() -> None:
+    """Forget every cached professor -> class ids set."""
+    _owned_classes.clear()
+
+
+def assert_owns_class(professor_id: Optional[str], class_id: str, user: Optional[Dict] = None) -> None:
+    """
+    Ownership check answered from the authorizer context or the per-container
+    ownership index, so an owned class costs no DynamoDB read. A class missing
+    from a cached set may be new, so the index is read again once before the
+    class item is consulted to tell 404 from 403.
+
+    Args:
+        professor_id: Caller's user id
+        class_id: Class being accessed
+        user: User dictionary from get_user_from_event (its owned_class_ids are checked first)
+
+    Raises:
+        ClassAccessError: 404 if the class does not exist, 403 if someone else owns it
+    """
+    if class_id in owned_class_ids(user):
+        return
+    if professor_id:
+        cached = _owned_classes.get(professor_id)
+        if cached is not None and class_id in cached:
+            return
+        if class_id in professor_class_ids(professor_id, refresh=True):
+            return
+
+    if not get_class(class_id):
+        raise ClassAccessError(404, 'class not found')
+    raise ClassAccessError(403, 'you do not own this class')
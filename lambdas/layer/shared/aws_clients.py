@@ -0,0 +1,49 @@
+"""
+Lazily constructed boto3 clients and resources, shared by the utils modules.
+
+Importing boto3 and building a client each take tens of milliseconds, so
+nothing is created at import time: a Lambda pays for a service the first
+time it calls it, and every later call in the container reuses the object.
+"""
+import threading
+
+_lock = threading.Lock()
+_clients = {}
+_resources = {}
+
+
+def client(service_name: str):
+    """
+    Args:
+        service_name: boto3 service name ('s3', 'sns', 'cognito-idp', ...)
+
+    Returns:
+        The container-wide client for the service, created on first use
+    """
+    found = _clients.get(service_name)
+    if found is None:
+        # building clients from the default session is not thread-safe
+        with _lock:
+            found = _clients.get(service_name)
+            if found is None:
+                import boto3
+                found = _clients[service_name] = boto3.client(service_name)
+    return found
+
+
+def resource(service_name: str):
+    """
+    Args:
+        service_name: boto3 resource name ('dynamodb')
+
+    Returns:
+        The container-wide resource for the service, created on first use
+    """
+    found = _resources.get(service_name)
+    if found is None:
+        with _lock:
+            found = _resources.get(service_name)
+            if found is None:
+                import boto3
+                found = _resources[service_name] = boto3.resource(service_name)
+    return found
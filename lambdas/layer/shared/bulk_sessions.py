@@ -0,0 +1,276 @@
+"""
+Pre-generate every session of a recurring class schedule in one pass.
+
+Used by the manage-sessions bulk endpoint and as a CLI for setting up a
+whole term:
+
+    python -m shared.bulk_sessions schedules.json --workers 8
+
+(`bulk-sessions` once the layer package is pip-installed), where
+schedules.json holds one schedule object or a list of them (see
+expand_schedule for the format).
+"""
+import os
+import sys
+import json
+import uuid
+import argparse
+from itertools import repeat
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from datetime import datetime, date, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+from zoneinfo import ZoneInfo
+
+from . import qr_generator
+from .dynamodb_utils import batch_create_sessions
+
+
+WEEKDAYS = {'MON': 0, 'TUE': 1, 'WED': 2, 'THU': 3, 'FRI': 4, 'SAT': 5, 'SUN': 6}
+MAX_SESSIONS_PER_SCHEDULE = int(os.environ.get('BULK_MAX_SESSIONS', '400'))
+UPLOAD_WORKERS = int(os.environ.get('BULK_UPLOAD_WORKERS', '16'))
+RENDER_WORKERS = int(os.environ.get('BULK_RENDER_WORKERS', '4'))
+# pre-generated codes open this long before the start and close this long after the end
+QR_GRACE_MINUTES = int(os.environ.get('QR_SCHEDULE_GRACE_MINUTES', '15'))
+DEFAULT_SESSION_MINUTES = 60
+
+ProgressCallback = Callable[[str, int, int], None]
+
+
+def _parse_time(value: str, field: str):
+    try:
+        return datetime.strptime(value, '%H:%M').time()
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be HH:MM")
+
+
+def _parse_date(value: str, field: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be YYYY-MM-DD")
+
+
+def expand_schedule(schedule: Dict) -> List[Dict]:
+    """
+    Args:
+        schedule: {
+            'class_id': str,
+            'start_date': 'YYYY-MM-DD', 'end_date': 'YYYY-MM-DD' (inclusive),
+            'days': ['MON', 'WED', ...],
+            'start_time': 'HH:MM', 'end_time': 'HH:MM' (optional),
+            'skip_dates': ['YYYY-MM-DD', ...] (optional, e.g. holidays),
+            'timezone': IANA name for the times above (optional, default UTC)
+        }
+
+    Returns:
+        Session items in date order, without QR code fields
+
+    Raises:
+        ValueError: If the schedule is malformed or too long
+    """
+    class_id = schedule.get('class_id')
+    if not class_id:
+        raise ValueError("class_id is required")
+
+    start_date = _parse_date(schedule.get('start_date'), 'start_date')
+    end_date = _parse_date(schedule.get('end_date'), 'end_date')
+    if end_date < start_date:
+        raise ValueError("end_date must not be before start_date")
+
+    start_time = _parse_time(schedule.get('start_time'), 'start_time')
+    end_time = schedule.get('end_time')
+    if end_time is not None:
+        end_time = _parse_time(end_time, 'end_time')
+        if end_time <= start_time:
+            raise ValueError("end_time must be after start_time")
+
+    days = schedule.get('days') or []
+    try:
+        weekdays = {WEEKDAYS[str(day).upper()[:3]] for day in days}
+    except KeyError:
+        raise ValueError(f"days must be weekday names, got {days}")
+    if not weekdays:
+        raise ValueError("days is required")
+
+    tz_name = schedule.get('timezone') or 'UTC'
+    try:
+        ZoneInfo(tz_name)
+    except Exception:
+        raise ValueError(f"unknown timezone {tz_name}")
+
+    skip_dates = {_parse_date(d, 'skip_dates') for d in schedule.get('skip_dates') or []}
+    created_at = datetime.utcnow().isoformat()
+
+    sessions = []
+    day = start_date
+    while day <= end_date:
+        if day.weekday() in weekdays and day not in skip_dates:
+            sessions.append({
+                'session_id': str(uuid.uuid4()),
+                'class_id': class_id,
+                'session_date': day.isoformat(),
+                'start_time': start_time.strftime('%H:%M'),
+                'end_time': end_time.strftime('%H:%M') if end_time else None,
+                'timezone': tz_name,
+                'created_at': created_at
+            })
+            if len(sessions) > MAX_SESSIONS_PER_SCHEDULE:
+                raise ValueError(f"schedule expands to more than {MAX_SESSIONS_PER_SCHEDULE} sessions")
+        day += timedelta(days=1)
+
+    return sessions
+
+
+def qr_validity_window(session: Dict) -> tuple:
+    """
+    Returns:
+        (valid_from, expires_at) as naive UTC datetimes for a scheduled session
+    """
+    tz = ZoneInfo(session.get('timezone') or 'UTC')
+    day = date.fromisoformat(session['session_date'])
+    start = datetime.combine(day, _parse_time(session['start_time'], 'start_time'), tzinfo=tz)
+    if session.get('end_time'):
+        end = datetime.combine(day, _parse_time(session['end_time'], 'end_time'), tzinfo=tz)
+    else:
+        end = start + timedelta(minutes=DEFAULT_SESSION_MINUTES)
+
+    grace = timedelta(minutes=QR_GRACE_MINUTES)
+    to_utc = lambda value: value.astimezone(timezone.utc).replace(tzinfo=None)
+    return to_utc(start - grace), to_utc(end + grace)
+
+
+def _render_all(executor: Executor, qr_strings: List[str], image_format: str):
+    """Render images in order; process pools get chunked to amortise pickling."""
+    chunksize = 8 if isinstance(executor, ProcessPoolExecutor) else 1
+    return executor.map(qr_generator.render_qr_image, qr_strings,
+                        repeat(image_format), chunksize=chunksize)
+
+
+def pregenerate_sessions(schedule: Dict, render_executor: Optional[Executor] = None,
+                         upload_workers: int = UPLOAD_WORKERS,
+                         progress: Optional[ProgressCallback] = None,
+                         image_format: Optional[str] = None) -> Dict:
+    """
+    Expand a schedule, render and upload a QR code per session, then write
+    every session item with a single batch writer.
+
+    Rendering runs on render_executor (a ProcessPoolExecutor from the CLI;
+    a thread pool by default, since Lambda has no /dev/shm for process
+    pools). Each rendered image is uploaded as soon as it is ready, so
+    uploads overlap rendering.
+
+    Args:
+        schedule: Schedule object (see expand_schedule)
+        render_executor: Executor for QR rendering (default: a thread pool)
+        upload_workers: Concurrent S3 uploads
+        progress: Called as progress(stage, done, total) for 'rendered' and 'uploaded'
+        image_format: 'png', 'svg' or 'matrix' (default: QR_IMAGE_FORMAT)
+
+    Returns:
+        {'statusCode': 200 or 500, 'class_id', 'sessions', 'created', 'failed_uploads'}
+
+    Raises:
+        ValueError: If the schedule is malformed
+    """
+    sessions = expand_schedule(schedule)
+    total = len(sessions)
+    image_format = image_format or qr_generator.QR_IMAGE_FORMAT
+    report = progress or (lambda stage, done, total: None)
+
+    qr_strings = []
+    for session in sessions:
+        valid_from, expires_at = qr_validity_window(session)
+        qr_data = qr_generator.generate_qr_code_data(
+            session['session_id'], session['class_id'],
+            valid_from=valid_from, expires_at=expires_at
+        )
+        qr_strings.append(qr_generator.encode_qr_payload(qr_data))
+
+    owns_executor = render_executor is None
+    if owns_executor:
+        render_executor = ThreadPoolExecutor(max_workers=RENDER_WORKERS)
+
+    urls = {}
+    try:
+        with ThreadPoolExecutor(max_workers=upload_workers) as uploader:
+            uploads = {}
+            rendered = _render_all(render_executor, qr_strings, image_format)
+            for index, (session, qr_string, image) in enumerate(zip(sessions, qr_strings, rendered), start=1):
+                report('rendered', index, total)
+                future = uploader.submit(qr_generator.put_qr_image, qr_string, image, image_format)
+                uploads[future] = session['session_id']
+
+            for done, future in enumerate(as_completed(uploads), start=1):
+                urls[uploads[future]] = future.result()
+                report('uploaded', done, total)
+    finally:
+        if owns_executor:
+            render_executor.shutdown()
+
+    for session, qr_string in zip(sessions, qr_strings):
+        qr_code_url = urls.get(session['session_id'])
+        session['qr_code_url'] = qr_code_url
+        session['qr_code_data'] = qr_string
+        session['is_active'] = bool(qr_code_url)
+
+    result = batch_create_sessions(sessions)
+    summary = {
+        'statusCode': result.get('statusCode'),
+        'class_id': schedule['class_id'],
+        'sessions': sessions,
+        'created': result.get('count', 0),
+        'failed_uploads': sum(1 for session in sessions if not session['qr_code_url'])
+    }
+    if 'error' in result:
+        summary['error'] = result['error']
+    return summary
+
+
+def _print_progress(label: str) -> ProgressCallback:
+    def report(stage: str, done: int, total: int) -> None:
+        end = '\n' if done == total else ''
+        print(f"\r[{label}] {stage} {done}/{total}", end=end, file=sys.stderr, flush=True)
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Pre-generate sessions and QR codes for class schedules")
+    parser.add_argument('schedule_file', help="JSON file with one schedule or a list of schedules")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="QR render processes")
+    parser.add_argument('--upload-workers', type=int, default=UPLOAD_WORKERS, help="concurrent S3 uploads")
+    parser.add_argument('--format', choices=sorted(qr_generator.RENDERERS), default=None,
+                        help="QR image format (default: QR_IMAGE_FORMAT)")
+    parser.add_argument('--dry-run', action='store_true', help="only expand and count sessions")
+    args = parser.parse_args(argv)
+
+    with open(args.schedule_file) as f:
+        schedules = json.load(f)
+    if isinstance(schedules, dict):
+        schedules = [schedules]
+
+    # validate everything before writing anything
+    counts = [len(expand_schedule(schedule)) for schedule in schedules]
+    print(f"{len(schedules)} schedule(s), {sum(counts)} session(s)", file=sys.stderr)
+    if args.dry_run:
+        return 0
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for schedule in schedules:
+            result = pregenerate_sessions(schedule, render_executor=pool,
+                                          upload_workers=args.upload_workers,
+                                          progress=_print_progress(schedule['class_id']),
+                                          image_format=args.format)
+            print(json.dumps({
+                'class_id': result['class_id'],
+                'created': result['created'],
+                'failed_uploads': result['failed_uploads'],
+                'error': result.get('error')
+            }))
+            if result['statusCode'] != 200 or result['failed_uploads']:
+                failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
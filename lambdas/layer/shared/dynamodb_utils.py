@@ -0,0 +1,765 @@
+import os
+import copy
+import functools
+import uuid
+from datetime import datetime, timedelta
+from botocore.exceptions import ClientError
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+
+from . import aws_clients
+from .cache_utils import TTLCache
+from .json_utils import from_dynamodb
+from .models import Attendance
+from .qr_generator import revocation_horizon
+
+# table names from environment variables
+CLASSES_TABLE = os.environ.get('CLASSES_TABLE', 'classes')
+SESSIONS_TABLE = os.environ.get('SESSIONS_TABLE', 'sessions')
+ATTENDANCE_TABLE = os.environ.get('ATTENDANCE_TABLE', 'attendance')
+
+# opt-in read-through cache for get_class/get_session; a TTL of 0 disables it
+CLASSES_CACHE_TTL = float(os.environ.get('CLASSES_CACHE_TTL', '0'))
+SESSIONS_CACHE_TTL = float(os.environ.get('SESSIONS_CACHE_TTL', '0'))
+ITEM_CACHE_MAX_SIZE = int(os.environ.get('ITEM_CACHE_MAX_SIZE', '512'))
+
+_item_caches = {
+    CLASSES_TABLE: TTLCache(maxsize=ITEM_CACHE_MAX_SIZE, ttl=CLASSES_CACHE_TTL),
+    SESSIONS_TABLE: TTLCache(maxsize=ITEM_CACHE_MAX_SIZE, ttl=SESSIONS_CACHE_TTL),
+}
+
+# a revoked session's QR codes are refused through a small item of its own in
+# the sessions table: min_epoch (lowest activity epoch still accepted) and
+# revoked_until, the table's TTL attribute, set to when every code it could
+# reject has expired anyway. DynamoDB then deletes the item.
+REVOCATION_KEY_PREFIX = '__revoked__#'
+REVOCATION_CACHE_TTL = float(os.environ.get('REVOCATION_CACHE_TTL', '30'))
+_revocation_cache = TTLCache(maxsize=ITEM_CACHE_MAX_SIZE, ttl=REVOCATION_CACHE_TTL)
+
+# reconciliation leaves sessions scanned this recently alone (the attendance
+# GSI is eventually consistent) and retries a write that raced a scan
+RECONCILE_QUIET_SECONDS = int(os.environ.get('RECONCILE_QUIET_SECONDS', '300'))
+RECONCILE_ATTEMPTS = 3
+
+# namespace for deterministic attendance ids (one record per session + student)
+ATTENDANCE_ID_NAMESPACE = uuid.UUID('6f1c2a3e-8b4d-5e7f-9a0b-1c2d3e4f5a6b')
+
+def get_table(table_name: str):
+    # the DynamoDB resource is created on first use (see aws_clients)
+    return aws_clients.resource('dynamodb').Table(table_name)
+
+
+def get_client():
+    # low-level client for the wire-format read path (see query_models)
+    return aws_clients.client('dynamodb')
+
+
+def serialize_item(item: Dict) -> Dict:
+    # one walk over the item (Decimal -> int/float) instead of a JSON round trip
+    return from_dynamodb(item)
+
+
+def query_iter(table, max_items: Optional[int] = None,
+               projection: Optional[List[str]] = None, **query_kwargs) -> Iterator[Dict]:
+    """
+    Lazily yield serialized items from table.query, following LastEvaluatedKey
+    across DynamoDB's 1 MB pages.
+
+    Args:
+        table: boto3 Table resource
+        max_items: Stop after yielding this many items (default: no cap)
+        projection: Attribute names to fetch instead of the full item
+        **query_kwargs: Passed through to table.query
+
+    Yields:
+        Serialized items, one at a time
+
+    Raises:
+        ClientError from the underlying query; callers decide how to degrade
+    """
+    if max_items is not None and max_items <= 0:
+        return
+
+    _apply_projection(query_kwargs, projection)
+    yield from _paginate(table.query, serialize_item, max_items, query_kwargs)
+
+
+def _apply_projection(query_kwargs: Dict, projection: Optional[List[str]]) -> None:
+    # placeholders keep reserved words (location, timezone, ...) usable as attribute names
+    if not projection:
+        return
+    names = dict(query_kwargs.get('ExpressionAttributeNames', {}))
+    placeholders = []
+    for i, attr in enumerate(projection):
+        placeholder = f"#p{i}"
+        names[placeholder] = attr
+        placeholders.append(placeholder)
+    query_kwargs['ProjectionExpression'] = ", ".join(placeholders)
+    query_kwargs['ExpressionAttributeNames'] = names
+
+
+def query_models(model, table_name: str, max_items: Optional[int] = None,
+                 projection: Optional[List[str]] = None, **query_kwargs) -> Iterator[Any]:
+    """
+    Like query_iter, but on the low-level client: items stay in wire format
+    until model.from_item decodes them, skipping the resource layer's
+    TypeDeserializer and the Decimal conversion after it.
+
+    Args:
+        model: Class with a from_item(wire_item) constructor (see models)
+        table_name: DynamoDB table name
+        max_items: Stop after yielding this many items (default: no cap)
+        projection: Attribute names to fetch; the model's other fields stay None
+        **query_kwargs: Passed through to client.query; ExpressionAttributeValues
+            must be in wire format ({':cid': {'S': class_id}})
+
+    Yields:
+        model instances, one at a time
+
+    Raises:
+        ClientError from the underlying query; callers decide how to degrade
+    """
+    if max_items is not None and max_items <= 0:
+        return
+    _apply_projection(query_kwargs, projection)
+    query = functools.partial(get_client().query, TableName=table_name)
+    yield from _paginate(query, model.from_item, max_items, query_kwargs)
+
+
+def query_page(table, limit: Optional[int], start_key: Optional[Dict] = None,
+               projection: Optional[List[str]] = None, **query_kwargs) -> Tuple[List[Dict], Optional[Dict]]:
+    """
+    One page of table.query for cursor-paginated endpoints.
+
+    Args:
+        table: boto3 Table resource
+        limit: Page size; None reads every page and returns no key
+        start_key: ExclusiveStartKey from the previous page's cursor
+        projection: Attribute names to fetch instead of the full item
+        **query_kwargs: Passed through to table.query
+
+    Returns:
+        (serialized items, LastEvaluatedKey or None on the last page)
+
+    Raises:
+        ClientError from the underlying query
+    """
+    _apply_projection(query_kwargs, projection)
+    if start_key:
+        query_kwargs['ExclusiveStartKey'] = start_key
+    if limit is None:
+        return list(_paginate(table.query, serialize_item, None, query_kwargs)), None
+    response = table.query(Limit=limit, **query_kwargs)
+    return [serialize_item(item) for item in response.get('Items', [])], response.get('LastEvaluatedKey')
+
+
+def query_models_page(model, table_name: str, limit: Optional[int], start_key: Optional[Dict] = None,
+                      projection: Optional[List[str]] = None, **query_kwargs) -> Tuple[List[Any], Optional[Dict]]:
+    """
+    query_page on the low-level client; items are decoded by model.from_item
+    and the returned key stays in wire format.
+    """
+    _apply_projection(query_kwargs, projection)
+    if start_key:
+        query_kwargs['ExclusiveStartKey'] = start_key
+    query = functools.partial(get_client().query, TableName=table_name)
+    if limit is None:
+        return list(_paginate(query, model.from_item, None, query_kwargs)), None
+    response = query(Limit=limit, **query_kwargs)
+    return [model.from_item(item) for item in response.get('Items', [])], response.get('LastEvaluatedKey')
+
+
+def _paginate(query, decode, max_items: Optional[int], query_kwargs: Dict) -> Iterator[Any]:
+    yielded = 0
+    while True:
+        if max_items is not None:
+            # never ask DynamoDB for more than we are going to hand back
+            page_limit = max_items - yielded
+            query_kwargs['Limit'] = min(query_kwargs.get('Limit', page_limit), page_limit)
+
+        response = query(**query_kwargs)
+        for item in response.get('Items', []):
+            yield decode(item)
+            yielded += 1
+            if max_items is not None and yielded >= max_items:
+                return
+
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            return
+        query_kwargs['ExclusiveStartKey'] = last_key
+
+
+def _get_item_cached(table_name: str, key: Dict) -> Optional[Dict]:
+    """
+    get_item through the per-table cache when that table's TTL is enabled.
+    Misses are not cached, and callers always receive their own copy.
+    """
+    cache = _item_caches.get(table_name)
+    cache_key = tuple(key.values())
+    if cache is not None and cache.ttl > 0:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+    response = get_table(table_name).get_item(Key=key)
+    if 'Item' not in response:
+        return None
+
+    item = serialize_item(response['Item'])
+    if cache is not None and cache.ttl > 0:
+        cache.set(cache_key, copy.deepcopy(item))
+    return item
+
+
+def invalidate_cached_item(table_name: str, key_value: str) -> None:
+    cache = _item_caches.get(table_name)
+    if cache is not None:
+        cache.invalidate((key_value,))
+
+
+def get_item_cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Returns:
+        Hit/miss/size counters per cached table
+    """
+    return {table_name: cache.stats() for table_name, cache in _item_caches.items()}
+
+
+def clear_item_cache() -> None:
+    for cache in _item_caches.values():
+        cache.clear()
+
+
+def create_class(class_data: Dict) -> Dict:
+    table = get_table(CLASSES_TABLE)
+    try:
+        response = table.put_item(Item=class_data)
+        invalidate_cached_item(CLASSES_TABLE, class_data['class_id'])
+        return {'statusCode': 200, 'body': serialize_item(class_data)}
+    except ClientError as e:
+        return {'statusCode': 500, 'error': str(e)}
+
+
+def get_class(class_id: str) -> Optional[Dict]:
+    try:
+        return _get_item_cached(CLASSES_TABLE, {'class_id': class_id})
+    except ClientError as e:
+        print(f"Error getting class: {e}")
+        return None
+
+
+def get_classes_by_professor(professor_id: str) -> List[Dict]:
+    table = get_table(CLASSES_TABLE)
+    try:
+        return list(query_iter(
+            table,
+            IndexName='professor_id-index',
+            KeyConditionExpression='professor_id = :prof_id',
+            ExpressionAttributeValues={':prof_id': professor_id}
+        ))
+    except ClientError as e:
+        print(f"Error querying classes: {e}")
+        return []
+
+
+def get_class_ids_by_professor(professor_id: str) -> List[str]:
+    """Ids of the professor's classes, read from professor_id-index with a projection."""
+    table = get_table(CLASSES_TABLE)
+    try:
+        return [item['class_id'] for item in query_iter(
+            table,
+            projection=['class_id'],
+            IndexName='professor_id-index',
+            KeyConditionExpression='professor_id = :prof_id',
+            ExpressionAttributeValues={':prof_id': professor_id}
+        )]
+    except ClientError as e:
+        print(f"Error querying classes: {e}")
+        return []
+
+
+def create_session(session_data: Dict) -> Dict:
+    table = get_table(SESSIONS_TABLE)
+    try:
+        response = table.put_item(Item=session_data)
+        invalidate_cached_item(SESSIONS_TABLE, session_data['session_id'])
+        return {'statusCode': 200, 'body': serialize_item(session_data)}
+    except ClientError as e:
+        return {'statusCode': 500, 'error': str(e)}
+
+
+def batch_create_sessions(sessions: List[Dict]) -> Dict:
+    """
+    Write many session items with one batch writer (25 items per request,
+    unprocessed items are retried by boto3).
+
+    Args:
+        sessions: Session items, each with a session_id
+
+    Returns:
+        {'statusCode': 200, 'count': n} or {'statusCode': 500, 'error': ...}
+    """
+    table = get_table(SESSIONS_TABLE)
+    try:
+        with table.batch_writer(overwrite_by_pkeys=['session_id']) as batch:
+            for session_data in sessions:
+                batch.put_item(Item=session_data)
+        for session_data in sessions:
+            invalidate_cached_item(SESSIONS_TABLE, session_data['session_id'])
+        return {'statusCode': 200, 'count': len(sessions)}
+    except ClientError as e:
+        return {'statusCode': 500, 'error': str(e)}
+
+
+def get_session(session_id: str) -> Optional[Dict]:
+    try:
+        return _get_item_cached(SESSIONS_TABLE, {'session_id': session_id})
+    except ClientError as e:
+        print(f"Error getting session: {e}")
+        return None
+
+
+def get_sessions_by_class(class_id: str) -> List[Dict]:
+    table = get_table(SESSIONS_TABLE)
+    try:
+        return list(query_iter(
+            table,
+            IndexName='class_id-index',
+            KeyConditionExpression='class_id = :cid',
+            ExpressionAttributeValues={':cid': class_id}
+        ))
+    except ClientError as e:
+        print(f"Error querying sessions: {e}")
+        return []
+
+
+def get_sessions_page_by_class(class_id: str, limit: Optional[int], start_key: Optional[Dict] = None,
+                               projection: Optional[List[str]] = None) -> Tuple[List[Dict], Optional[Dict]]:
+    """
+    Returns:
+        (sessions, LastEvaluatedKey) for one page of class_id-index,
+        with only the projection attributes when one is given
+    """
+    try:
+        return query_page(
+            get_table(SESSIONS_TABLE),
+            limit,
+            start_key,
+            projection,
+            IndexName='class_id-index',
+            KeyConditionExpression='class_id = :cid',
+            ExpressionAttributeValues={':cid': class_id}
+        )
+    except ClientError as e:
+        print(f"Error querying sessions: {e}")
+        return [], None
+
+
+def update_session(session_id: str, updates: Dict) -> bool:
+    if updates.get('is_active') is False:
+        # a plain write would leave the session's signed QR codes valid
+        raise ValueError("use deactivate_session() to deactivate a session")
+    table = get_table(SESSIONS_TABLE)
+    try:
+        update_expression = "SET " + ", ".join([f"{k} = :{k}" for k in updates.keys()])
+        expression_values = {f":{k}": v for k, v in updates.items()}
+        
+        table.update_item(
+            Key={'session_id': session_id},
+            UpdateExpression=update_expression,
+            ExpressionAttributeValues=expression_values
+        )
+        invalidate_cached_item(SESSIONS_TABLE, session_id)
+        return True
+    except ClientError as e:
+        print(f"Error updating session: {e}")
+        return False
+
+
+def increment_session_attendance(session_id: str, scan_timestamp: str) -> bool:
+    """
+    Atomically bump the denormalized attendance counter on a session item
+    and record the first/last scan timestamps. The session cache is left
+    alone on purpose: scans only read is_active and lecture materials, and
+    invalidating on every scan would defeat the cache during a scan burst.
+
+    Args:
+        session_id: Session identifier
+        scan_timestamp: ISO timestamp of the scan being counted
+
+    Returns:
+        True if successful or False otherwise
+    """
+    table = get_table(SESSIONS_TABLE)
+    try:
+        table.update_item(
+            Key={'session_id': session_id},
+            UpdateExpression=(
+                "ADD attendance_count :one "
+                "SET last_scan_at = :ts, first_scan_at = if_not_exists(first_scan_at, :ts)"
+            ),
+            ConditionExpression='attribute_exists(session_id)',
+            ExpressionAttributeValues={':one': 1, ':ts': scan_timestamp}
+        )
+        return True
+    except ClientError as e:
+        print(f"Error incrementing attendance count: {e}")
+        return False
+
+
+def reconcile_session_attendance(session_id: str) -> Optional[Dict]:
+    """
+    Recompute a session's attendance counter and scan timestamps from the
+    session_id-index and overwrite what the item holds, but only if no scan
+    was counted in between: the write is conditional on attendance_count
+    still being the value read before the recount, and is retried
+    (RECONCILE_ATTEMPTS) when a concurrent increment wins. Sessions with a
+    scan in the last RECONCILE_QUIET_SECONDS are skipped, since the index
+    may not show those records yet.
+
+    Args:
+        session_id: Session identifier
+
+    Returns:
+        Dictionary with the recomputed values ('skipped': True when the
+        session was left alone) or None if error
+    """
+    sessions = get_table(SESSIONS_TABLE)
+    try:
+        for _ in range(RECONCILE_ATTEMPTS):
+            current = sessions.get_item(
+                Key={'session_id': session_id},
+                ProjectionExpression='attendance_count, last_scan_at',
+                ConsistentRead=True
+            ).get('Item')
+            if current is None:
+                return None
+
+            quiet_since = (datetime.utcnow() - timedelta(seconds=RECONCILE_QUIET_SECONDS)).isoformat()
+            if (current.get('last_scan_at') or '') > quiet_since:
+                return {'session_id': session_id, 'skipped': True}
+
+            result = _write_reconciled_attendance(sessions, session_id, current.get('attendance_count'))
+            if result is not None:
+                return result
+        print(f"Reconciling {session_id} kept racing scans; left for the next run")
+        return None
+    except ClientError as e:
+        print(f"Error reconciling attendance count for {session_id}: {e}")
+        return None
+
+
+def _write_reconciled_attendance(sessions, session_id: str, expected_count) -> Optional[Dict]:
+    """
+    Count the session's attendance and SET the result if attendance_count
+    still equals expected_count (absent when None).
+
+    Returns:
+        The recomputed values, or None when a concurrent scan changed the counter
+    """
+    attendance = get_table(ATTENDANCE_TABLE)
+    count = 0
+    first_scan = last_scan = None
+    for item in query_iter(
+        attendance,
+        projection=['scan_timestamp'],
+        IndexName='session_id-index',
+        KeyConditionExpression='session_id = :sid',
+        ExpressionAttributeValues={':sid': session_id}
+    ):
+        count += 1
+        ts = item.get('scan_timestamp')
+        if ts:
+            first_scan = ts if first_scan is None else min(first_scan, ts)
+            last_scan = ts if last_scan is None else max(last_scan, ts)
+
+    if first_scan:
+        update_expression = "SET attendance_count = :c, first_scan_at = :first, last_scan_at = :last"
+        values = {':c': count, ':first': first_scan, ':last': last_scan}
+    else:
+        update_expression = "SET attendance_count = :c REMOVE first_scan_at, last_scan_at"
+        values = {':c': count}
+
+    if expected_count is None:
+        condition = 'attribute_exists(session_id) AND attribute_not_exists(attendance_count)'
+    else:
+        condition = 'attendance_count = :expected'
+        values[':expected'] = expected_count
+
+    try:
+        sessions.update_item(
+            Key={'session_id': session_id},
+            UpdateExpression=update_expression,
+            ConditionExpression=condition,
+            ExpressionAttributeValues=values
+        )
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+            return None
+        raise
+    return {
+        'session_id': session_id,
+        'attendance_count': count,
+        'first_scan_at': first_scan,
+        'last_scan_at': last_scan
+    }
+
+
+def iter_session_ids() -> Iterator[str]:
+    """
+    Scan the sessions table for every session_id, page by page.
+    Only meant for background jobs; request handlers should query by class.
+    """
+    table = get_table(SESSIONS_TABLE)
+    scan_kwargs = {'ProjectionExpression': 'session_id'}
+    while True:
+        response = table.scan(**scan_kwargs)
+        for item in response.get('Items', []):
+            if not item['session_id'].startswith(REVOCATION_KEY_PREFIX):
+                yield item['session_id']
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            return
+        scan_kwargs['ExclusiveStartKey'] = last_key
+
+
+def attendance_id_for(session_id: str, student_id: str) -> str:
+    """
+    Derive the attendance_id for a student's scan of a session. The same
+    pair always maps to the same key, so a conditional put can reject
+    duplicates without a prior read.
+    """
+    return str(uuid.uuid5(ATTENDANCE_ID_NAMESPACE, f"{session_id}#{student_id}"))
+
+
+def deactivate_session(session_id: str, updated_at: str) -> Optional[int]:
+    """
+    Mark a session inactive, bump its activity epoch and publish the epoch as
+    the session's revocation, so every signed QR token issued for an earlier
+    epoch stops validating. Signed tokens are checked without reading the session,
+    so this is the only way a session may be deactivated (update_session
+    refuses is_active=False).
+
+    Args:
+        session_id: Session identifier
+        updated_at: ISO timestamp stored as updated_at
+
+    Returns:
+        The new activity epoch or None if error
+    """
+    table = get_table(SESSIONS_TABLE)
+    try:
+        response = table.update_item(
+            Key={'session_id': session_id},
+            UpdateExpression='SET is_active = :false, updated_at = :now ADD activity_epoch :one',
+            ConditionExpression='attribute_exists(session_id)',
+            ExpressionAttributeValues={':false': False, ':now': updated_at, ':one': 1},
+            ReturnValues='ALL_NEW'
+        )
+        session = response['Attributes']
+        epoch = int(session['activity_epoch'])
+        # both attributes only ever move forward, so racing deactivations
+        # cannot lower the epoch or cut short a longer-lived revocation
+        key = {'session_id': REVOCATION_KEY_PREFIX + session_id}
+        for attribute, value in (('min_epoch', epoch),
+                                 ('revoked_until', revocation_horizon(session.get('qr_code_data')))):
+            try:
+                table.update_item(
+                    Key=key,
+                    UpdateExpression=f'SET {attribute} = :v',
+                    ConditionExpression=f'attribute_not_exists({attribute}) OR {attribute} < :v',
+                    ExpressionAttributeValues={':v': value}
+                )
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                    raise
+        invalidate_cached_item(SESSIONS_TABLE, session_id)
+        _revocation_cache.invalidate(session_id)
+        return epoch
+    except ClientError as e:
+        print(f"Error deactivating session: {e}")
+        return None
+
+
+def get_revoked_epoch(session_id: str) -> int:
+    """
+    Returns:
+        Lowest activity epoch still accepted for the session's QR codes
+        (0 when it was never revoked), cached per container for
+        REVOCATION_CACHE_TTL seconds so repeat scans do not read it
+    """
+    cached = _revocation_cache.get(session_id)
+    if cached is not None:
+        return cached
+
+    table = get_table(SESSIONS_TABLE)
+    try:
+        response = table.get_item(Key={'session_id': REVOCATION_KEY_PREFIX + session_id},
+                                  ProjectionExpression='min_epoch')
+    except ClientError as e:
+        print(f"Error reading session revocation: {e}")
+        return 0
+
+    min_epoch = int(response.get('Item', {}).get('min_epoch', 0))
+    _revocation_cache.set(session_id, min_epoch)
+    return min_epoch
+
+
+def create_attendance(attendance_data: Dict) -> Dict:
+    """
+    Write an attendance record only if its attendance_id is new.
+
+    Returns:
+        statusCode 200 on success, 409 if the record already exists, 500 otherwise
+    """
+    table = get_table(ATTENDANCE_TABLE)
+    try:
+        response = table.put_item(
+            Item=attendance_data,
+            ConditionExpression='attribute_not_exists(attendance_id)'
+        )
+        return {'statusCode': 200, 'body': serialize_item(attendance_data)}
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') == 'ConditionalCheckFailedException':
+            return {'statusCode': 409, 'error': 'attendance already recorded'}
+        return {'statusCode': 500, 'error': str(e)}
+
+
+def get_attendance_count_by_session(session_id: str) -> int:
+    """
+    Queries the Attendance table by session_id and returns the total count of records.
+    """
+    return get_attendance_count('session_id-index', {'session_id': session_id})
+
+
+def get_attendance_count(index_name: str, key_values: Dict[str, str]) -> int:
+    """
+    Args:
+        index_name: Attendance GSI, as for get_attendance_page()
+        key_values: Key attribute -> value for the index
+
+    Returns:
+        Number of attendance records under the key (0 on error)
+    """
+    table = get_table(ATTENDANCE_TABLE)
+    names = list(key_values)
+    try:
+        query_kwargs = {
+            'IndexName': index_name,
+            'KeyConditionExpression': ' AND '.join(f"{name} = :k{i}" for i, name in enumerate(names)),
+            'ExpressionAttributeValues': {f":k{i}": key_values[name] for i, name in enumerate(names)},
+            'Select': 'COUNT'  # Tells DynamoDB to return only the count
+        }
+        # COUNT is still evaluated per 1 MB page, so sum across pages
+        count = 0
+        while True:
+            response = table.query(**query_kwargs)
+            count += response.get('Count', 0)
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return count
+            query_kwargs['ExclusiveStartKey'] = last_key
+    except ClientError as e:
+        print(f"Error getting attendance count: {e}")
+        return 0
+
+
+def iter_attendance_models_by_class(class_id: str, max_items: Optional[int] = None,
+                                    projection: Optional[List[str]] = None,
+                                    scanned_from: Optional[str] = None,
+                                    scanned_before: Optional[str] = None) -> Iterator[Attendance]:
+    """
+    Stream a class's attendance as Attendance objects over the low-level
+    client, for callers that aggregate or export instead of returning the
+    records. Fields left out of projection are None.
+
+    scanned_from/scanned_before bound scan_timestamp (inclusive/exclusive,
+    ISO strings compare in time order). class_id-index has no sort key, so
+    the bounds are a FilterExpression: they shrink what is decoded and
+    returned, not the read capacity the query consumes.
+    """
+    query_kwargs = {
+        'IndexName': 'class_id-index',
+        'KeyConditionExpression': 'class_id = :cid',
+        'ExpressionAttributeValues': {':cid': {'S': class_id}}
+    }
+    bounds = []
+    if scanned_from:
+        bounds.append('scan_timestamp >= :scanned_from')
+        query_kwargs['ExpressionAttributeValues'][':scanned_from'] = {'S': scanned_from}
+    if scanned_before:
+        bounds.append('scan_timestamp < :scanned_before')
+        query_kwargs['ExpressionAttributeValues'][':scanned_before'] = {'S': scanned_before}
+    if bounds:
+        query_kwargs['FilterExpression'] = ' AND '.join(bounds)
+
+    return query_models(
+        Attendance,
+        ATTENDANCE_TABLE,
+        max_items=max_items,
+        projection=projection,
+        **query_kwargs
+    )
+
+
+def get_attendance_page(index_name: str, key_values: Dict[str, str], limit: Optional[int],
+                        start_key: Optional[Dict] = None,
+                        projection: Optional[List[str]] = None) -> Tuple[List[Dict], Optional[Dict]]:
+    """
+    One page of attendance records from a GSI over the low-level client.
+
+    Args:
+        index_name: 'session_id-index', 'class_id-index', 'student_id-index' or 'student_class-index'
+        key_values: Key attribute -> value for the index, e.g. {'class_id': 'c-1'}
+        limit: Page size (None: every record, as from page_params for unpaged requests)
+        start_key: ExclusiveStartKey from the previous page's cursor
+        projection: Attendance fields to fetch and return (default: all)
+
+    Returns:
+        (records as dicts, LastEvaluatedKey or None on the last page)
+    """
+    names = list(key_values)
+    try:
+        records, last_key = query_models_page(
+            Attendance,
+            ATTENDANCE_TABLE,
+            limit,
+            start_key,
+            projection,
+            IndexName=index_name,
+            KeyConditionExpression=' AND '.join(f"{name} = :k{i}" for i, name in enumerate(names)),
+            ExpressionAttributeValues={f":k{i}": {'S': key_values[name]} for i, name in enumerate(names)}
+        )
+    except ClientError as e:
+        print(f"Error querying attendance page: {e}")
+        return [], None
+    if projection:
+        return [{name: getattr(record, name) for name in projection} for record in records], last_key
+    return [record.to_dict() for record in records], last_key
+
+
+def check_attendance_exists(session_id: str, student_id: str) -> bool:
+    # check if a student has already marked attendance for a session
+    table = get_table(ATTENDANCE_TABLE)
+    try:
+        # records written since deterministic ids were introduced: one consistent key read
+        response = table.get_item(
+            Key={'attendance_id': attendance_id_for(session_id, student_id)},
+            ProjectionExpression='attendance_id',
+            ConsistentRead=True
+        )
+        if 'Item' in response:
+            return True
+
+        # older records carry random ids and are only reachable through the GSI
+        response = table.query(
+            IndexName='session_student-index',
+            KeyConditionExpression='session_id = :sid AND student_id = :stid',
+            ExpressionAttributeValues={':sid': session_id, ':stid': student_id},
+            Limit=1
+        )
+        return len(response.get('Items', [])) > 0
+    except ClientError as e:
+        print(f"Error checking attendance: {e}")
+        return False
+
@@ -0,0 +1,220 @@
+"""
+Attendance exports: a class's attendance streamed from class_id-index and
+encoded as CSV or Parquet a chunk at a time, for s3_utils.upload_stream to
+cut into multipart parts. Neither encoder holds more than one chunk (CSV) or
+one row group (Parquet) of records, so memory does not grow with the class.
+
+Parquet needs pyarrow, which is too large for the shared layer; only the
+export function bundles it. It is imported on first use, and get_pyarrow()
+returns None where it is not installed.
+"""
+import io
+import csv
+import os
+import uuid
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .json_utils import dumps
+
+EXPORT_COLUMNS = (
+    'attendance_id', 'session_id', 'class_id', 'student_id', 'scan_timestamp', 'location', 'device_info',
+)
+EXPORT_FORMATS = {
+    'csv': ('csv', 'text/csv; charset=utf-8'),
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+CSV_CHUNK_CHARS = 256 * 1024
+# leading characters a spreadsheet reads as the start of a formula
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+PARQUET_ROW_GROUP_ROWS = int(os.environ.get('PARQUET_ROW_GROUP_ROWS', '50000'))
+EXPORT_URL_EXPIRATION = int(os.environ.get('EXPORT_URL_EXPIRATION', '3600'))
+
+_pyarrow = None  # (pyarrow, pyarrow.parquet) once resolved, False when it is not installed
+
+
+class ExportRequestError(ValueError):
+    """Bad format or date range; the handler answers 400."""
+
+
+def get_pyarrow() -> Optional[Tuple]:
+    global _pyarrow
+    if _pyarrow is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+            _pyarrow = (pyarrow, pyarrow.parquet)
+        except ImportError:
+            _pyarrow = False
+    return _pyarrow or None
+
+
+def export_format(raw: Optional[str]) -> str:
+    """'csv' (the default) or 'parquet'."""
+    fmt = (raw or 'csv').lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ExportRequestError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    return fmt
+
+
+def _parse_date(raw: Optional[str], name: str) -> Optional[date]:
+    if not raw:
+        return None
+    try:
+        return date.fromisoformat(raw)
+    except ValueError:
+        raise ExportRequestError(f"{name} must be a date (YYYY-MM-DD)")
+
+
+def scan_time_range(date_from: Optional[str], date_to: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Args:
+        date_from: First day to include (YYYY-MM-DD), or None for no lower bound
+        date_to: Last day to include (YYYY-MM-DD), or None for no upper bound
+
+    Returns:
+        (start, end) bounds on scan_timestamp: start inclusive, end exclusive
+        (the day after date_to), either None when unbounded
+
+    Raises:
+        ExportRequestError: A date is malformed or the range is empty
+    """
+    start = _parse_date(date_from, 'from')
+    end = _parse_date(date_to, 'to')
+    if start and end and end < start:
+        raise ExportRequestError("to must not be before from")
+    return (
+        start.isoformat() if start else None,
+        (end + timedelta(days=1)).isoformat() if end else None,
+    )
+
+
+def export_key(class_id: str, fmt: str) -> str:
+    stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
+    return f"exports/{class_id}/attendance-{stamp}-{uuid.uuid4().hex[:8]}.{EXPORT_FORMATS[fmt][0]}"
+
+
+def _cell(value) -> Optional[str]:
+    # location/device_info are whatever the scanning client sent; nested values become JSON
+    if value is None or isinstance(value, str):
+        return value
+    return dumps(value)
+
+
+def export_rows(records: Iterable) -> Iterator[List[Optional[str]]]:
+    """Attendance models (or objects with the same attributes) as rows of EXPORT_COLUMNS."""
+    for record in records:
+        yield [_cell(getattr(record, name)) for name in EXPORT_COLUMNS]
+
+
+def _csv_safe(value: Optional[str]) -> Optional[str]:
+    # a leading quote makes spreadsheets show a client-sent "=HYPERLINK(...)" as text
+    if value and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_csv_chunks(rows: Iterable[List], chunk_chars: int = CSV_CHUNK_CHARS) -> Iterator[bytes]:
+    """
+    Yields:
+        UTF-8 CSV (header first) in chunks of roughly chunk_chars characters.
+        Cells that a spreadsheet would evaluate as formulas are prefixed with '
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\r\n')
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow([_csv_safe(value) for value in row])
+        if buffer.tell() >= chunk_chars:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+class _ChunkSink:
+    """Write-only file object for ParquetWriter; drain() hands back what was written since the last call."""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def iter_parquet_chunks(rows: Iterable[List], row_group_rows: int = PARQUET_ROW_GROUP_ROWS) -> Iterator[bytes]:
+    """
+    Yields:
+        A Parquet file (snappy, one row group per row_group_rows rows) in
+        chunks: each row group as it is written, then the footer.
+        scan_timestamp is a UTC timestamp column, the rest are strings.
+
+    Raises:
+        RuntimeError: pyarrow is not installed
+    """
+    modules = get_pyarrow()
+    if modules is None:
+        raise RuntimeError("pyarrow is not installed")
+    pa, pq = modules
+
+    timestamp = pa.timestamp('us', tz='UTC')
+    schema = pa.schema([(name, timestamp if name == 'scan_timestamp' else pa.string()) for name in EXPORT_COLUMNS])
+    scan_index = EXPORT_COLUMNS.index('scan_timestamp')
+
+    sink = _ChunkSink()
+    rows = iter(rows)
+    with pq.ParquetWriter(sink, schema, compression='snappy') as writer:
+        while True:
+            batch = list(islice(rows, row_group_rows))
+            if not batch:
+                break
+            columns = [pa.array(column, pa.string()) for column in zip(*batch)]
+            # scan timestamps are naive UTC isoformat strings
+            columns[scan_index] = columns[scan_index].cast(pa.timestamp('us')).cast(timestamp)
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_export_chunks(fmt: str, records: Iterable) -> Iterator[bytes]:
+    rows = export_rows(records)
+    if fmt == 'parquet':
+        return iter_parquet_chunks(rows)
+    return iter_csv_chunks(rows)
+
+
+class CountingIterator:
+    """Pass items through while counting them (rows exported)."""
+
+    def __init__(self, items: Iterable):
+        self._items = iter(items)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self._items)
+        self.count += 1
+        return item
+
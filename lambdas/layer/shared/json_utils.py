@@ -0,0 +1,87 @@
+import json
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+# orjson is optional: when the layer ships it, response bodies are encoded by
+# it; otherwise the stdlib encoder produces the same JSON. It is resolved on
+# the first dumps() so importing this module stays cheap for cold starts.
+_orjson = None  # module once resolved, False when it is not installed
+
+
+def get_orjson():
+    global _orjson
+    if _orjson is None:
+        try:
+            import orjson
+            _orjson = orjson
+        except ImportError:
+            _orjson = False
+    return _orjson or None
+
+
+def decimal_to_number(value: Decimal):
+    """int for integral Decimals (counts, epochs), float for everything else."""
+    if value == value.to_integral_value():
+        return int(value)
+    return float(value)
+
+
+def from_dynamodb(value: Any) -> Any:
+    """
+    Convert a boto3 item into plain JSON types in a single walk.
+
+    Arg:
+        value: Item (or any value inside one) as returned by the DynamoDB resource
+
+    Returns:
+        New containers with Decimals as int/float and sets as lists; the input is not modified
+    """
+    if isinstance(value, dict):
+        return {k: from_dynamodb(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [from_dynamodb(v) for v in value]
+    if isinstance(value, Decimal):
+        return decimal_to_number(value)
+    return value
+
+
+def json_default(obj):
+    """default= hook for values that did not go through from_dynamodb."""
+    if isinstance(obj, Decimal):
+        return decimal_to_number(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any) -> str:
+    """
+    Encode a response body once, with orjson when it is installed.
+
+    Arg:
+        obj: Body; leftover Decimals and sets are handled by json_default
+
+    Returns:
+        Compact JSON string
+    """
+    orjson = get_orjson()
+    if orjson is not None:
+        return orjson.dumps(obj, default=json_default, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, default=json_default, separators=(',', ':'))
+
+
+def json_response(status_code: int, body: Any, headers: Optional[Dict] = None) -> Dict:
+    """
+    Args:
+        status_code: HTTP status code
+        body: Response body, encoded with dumps()
+        headers: Response headers (each handler passes its CORS_HEADERS)
+
+    Returns:
+        API Gateway proxy response
+    """
+    return {
+        'statusCode': status_code,
+        'headers': headers or {'Content-Type': 'application/json'},
+        'body': dumps(body)
+    }
@@ -0,0 +1,136 @@
+"""
+Typed items with hand-written converters for DynamoDB's wire format
+({'S': ...}, {'N': ...}, ...), as returned by the low-level dynamodb client.
+
+The resource API runs every attribute through TypeDeserializer and hands
+back Decimals that serialize_item then converts again. Large reads (a class's
+attendance) use the client with these converters instead: one pass per item
+straight to str/int/float, into slotted objects that are a fraction of the
+size of the equivalent dicts. Attributes a model does not declare are dropped.
+"""
+from dataclasses import dataclass
+from typing import Optional, Dict, Any
+
+
+def decode_number(raw: str):
+    """int for integral numbers (counts, epochs), float otherwise."""
+    try:
+        return int(raw)
+    except ValueError:
+        number = float(raw)
+        return int(number) if number.is_integer() else number
+
+
+def decode_value(attr: Optional[Dict]) -> Any:
+    """
+    Arg:
+        attr: One wire-format attribute value, or None when the attribute is absent
+
+    Returns:
+        Plain Python value (maps and lists decoded recursively, sets as lists)
+    """
+    if not attr:
+        return None
+    (tag, raw), = attr.items()
+    if tag == 'S':
+        return raw
+    if tag == 'N':
+        return decode_number(raw)
+    if tag == 'BOOL':
+        return raw
+    if tag == 'NULL':
+        return None
+    if tag == 'M':
+        return {k: decode_value(v) for k, v in raw.items()}
+    if tag == 'L':
+        return [decode_value(v) for v in raw]
+    if tag == 'SS':
+        return list(raw)
+    if tag == 'NS':
+        return [decode_number(v) for v in raw]
+    # B / BS: bytes as boto3 returns them
+    return raw
+
+
+def encode_value(value: Any) -> Dict:
+    """
+    Arg:
+        value: str, int, float, bool, None, dict or list
+
+    Returns:
+        Wire-format attribute value
+    """
+    if value is None:
+        return {'NULL': True}
+    if isinstance(value, bool):
+        return {'BOOL': value}
+    if isinstance(value, str):
+        return {'S': value}
+    if isinstance(value, (int, float)):
+        return {'N': str(value)}
+    if isinstance(value, dict):
+        return {'M': {k: encode_value(v) for k, v in value.items()}}
+    if isinstance(value, (list, tuple)):
+        return {'L': [encode_value(v) for v in value]}
+    if isinstance(value, (bytes, bytearray)):
+        return {'B': bytes(value)}
+    raise TypeError(f"Cannot encode {type(value).__name__} for DynamoDB")
+
+
+def _s(item: Dict, name: str) -> Optional[str]:
+    attr = item.get(name)
+    return attr.get('S') if attr else None
+
+
+def _put(item: Dict, name: str, value: Any) -> None:
+    # absent instead of NULL, the way the resource API writes missing keys
+    if value is not None:
+        item[name] = encode_value(value)
+
+
+@dataclass(slots=True)
+class Attendance:
+    attendance_id: str
+    session_id: str
+    class_id: str
+    student_id: str
+    scan_timestamp: str
+    location: Optional[Any] = None
+    device_info: Optional[Any] = None
+
+    @classmethod
+    def from_item(cls, item: Dict) -> 'Attendance':
+        # location/device_info are whatever the scanning client sent
+        return cls(
+            attendance_id=_s(item, 'attendance_id'),
+            session_id=_s(item, 'session_id'),
+            class_id=_s(item, 'class_id'),
+            student_id=_s(item, 'student_id'),
+            scan_timestamp=_s(item, 'scan_timestamp'),
+            location=decode_value(item.get('location')),
+            device_info=decode_value(item.get('device_info'))
+        )
+
+    def to_item(self) -> Dict:
+        item = {
+            'attendance_id': {'S': self.attendance_id},
+            'session_id': {'S': self.session_id},
+            'class_id': {'S': self.class_id},
+            'student_id': {'S': self.student_id},
+            'scan_timestamp': {'S': self.scan_timestamp}
+        }
+        _put(item, 'location', self.location)
+        _put(item, 'device_info', self.device_info)
+        return item
+
+    def to_dict(self) -> Dict:
+        return {
+            'attendance_id': self.attendance_id,
+            'session_id': self.session_id,
+            'class_id': self.class_id,
+            'student_id': self.student_id,
+            'scan_timestamp': self.scan_timestamp,
+            'location': self.location,
+            'device_info': self.device_info
+        }
+
@@ -0,0 +1,127 @@
+"""
+Cursor pagination for list endpoints.
+
+A page ends with DynamoDB's LastEvaluatedKey, handed to the client as an
+opaque next_token: base64url JSON of the key and the query it belongs to,
+plus a truncated HMAC-SHA256. A client can only send back a token this API
+issued for the same query, so it cannot steer ExclusiveStartKey into another
+class's partition or forge a key.
+"""
+import os
+import hmac
+import json
+import base64
+import hashlib
+from typing import Dict, Optional, Tuple
+
+from .secret_utils import get_secret
+
+# The deployed key is read from Secrets Manager (PAGE_TOKEN_SECRET_ARN);
+# PAGE_TOKEN_SECRET is for local runs and tests. There is no fallback to
+# another key: without one, no token is issued or accepted.
+PAGE_TOKEN_SECRET = os.environ.get('PAGE_TOKEN_SECRET', '')
+DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', '1000'))
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', '1000'))
+SIGNATURE_BYTES = 16
+_LABEL = b'page-token:'
+
+
+class PageRequestError(ValueError):
+    """Bad limit or next_token; handlers answer 400."""
+
+
+def token_secret() -> str:
+    """PAGE_TOKEN_SECRET when set, otherwise the Secrets Manager value ('' when neither is configured)."""
+    return PAGE_TOKEN_SECRET or get_secret('PAGE_TOKEN_SECRET')
+
+
+def _b64url_encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def _b64url_decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _sign(payload: bytes, secret: str) -> bytes:
+    return hmac.new(secret.encode('utf-8'), _LABEL + payload, hashlib.sha256).digest()[:SIGNATURE_BYTES]
+
+
+def encode_page_token(last_key: Optional[Dict], scope: str, secret: Optional[str] = None) -> Optional[str]:
+    """
+    Args:
+        last_key: LastEvaluatedKey of the page (None on the last page)
+        scope: Identifies the query, e.g. 'attendance:class:<class_id>'
+        secret: Signing secret (default: token_secret())
+
+    Returns:
+        next_token string, or None when there is no next page
+    """
+    if not last_key:
+        return None
+    secret = secret or token_secret()
+    if not secret:
+        raise ValueError("PAGE_TOKEN_SECRET is not configured")
+    payload = json.dumps({'s': scope, 'k': last_key}, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return _b64url_encode(payload) + '.' + _b64url_encode(_sign(payload, secret))
+
+
+def decode_page_token(token: str, scope: str, secret: Optional[str] = None) -> Dict:
+    """
+    Args:
+        token: next_token from a previous response
+        scope: Scope the current request would have issued the token under
+        secret: Signing secret (default: token_secret())
+
+    Returns:
+        ExclusiveStartKey for the next query
+
+    Raises:
+        PageRequestError: Malformed, tampered with, or issued for another query
+    """
+    secret = secret or token_secret()
+    try:
+        encoded_payload, encoded_signature = token.split('.')
+        payload = _b64url_decode(encoded_payload)
+        signature = _b64url_decode(encoded_signature)
+    except (ValueError, AttributeError):
+        raise PageRequestError('invalid next_token')
+
+    if not secret or not hmac.compare_digest(signature, _sign(payload, secret)):
+        raise PageRequestError('invalid next_token')
+
+    data = json.loads(payload)
+    if data.get('s') != scope or not isinstance(data.get('k'), dict):
+        raise PageRequestError('next_token does not belong to this query')
+    return data['k']
+
+
+def page_params(query_params: Optional[Dict], scope: str) -> Tuple[Optional[int], Optional[Dict]]:
+    """
+    Args:
+        query_params: queryStringParameters (limit, next_token)
+        scope: Scope of the query being paged
+
+    Returns:
+        (page size, ExclusiveStartKey or None for the first page). The page
+        size is None when neither limit nor next_token was sent: clients that
+        do not page get the whole result, as before pagination existed.
+
+    Raises:
+        PageRequestError: limit is not an integer in 1..MAX_PAGE_SIZE, or next_token is invalid
+    """
+    query_params = query_params or {}
+    raw_limit = query_params.get('limit')
+    token = query_params.get('next_token')
+    if raw_limit in (None, ''):
+        limit = DEFAULT_PAGE_SIZE if token else None
+    else:
+        try:
+            limit = int(raw_limit)
+        except (TypeError, ValueError):
+            limit = 0
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise PageRequestError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+
+    start_key = decode_page_token(token, scope) if token else None
+    return limit, start_key
@@ -0,0 +1,54 @@
+"""
+The `fields` query parameter of the read endpoints.
+
+A comma-separated list of attribute names, checked against a per-item-type
+whitelist and handed to the query helpers as a ProjectionExpression, so list
+views stop shipping blobs they never display (qr_code_data, device_info,
+location). Unknown names are rejected rather than ignored.
+"""
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+ATTENDANCE_FIELDS = frozenset({
+    'attendance_id', 'session_id', 'class_id', 'student_id', 'scan_timestamp', 'location', 'device_info',
+})
+
+SESSION_FIELDS = frozenset({
+    'session_id', 'class_id', 'session_date', 'start_time', 'end_time', 'timezone', 'is_active',
+    'activity_epoch', 'qr_code_url', 'qr_code_data', 'lecture_material_key', 'lecture_material_url',
+    'attendance_count', 'first_scan_at', 'last_scan_at', 'created_at', 'updated_at',
+})
+
+
+class FieldsRequestError(ValueError):
+    """Unknown name in the fields parameter; handlers answer 400."""
+
+
+def requested_fields(query_params: Optional[Dict], allowed: FrozenSet[str],
+                     always: Iterable[str] = ()) -> Optional[List[str]]:
+    """
+    Args:
+        query_params: queryStringParameters
+        allowed: Whitelist for the item type (ATTENDANCE_FIELDS, SESSION_FIELDS)
+        always: Attributes the handler itself needs (ids, counters), added to the request
+
+    Returns:
+        Attribute names to project, or None for full items when fields is absent
+
+    Raises:
+        FieldsRequestError: A requested name is not in allowed
+    """
+    raw = (query_params or {}).get('fields')
+    if not raw:
+        return None
+    names = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = sorted(set(names) - allowed)
+    if unknown:
+        raise FieldsRequestError(f"unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys([*always, *names]))
+
+
+def select_fields(item: Optional[Dict], fields: Optional[List[str]]) -> Optional[Dict]:
+    """Trim an item fetched whole (e.g. from the item cache) to the requested fields."""
+    if item is None or not fields:
+        return item
+    return {name: item[name] for name in fields if name in item}
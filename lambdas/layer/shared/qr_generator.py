@@ -0,0 +1,630 @@
+import os
+import json
+import time
+import hmac
+import struct
+import base64
+import hashlib
+from io import BytesIO
+from collections import namedtuple
+from typing import Callable, Dict, Optional, Tuple
+from datetime import datetime, timedelta
+from botocore.exceptions import ClientError
+import uuid
+
+from . import aws_clients
+from .cache_utils import TTLCache
+from .secret_utils import get_secret
+
+
+# S3 client, created on first use (see aws_clients)
+s3_client = None
+
+
+def get_s3_client():
+    global s3_client
+    if s3_client is None:
+        s3_client = aws_clients.client('s3')
+    return s3_client
+
+
+S3_BUCKET = os.environ.get('QR_CODE_BUCKET', 'qr-class-manager-qrcodes')
+
+# image rendering: 'png', 'svg' or 'matrix'; images are stored under a hash of the payload
+QR_IMAGE_FORMAT = os.environ.get('QR_IMAGE_FORMAT', 'png').lower()
+QR_BOX_SIZE = 10
+QR_BORDER = 4
+_matrix_cache = TTLCache(maxsize=256, ttl=3600)
+_stored_keys = TTLCache(maxsize=4096, ttl=86400)
+
+# signed token settings; without a secret QR codes fall back to plain JSON.
+# Deployed functions get QR_SIGNING_SECRET_ARN and read the key at runtime
+# (see signing_secret); QR_SIGNING_SECRET itself is for local runs and tests
+QR_SIGNING_SECRET = os.environ.get('QR_SIGNING_SECRET', '')
+QR_ACCEPT_UNSIGNED = os.environ.get('QR_ACCEPT_UNSIGNED', 'true').lower() == 'true'
+SIGNED_TOKEN_PREFIX = 'QC1.'
+TOKEN_VERSION = 2
+SIGNATURE_BYTES = 16
+# version, not-before (epoch seconds, 0 = immediately), expiry (epoch seconds), activity epoch
+_TOKEN_HEADER = struct.Struct('>BIII')
+# version 1 tokens have no not-before field
+_TOKEN_HEADER_V1 = struct.Struct('>BII')
+
+# rotating codes: a fresh token every window, signed with a per-session key
+ROTATING_TOKEN_PREFIX = 'QCR.'
+ROTATING_TOKEN_VERSION = 1
+ROTATION_WINDOW_SECONDS = int(os.environ.get('QR_ROTATION_WINDOW_SECONDS', '30'))
+ROTATING_SIGNATURE_BYTES = 10
+# version, window index, activity epoch
+_ROTATING_HEADER = struct.Struct('>BII')
+
+
+def generate_qr_code_data(session_id: str, class_id: str, expiry_minutes: int = 60,
+                          activity_epoch: int = 0, valid_from: Optional[datetime] = None,
+                          expires_at: Optional[datetime] = None) -> Dict:
+    """
+    Args:
+        session_id: Unique session identifier
+        class_id: Class identifier
+        expiry_minutes: Minutes until QR code expires (default: 60)
+        activity_epoch: Session activity epoch the code is issued for (default: 0)
+        valid_from: Naive UTC time before which the code is rejected (default: immediately)
+        expires_at: Naive UTC expiry; overrides expiry_minutes (used for pre-generated codes)
+    
+    Returns:
+        Dictionary containing QR code data
+    """
+
+    now = datetime.utcnow().replace(microsecond=0)
+    timestamp = now.isoformat()
+    if expires_at is not None:
+        expiry = expires_at.replace(microsecond=0).isoformat()
+    else:
+        expiry = (now + timedelta(minutes=expiry_minutes)).isoformat()
+    
+    qr_data = {
+        'session_id': session_id,
+        'class_id': class_id,
+        'timestamp': timestamp,
+        'expiry': expiry,
+        'activity_epoch': activity_epoch
+    }
+    if valid_from is not None:
+        qr_data['valid_from'] = valid_from.replace(microsecond=0).isoformat()
+    return qr_data
+
+
+def _to_epoch(value: str) -> int:
+    return int((datetime.fromisoformat(value) - datetime(1970, 1, 1)).total_seconds())
+
+
+def _b64url_encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def _b64url_decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _pack_id(value: str) -> bytes:
+    """Canonical UUIDs pack into 17 bytes; anything else is length-prefixed UTF-8."""
+    try:
+        parsed = uuid.UUID(value)
+        if str(parsed) == value:
+            return b'\x00' + parsed.bytes
+    except ValueError:
+        pass
+    raw = value.encode('utf-8')
+    if not 0 < len(raw) < 256:
+        raise ValueError("identifier must be 1-255 bytes")
+    return bytes([len(raw)]) + raw
+
+
+def _unpack_id(buf: bytes, offset: int):
+    length = buf[offset]
+    if length == 0:
+        end = offset + 17
+        return str(uuid.UUID(bytes=buf[offset + 1:end])), end
+    end = offset + 1 + length
+    if end > len(buf):
+        raise ValueError("truncated identifier")
+    return buf[offset + 1:end].decode('utf-8'), end
+
+
+def _sign(payload: bytes, secret: str) -> bytes:
+    return hmac.new(secret.encode('utf-8'), payload, hashlib.sha256).digest()[:SIGNATURE_BYTES]
+
+
+def signing_secret() -> str:
+    """QR_SIGNING_SECRET when set, otherwise the Secrets Manager value ('' when neither is configured)."""
+    return QR_SIGNING_SECRET or get_secret('QR_SIGNING_SECRET')
+
+
+def encode_qr_token(qr_data: Dict, secret: Optional[str] = None) -> str:
+    """
+    Pack QR code data into a compact HMAC-signed token.
+
+    Args:
+        qr_data: Dictionary from generate_qr_code_data
+        secret: Signing secret (default: signing_secret())
+
+    Returns:
+        Token string: prefix + base64url(binary payload + truncated HMAC-SHA256)
+    """
+    secret = secret or signing_secret()
+    if not secret:
+        raise ValueError("QR_SIGNING_SECRET is not configured")
+
+    not_before = _to_epoch(qr_data['valid_from']) if qr_data.get('valid_from') else 0
+    payload = (
+        _TOKEN_HEADER.pack(TOKEN_VERSION, not_before, _to_epoch(qr_data['expiry']),
+                           int(qr_data.get('activity_epoch', 0)))
+        + _pack_id(qr_data['session_id'])
+        + _pack_id(qr_data['class_id'])
+    )
+    return SIGNED_TOKEN_PREFIX + _b64url_encode(payload + _sign(payload, secret))
+
+
+def decode_qr_token(token: str, secret: Optional[str] = None) -> Optional[Dict]:
+    """
+    Verify a signed token without any network I/O.
+
+    Args:
+        token: Token string produced by encode_qr_token
+        secret: Signing secret (default: signing_secret())
+
+    Returns:
+        Decoded QR code data if the signature is valid, or None otherwise.
+        Validity window is not checked here (see validate_qr_code_data).
+    """
+    secret = secret or signing_secret()
+    if not secret or not token.startswith(SIGNED_TOKEN_PREFIX):
+        return None
+    try:
+        raw = _b64url_decode(token[len(SIGNED_TOKEN_PREFIX):])
+        if len(raw) <= _TOKEN_HEADER.size + SIGNATURE_BYTES:
+            return None
+        payload, signature = raw[:-SIGNATURE_BYTES], raw[-SIGNATURE_BYTES:]
+        if not hmac.compare_digest(signature, _sign(payload, secret)):
+            return None
+
+        version = payload[0]
+        if version == TOKEN_VERSION:
+            _, not_before, expiry_epoch, activity_epoch = _TOKEN_HEADER.unpack_from(payload)
+            offset = _TOKEN_HEADER.size
+        elif version == 1:
+            _, expiry_epoch, activity_epoch = _TOKEN_HEADER_V1.unpack_from(payload)
+            not_before, offset = 0, _TOKEN_HEADER_V1.size
+        else:
+            return None
+        session_id, offset = _unpack_id(payload, offset)
+        class_id, offset = _unpack_id(payload, offset)
+        if offset != len(payload):
+            return None
+
+        qr_data = {
+            'session_id': session_id,
+            'class_id': class_id,
+            'expiry': datetime.utcfromtimestamp(expiry_epoch).isoformat(),
+            'activity_epoch': activity_epoch,
+            'signed': True
+        }
+        if not_before:
+            qr_data['valid_from'] = datetime.utcfromtimestamp(not_before).isoformat()
+        return qr_data
+    except (ValueError, IndexError, struct.error, UnicodeDecodeError) as e:
+        print(f"Error decoding QR token: {e}")
+        return None
+
+
+def derive_rotation_key(session_id: str, activity_epoch: int = 0, secret: Optional[str] = None) -> bytes:
+    """
+    Per-session, per-epoch key for rotating codes. It is derived from the
+    signing secret, so the key can be handed to the professor's screen for
+    client-side rotation without exposing the secret or storing anything on
+    the session. A key only signs codes for its own activity epoch, so once
+    the session is revoked past that epoch the key is useless.
+    """
+    secret = secret or signing_secret()
+    if not secret:
+        raise ValueError("QR_SIGNING_SECRET is not configured")
+    # fixed-width epoch first, so no (session_id, epoch) pair can collide with another
+    label = b'qr-rotation:' + struct.pack('>I', activity_epoch) + session_id.encode('utf-8')
+    return hmac.new(secret.encode('utf-8'), label, hashlib.sha256).digest()
+
+
+def current_rotation_window(now: Optional[float] = None) -> int:
+    return int((time.time() if now is None else now) // ROTATION_WINDOW_SECONDS)
+
+
+def encode_rotating_token(session_id: str, class_id: str, activity_epoch: int = 0,
+                          window: Optional[int] = None, secret: Optional[str] = None) -> str:
+    """
+    Args:
+        session_id: Session identifier
+        class_id: Class identifier
+        activity_epoch: Session activity epoch the code is issued for
+        window: Rotation window index (default: the current window)
+        secret: Signing secret (default: signing_secret())
+
+    Returns:
+        Token string valid for this window and the next one
+    """
+    window = current_rotation_window() if window is None else window
+    payload = (
+        _ROTATING_HEADER.pack(ROTATING_TOKEN_VERSION, window, activity_epoch)
+        + _pack_id(session_id)
+        + _pack_id(class_id)
+    )
+    key = derive_rotation_key(session_id, activity_epoch, secret)
+    signature = hmac.new(key, payload, hashlib.sha256).digest()[:ROTATING_SIGNATURE_BYTES]
+    return ROTATING_TOKEN_PREFIX + _b64url_encode(payload + signature)
+
+
+def decode_rotating_token(token: str, secret: Optional[str] = None) -> Optional[Dict]:
+    """
+    Verify a rotating token's signature without any network I/O.
+    The window is returned but not checked (see validate_qr_code_data).
+    """
+    secret = secret or signing_secret()
+    if not secret or not token.startswith(ROTATING_TOKEN_PREFIX):
+        return None
+    try:
+        raw = _b64url_decode(token[len(ROTATING_TOKEN_PREFIX):])
+        if len(raw) <= _ROTATING_HEADER.size + ROTATING_SIGNATURE_BYTES:
+            return None
+        payload, signature = raw[:-ROTATING_SIGNATURE_BYTES], raw[-ROTATING_SIGNATURE_BYTES:]
+
+        version, window, activity_epoch = _ROTATING_HEADER.unpack_from(payload)
+        if version != ROTATING_TOKEN_VERSION:
+            return None
+        session_id, offset = _unpack_id(payload, _ROTATING_HEADER.size)
+        class_id, offset = _unpack_id(payload, offset)
+        if offset != len(payload):
+            return None
+
+        # verified with the key for the epoch the token claims
+        key = derive_rotation_key(session_id, activity_epoch, secret)
+        expected = hmac.new(key, payload, hashlib.sha256).digest()[:ROTATING_SIGNATURE_BYTES]
+        if not hmac.compare_digest(signature, expected):
+            return None
+
+        return {
+            'session_id': session_id,
+            'class_id': class_id,
+            'window': window,
+            'expiry': datetime.utcfromtimestamp((window + 2) * ROTATION_WINDOW_SECONDS).isoformat(),
+            'activity_epoch': activity_epoch,
+            'signed': True,
+            'rotating': True
+        }
+    except (ValueError, IndexError, struct.error, UnicodeDecodeError) as e:
+        print(f"Error decoding rotating QR token: {e}")
+        return None
+
+
+def get_rotating_qr_code(session_id: str, class_id: str, activity_epoch: int = 0) -> Dict:
+    """
+    Current rotating code for a session, for the professor's screen to render.
+    Nothing is rendered or uploaded server-side.
+
+    Returns:
+        Dictionary with the current token, window length, when it rotates,
+        and the key for clients that rotate on their own (valid only for
+        activity_epoch, so revoking the session retires it)
+    """
+    window = current_rotation_window()
+    return {
+        'qr_data': encode_rotating_token(session_id, class_id, activity_epoch, window),
+        'window': window,
+        'window_seconds': ROTATION_WINDOW_SECONDS,
+        'rotates_at': datetime.utcfromtimestamp((window + 1) * ROTATION_WINDOW_SECONDS).isoformat(),
+        'rotation_key': derive_rotation_key(session_id, activity_epoch).hex(),
+        'activity_epoch': activity_epoch
+    }
+
+
+def encode_qr_payload(qr_data: Dict) -> str:
+    """
+    Returns:
+        Signed token when QR_SIGNING_SECRET is configured, plain JSON otherwise
+    """
+    if signing_secret():
+        return encode_qr_token(qr_data)
+    return json.dumps(qr_data)
+
+
+def build_qr_matrix(qr_string: str) -> Tuple[Tuple[bool, ...], ...]:
+    """
+    Args:
+        qr_string: Encoded QR payload
+
+    Returns:
+        Module matrix including the quiet-zone border (True = dark). Matrices
+        are cached per container, so rendering a payload again or in another
+        format skips the encoding step.
+    """
+    matrix = _matrix_cache.get(qr_string)
+    if matrix is None:
+        import qrcode
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            border=QR_BORDER,
+        )
+        qr.add_data(qr_string)
+        qr.make(fit=True)
+        matrix = tuple(tuple(row) for row in qr.get_matrix())
+        _matrix_cache.set(qr_string, matrix)
+    return matrix
+
+
+def render_png(matrix: Tuple[Tuple[bool, ...], ...], box_size: int = QR_BOX_SIZE) -> bytes:
+    """Rasterize a module matrix to a 1-bit PNG."""
+    from PIL import Image
+
+    size = len(matrix)
+    img = Image.new('1', (size, size))
+    img.putdata([0 if dark else 1 for row in matrix for dark in row])
+    img = img.resize((size * box_size, size * box_size), Image.NEAREST)
+
+    buffer = BytesIO()
+    img.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def render_svg(matrix: Tuple[Tuple[bool, ...], ...], box_size: int = QR_BOX_SIZE) -> bytes:
+    """Render a module matrix as one SVG path with a rectangle per run of dark modules."""
+    size = len(matrix)
+    segments = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < size:
+            if not row[x]:
+                x += 1
+                continue
+            run = 1
+            while x + run < size and row[x + run]:
+                run += 1
+            segments.append(f"M{x} {y}h{run}v1h-{run}z")
+            x += run
+
+    pixels = size * box_size
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{pixels}" height="{pixels}" '
+        f'viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" fill="#fff"/>'
+        f'<path d="{"".join(segments)}" fill="#000"/></svg>'
+    ).encode('utf-8')
+
+
+def render_matrix(matrix: Tuple[Tuple[bool, ...], ...], box_size: int = QR_BOX_SIZE) -> bytes:
+    """Raw matrix as JSON rows of '0'/'1' for clients that draw the code themselves."""
+    rows = [''.join('1' if dark else '0' for dark in row) for row in matrix]
+    return json.dumps({'size': len(rows), 'rows': rows}, separators=(',', ':')).encode('utf-8')
+
+
+QRRenderer = namedtuple('QRRenderer', ['render', 'content_type', 'extension'])
+
+RENDERERS = {
+    'png': QRRenderer(render_png, 'image/png', 'png'),
+    'svg': QRRenderer(render_svg, 'image/svg+xml', 'svg'),
+    'matrix': QRRenderer(render_matrix, 'application/json', 'json'),
+}
+
+
+def _renderer(image_format: Optional[str]) -> QRRenderer:
+    image_format = (image_format or QR_IMAGE_FORMAT).lower()
+    if image_format not in RENDERERS:
+        raise ValueError(f"unsupported QR image format: {image_format}")
+    return RENDERERS[image_format]
+
+
+def render_qr_image(qr_string: str, image_format: Optional[str] = None) -> bytes:
+    """
+    Module-level so it can be sent to a process pool.
+
+    Args:
+        qr_string: Encoded QR payload
+        image_format: 'png', 'svg' or 'matrix' (default: QR_IMAGE_FORMAT)
+
+    Returns:
+        Rendered image bytes
+    """
+    return _renderer(image_format).render(build_qr_matrix(qr_string))
+
+
+def create_qr_code_image(qr_data, image_format: str = 'png') -> BytesIO:
+    """
+    Arg:
+        qr_data: Encoded QR payload string, or a dictionary to encode as JSON
+        image_format: 'png', 'svg' or 'matrix' (default: 'png')
+
+    Returns:
+        BytesIO object containing the rendered image
+    """
+    qr_string = qr_data if isinstance(qr_data, str) else json.dumps(qr_data)
+    return BytesIO(render_qr_image(qr_string, image_format))
+
+
+def qr_image_key(qr_string: str, image_format: Optional[str] = None) -> str:
+    """
+    Returns:
+        Content-addressed S3 key: the same payload and format always map to
+        the same object
+    """
+    renderer = _renderer(image_format)
+    digest = hashlib.sha256(f"{renderer.extension}:{qr_string}".encode('utf-8')).hexdigest()[:32]
+    return f"qrcodes/{digest}.{renderer.extension}"
+
+
+def _public_url(key: str) -> str:
+    # generate public URL (or use CloudFront URL if configured)
+    cloudfront_domain = os.environ.get('CLOUDFRONT_DOMAIN')
+    if cloudfront_domain:
+        return f"https://{cloudfront_domain}/{key}"
+    return f"https://{S3_BUCKET}.s3.amazonaws.com/{key}"
+
+
+def put_qr_image(qr_string: str, body: bytes, image_format: Optional[str] = None) -> Optional[str]:
+    """
+    Upload an already rendered image under its content-addressed key.
+
+    Args:
+        qr_string: Encoded QR payload the image was rendered from
+        body: Rendered image bytes
+        image_format: Format body was rendered in (default: QR_IMAGE_FORMAT)
+
+    Returns:
+        Public URL of the image, or None if the upload fails
+    """
+    try:
+        renderer = _renderer(image_format)
+        key = qr_image_key(qr_string, image_format)
+        get_s3_client().put_object(
+            Bucket=S3_BUCKET,
+            Key=key,
+            Body=body,
+            ContentType=renderer.content_type,
+            CacheControl='public, max-age=31536000, immutable'
+        )
+        _stored_keys.set(key, True)
+        url = _public_url(key)
+        print(f"[qr_generator] QR code uploaded to: {url}")
+        return url
+    except Exception as e:
+        print(f"Error uploading QR code to S3: {e}")
+        return None
+
+
+def store_qr_image(qr_string: str, image_format: Optional[str] = None) -> Optional[str]:
+    """
+    Render and upload a QR image unless an identical one already exists.
+
+    Keys already stored by this container skip rendering and S3 entirely;
+    otherwise a HEAD request checks the bucket before rendering.
+
+    Args:
+        qr_string: Encoded QR payload
+        image_format: 'png', 'svg' or 'matrix' (default: QR_IMAGE_FORMAT)
+
+    Returns:
+        Public URL of the image, or None if the upload fails
+    """
+    key = qr_image_key(qr_string, image_format)
+    if key in _stored_keys:
+        return _public_url(key)
+
+    try:
+        get_s3_client().head_object(Bucket=S3_BUCKET, Key=key)
+        _stored_keys.set(key, True)
+        return _public_url(key)
+    except ClientError:
+        pass
+
+    return put_qr_image(qr_string, render_qr_image(qr_string, image_format), image_format)
+
+
+def generate_and_upload_qr_code(session_id: str, class_id: str, expiry_minutes: int = 60,
+                                activity_epoch: int = 0, image_format: Optional[str] = None) -> Dict:
+    """
+    Args:
+        session_id: Unique session identifier
+        class_id: Class identifier
+        expiry_minutes: Minutes until QR code expires
+        activity_epoch: Session activity epoch the code is issued for
+        image_format: 'png', 'svg' or 'matrix' (default: QR_IMAGE_FORMAT)
+    
+    Returns:
+        Dictionary containing qr_data and qr_code_url
+    """
+    qr_data = generate_qr_code_data(session_id, class_id, expiry_minutes, activity_epoch)
+    qr_string = encode_qr_payload(qr_data)
+    
+    qr_code_url = store_qr_image(qr_string, image_format)
+    
+    return {
+        'qr_data': qr_data,
+        'qr_code_url': qr_code_url,
+        'qr_code_string': qr_string
+    }
+
+
+def _within_validity(qr_data: Dict) -> bool:
+    now = datetime.utcnow()
+    if qr_data.get('valid_from') and now < datetime.fromisoformat(qr_data['valid_from']):
+        return False
+    if qr_data.get('expiry') and now > datetime.fromisoformat(qr_data['expiry']):
+        return False
+    return True
+
+
+def revocation_horizon(qr_string: Optional[str]) -> int:
+    """
+    Epoch seconds after which no signed code issued before now can validate:
+    rotating codes from the current and previous windows, and qr_string
+    (the session's stored static code), if it is a signed token.
+    """
+    horizon = (current_rotation_window() + 2) * ROTATION_WINDOW_SECONDS
+    qr_data = decode_qr_token(qr_string) if isinstance(qr_string, str) else None
+    if qr_data:
+        horizon = max(horizon, _to_epoch(qr_data['expiry']))
+    return horizon
+
+
+def _is_revoked(qr_data: Dict, revoked_epoch: Optional[Callable[[str], Optional[int]]]) -> bool:
+    min_epoch = revoked_epoch(qr_data['session_id']) if revoked_epoch else None
+    return min_epoch is not None and qr_data['activity_epoch'] < int(min_epoch)
+
+
+def validate_qr_code_data(qr_string: str,
+                          revoked_epoch: Optional[Callable[[str], Optional[int]]] = None) -> Optional[Dict]:
+    """
+    Arg:
+        qr_string: Signed token (static or rotating) or JSON string from scanned QR code
+        revoked_epoch: session_id -> lowest activity epoch still accepted, or None
+            (signed tokens issued for an earlier epoch are rejected). Only called
+            once the token's signature and validity window have checked out
+    
+    Returns:
+        Parsed QR code data if valid or None otherwise. Signed tokens are
+        verified locally and carry 'signed': True.
+    """
+    if isinstance(qr_string, str) and qr_string.startswith(ROTATING_TOKEN_PREFIX):
+        qr_data = decode_rotating_token(qr_string)
+        if not qr_data:
+            return None
+        # accept the current window and the previous one (scan lag, clock skew)
+        if current_rotation_window() - qr_data['window'] not in (0, 1):
+            return None
+        if _is_revoked(qr_data, revoked_epoch):
+            return None
+        return qr_data
+
+    if isinstance(qr_string, str) and qr_string.startswith(SIGNED_TOKEN_PREFIX):
+        qr_data = decode_qr_token(qr_string)
+        if not qr_data:
+            return None
+        if not _within_validity(qr_data):
+            return None
+        if _is_revoked(qr_data, revoked_epoch):
+            return None
+        return qr_data
+
+    if not QR_ACCEPT_UNSIGNED:
+        return None
+
+    try:
+        qr_data = json.loads(qr_string)
+        
+        required_fields = ['session_id', 'class_id', 'timestamp']
+        if not all(field in qr_data for field in required_fields):
+            return None
+        
+        if not _within_validity(qr_data):
+            return None
+        
+        return qr_data
+    except (json.JSONDecodeError, ValueError, KeyError) as e:
+        print(f"Error validating QR code data: {e}")
+        return None
\ No newline at end of file
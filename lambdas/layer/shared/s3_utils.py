@@ -0,0 +1,431 @@
+import os
+import math
+import time
+import uuid
+import hashlib
+import threading
+import binascii
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Iterable, Iterator
+from botocore.exceptions import ClientError
+from io import BytesIO
+import base64
+
+from . import aws_clients
+from .cache_utils import TTLCache
+
+
+# S3 client, created on first use (see aws_clients)
+s3_client = None
+
+
+def get_s3_client():
+    global s3_client
+    if s3_client is None:
+        s3_client = aws_clients.client('s3')
+    return s3_client
+
+
+QR_CODE_BUCKET = os.environ.get('QR_CODE_BUCKET', 'qr-class-manager-qrcodes')
+LECTURE_MATERIALS_BUCKET = os.environ.get('LECTURE_MATERIALS_BUCKET', 'qr-class-manager-lectures')
+EXPORTS_BUCKET = os.environ.get('EXPORTS_BUCKET', 'qr-class-manager-exports')
+
+# presigned GET URLs are reused for every request in the same issue-time bucket
+PRESIGN_BUCKET_SECONDS = int(os.environ.get('PRESIGN_BUCKET_SECONDS', '300'))
+MAX_PRESIGN_EXPIRATION = 7 * 24 * 3600  # SigV4 limit
+_presign_cache = TTLCache(maxsize=1024, ttl=PRESIGN_BUCKET_SECONDS)
+
+# direct-to-S3 multipart uploads; S3 allows at most 10,000 parts of at least 5 MiB (except the last)
+UPLOAD_PART_SIZE = int(os.environ.get('LECTURE_UPLOAD_PART_SIZE', str(16 * 1024 * 1024)))
+MAX_LECTURE_MATERIAL_BYTES = int(os.environ.get('MAX_LECTURE_MATERIAL_BYTES', str(2 * 1024 ** 3)))
+MAX_UPLOAD_PARTS = 10000
+ZIP_SIGNATURES = (b'PK\x03\x04', b'PK\x05\x06')
+
+# streaming inline uploads: memory stays around (STREAM_UPLOAD_WORKERS + 1) parts
+STREAM_PART_SIZE = int(os.environ.get('STREAM_UPLOAD_PART_SIZE', str(8 * 1024 * 1024)))
+STREAM_UPLOAD_WORKERS = int(os.environ.get('STREAM_UPLOAD_WORKERS', '4'))
+BASE64_CHUNK_CHARS = 1024 * 1024  # multiple of 4
+_BASE64_WHITESPACE = str.maketrans('', '', ' \t\r\n')
+
+
+def get_presigned_url(bucket: str, key: str, expiration: int = 3600) -> Optional[str]:
+    """
+    Requests are grouped into PRESIGN_BUCKET_SECONDS issue-time buckets and
+    every request in a bucket gets the same URL from memory. The URL is
+    signed for expiration plus one bucket, so it stays valid for at least
+    expiration seconds whenever it is handed out.
+
+    Args:
+        bucket: S3 bucket name
+        key: S3 object key
+        expiration: URL expiration time in seconds (default: 1 hour)
+    
+    Returns:
+        Presigned URL string or None if error
+    """
+    now = time.time()
+    window = int(now // PRESIGN_BUCKET_SECONDS)
+    cache_key = (bucket, key, expiration)
+    cached = _presign_cache.get(cache_key)
+    if cached and cached[0] == window:
+        return cached[1]
+
+    try:
+        url = get_s3_client().generate_presigned_url(
+            'get_object',
+            Params={'Bucket': bucket, 'Key': key},
+            ExpiresIn=min(expiration + PRESIGN_BUCKET_SECONDS, MAX_PRESIGN_EXPIRATION)
+        )
+    except ClientError as e:
+        print(f"Error generating presigned URL: {e}")
+        return None
+
+    _presign_cache.set(cache_key, (window, url), ttl=(window + 1) * PRESIGN_BUCKET_SECONDS - now)
+    return url
+
+
+def invalidate_presigned_urls(bucket: str, key: str) -> None:
+    """Drop cached URLs for an object that was deleted or replaced."""
+    _presign_cache.invalidate_where(lambda cache_key: cache_key[:2] == (bucket, key))
+
+
+def delete_object(bucket: str, key: str) -> bool:
+    """
+    Args:
+        bucket: S3 bucket name
+        key: S3 object key
+    
+    Returns:
+        True if successful or False otherwise
+    """
+    try:
+        get_s3_client().delete_object(Bucket=bucket, Key=key)
+        invalidate_presigned_urls(bucket, key)
+        return True
+    except ClientError as e:
+        print(f"Error deleting S3 object: {e}")
+        return False
+
+
+def lecture_material_key(session_id: str, filename: str) -> str:
+    """
+    Args:
+        session_id: Session identifier
+        filename: Client-supplied filename (directories are stripped)
+
+    Returns:
+        A fresh S3 key under lectures/{session_id}/<random>/, always ending in
+        .zip. Every upload gets its own key, so an upload never overwrites the
+        material the session currently points at; it is swapped in (and the
+        old object deleted) only after it has been validated.
+    """
+    filename = os.path.basename((filename or '').replace('\\', '/')) or 'lecture_materials.zip'
+    if not filename.lower().endswith('.zip'):
+        filename = f"{filename}.zip"
+    return f"lectures/{session_id}/{uuid.uuid4().hex[:12]}/{filename}"
+
+
+def get_lecture_material_presigned_url(session_id: str, key: Optional[str] = None, expiration: int = 3600) -> Optional[str]:
+    """
+    Args:
+        session_id: Session identifier
+        key: S3 key (if None, will try to find the material for this session)
+        expiration: URL expiration time in seconds (default: 1 hour)
+    
+    Returns:
+        Presigned URL string or None if error
+    """
+    try:
+        if not key:
+            # try to find the lecture material for this session, assumes the key is stored in the session record
+            # use a standard pattern for now
+            key = f"lectures/{session_id}/lecture_materials.zip"
+        
+        return get_presigned_url(LECTURE_MATERIALS_BUCKET, key, expiration)
+    except Exception as e:
+        print(f"error getting lecture material presigned URL: {e}")
+        return None
+
+
+def delete_lecture_material(key: str) -> bool:
+    """
+    Arg:
+        key: S3 object key
+    
+    Returns:
+        True if successful or False otherwise
+    """
+    return delete_object(LECTURE_MATERIALS_BUCKET, key)
+
+
+def create_presigned_multipart_upload(key: str, file_size: int, expiration: int = 3600,
+                                      content_type: str = 'application/zip') -> Optional[Dict]:
+    """
+    Start a multipart upload and presign one PUT URL per part, so the client
+    sends the file straight to S3.
+
+    Args:
+        key: S3 key in the lecture materials bucket
+        file_size: Size of the file in bytes
+        expiration: Part URL expiration time in seconds (default: 1 hour)
+        content_type: Content type stored on the object
+
+    Returns:
+        {'upload_id', 'key', 'part_size', 'parts': [{'part_number', 'url'}]} or None if error
+    """
+    part_size = max(UPLOAD_PART_SIZE, math.ceil(file_size / MAX_UPLOAD_PARTS))
+    part_count = max(1, math.ceil(file_size / part_size))
+    try:
+        upload = get_s3_client().create_multipart_upload(
+            Bucket=LECTURE_MATERIALS_BUCKET,
+            Key=key,
+            ContentType=content_type
+        )
+        upload_id = upload['UploadId']
+        parts = [
+            {
+                'part_number': part_number,
+                'url': get_s3_client().generate_presigned_url(
+                    'upload_part',
+                    Params={
+                        'Bucket': LECTURE_MATERIALS_BUCKET,
+                        'Key': key,
+                        'UploadId': upload_id,
+                        'PartNumber': part_number
+                    },
+                    ExpiresIn=expiration
+                )
+            }
+            for part_number in range(1, part_count + 1)
+        ]
+        return {'upload_id': upload_id, 'key': key, 'part_size': part_size, 'parts': parts}
+    except ClientError as e:
+        print(f"Error starting multipart upload: {e}")
+        return None
+
+
+def complete_multipart_upload(key: str, upload_id: str, parts: List[Dict]) -> Optional[Dict]:
+    """
+    Args:
+        key: S3 key the upload was started for
+        upload_id: Multipart upload id
+        parts: [{'part_number': int, 'etag': str}] as returned by the part PUTs
+
+    Returns:
+        {'key', 'size', 'etag'} of the assembled object, or None if S3 rejects the parts
+    """
+    try:
+        get_s3_client().complete_multipart_upload(
+            Bucket=LECTURE_MATERIALS_BUCKET,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={'Parts': sorted(
+                ({'PartNumber': int(part['part_number']), 'ETag': part['etag']} for part in parts),
+                key=lambda part: part['PartNumber']
+            )}
+        )
+        head = get_s3_client().head_object(Bucket=LECTURE_MATERIALS_BUCKET, Key=key)
+        return {'key': key, 'size': head['ContentLength'], 'etag': head.get('ETag')}
+    except (ClientError, KeyError, TypeError, ValueError) as e:
+        print(f"Error completing multipart upload: {e}")
+        return None
+
+
+def abort_multipart_upload(key: str, upload_id: str) -> bool:
+    """
+    Returns:
+        True if the upload was aborted (its parts are discarded) or False otherwise
+    """
+    try:
+        get_s3_client().abort_multipart_upload(Bucket=LECTURE_MATERIALS_BUCKET, Key=key, UploadId=upload_id)
+        return True
+    except ClientError as e:
+        print(f"Error aborting multipart upload: {e}")
+        return False
+
+
+def is_zip_object(key: str) -> bool:
+    """
+    Reads only the first four bytes of the object.
+
+    Returns:
+        True if the object starts with a ZIP signature
+    """
+    try:
+        response = get_s3_client().get_object(Bucket=LECTURE_MATERIALS_BUCKET, Key=key, Range='bytes=0-3')
+        return response['Body'].read(4) in ZIP_SIGNATURES
+    except ClientError as e:
+        print(f"Error reading lecture material header: {e}")
+        return False
+
+
+
+def iter_base64_chunks(text: str, chunk_chars: int = BASE64_CHUNK_CHARS) -> Iterator[bytes]:
+    """
+    Decode base64 text a slice at a time instead of materializing the whole
+    decoded file. Whitespace (e.g. MIME line breaks) is ignored.
+
+    Raises:
+        binascii.Error: If the text is not valid base64
+    """
+    carry = ''
+    for start in range(0, len(text), chunk_chars):
+        chunk = carry + text[start:start + chunk_chars].translate(_BASE64_WHITESPACE)
+        usable = len(chunk) - len(chunk) % 4
+        carry = chunk[usable:]
+        if usable:
+            yield base64.b64decode(chunk[:usable], validate=True)
+    if carry:
+        raise binascii.Error("base64 input is not padded to a multiple of 4 characters")
+
+
+def _iter_parts(chunks: Iterator[bytes], part_size: int) -> Iterator[bytes]:
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= part_size:
+            with memoryview(buffer) as view:
+                part = bytes(view[:part_size])
+            del buffer[:part_size]
+            yield part
+    if buffer:
+        yield bytes(buffer)
+
+
+def _sha256_b64(data: bytes) -> str:
+    return base64.b64encode(hashlib.sha256(data).digest()).decode('ascii')
+
+
+def upload_base64_stream(bucket: str, key: str, b64_text: str, content_type: str = 'application/zip',
+                         part_size: int = STREAM_PART_SIZE, max_workers: int = STREAM_UPLOAD_WORKERS) -> Optional[Dict]:
+    """
+    Decode base64 content in fixed-size chunks and upload it with upload_stream.
+
+    Args:
+        bucket: S3 bucket name
+        key: S3 object key
+        b64_text: Base64-encoded file content
+        content_type: Content type stored on the object
+        part_size: Bytes per part (S3 minimum is 5 MiB except for the last part)
+        max_workers: Concurrent upload_part calls
+
+    Returns:
+        {'key', 'size', 'parts'} or None if the upload fails
+
+    Raises:
+        ValueError: If the content is not valid base64 (any started upload is aborted)
+    """
+    return upload_stream(bucket, key, iter_base64_chunks(b64_text), content_type, part_size, max_workers)
+
+
+def upload_stream(bucket: str, key: str, chunks: Iterable[bytes], content_type: str,
+                  part_size: int = STREAM_PART_SIZE, max_workers: int = STREAM_UPLOAD_WORKERS) -> Optional[Dict]:
+    """
+    Re-cut a stream of byte chunks into fixed-size parts and upload them as
+    S3 multipart parts on a thread pool. At most max_workers parts are in
+    flight, so memory does not grow with the object size. Every part carries
+    a SHA-256 checksum that S3 verifies on receipt.
+
+    Content that fits in one part is sent with a single put_object.
+
+    Args:
+        bucket: S3 bucket name
+        key: S3 object key
+        chunks: Object content, produced lazily (any chunk sizes)
+        content_type: Content type stored on the object
+        part_size: Bytes per part (S3 minimum is 5 MiB except for the last part)
+        max_workers: Concurrent upload_part calls
+
+    Returns:
+        {'key', 'size', 'parts'} or None if S3 rejects the upload
+
+    Raises:
+        Whatever the chunk producer raises (any started upload is aborted)
+    """
+    parts = _iter_parts(iter(chunks), part_size)
+    upload_id = None
+    try:
+        first = next(parts, b'')
+        second = next(parts, None)
+        if second is None:
+            get_s3_client().put_object(
+                Bucket=bucket,
+                Key=key,
+                Body=first,
+                ContentType=content_type,
+                ChecksumSHA256=_sha256_b64(first)
+            )
+            return {'key': key, 'size': len(first), 'parts': 1}
+
+        upload_id = get_s3_client().create_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            ContentType=content_type,
+            ChecksumAlgorithm='SHA256'
+        )['UploadId']
+
+        in_flight = threading.BoundedSemaphore(max_workers)
+
+        def send(part_number: int, body: bytes) -> Dict:
+            try:
+                checksum = _sha256_b64(body)
+                response = get_s3_client().upload_part(
+                    Bucket=bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=body,
+                    ChecksumAlgorithm='SHA256',
+                    ChecksumSHA256=checksum
+                )
+                return {'PartNumber': part_number, 'ETag': response['ETag'], 'ChecksumSHA256': checksum}
+            finally:
+                in_flight.release()
+
+        size = 0
+        futures = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for part_number, body in enumerate(chain((first, second), parts), start=1):
+                in_flight.acquire()
+                size += len(body)
+                futures.append(executor.submit(send, part_number, body))
+            completed = [future.result() for future in futures]
+
+        get_s3_client().complete_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={'Parts': completed}
+        )
+        return {'key': key, 'size': size, 'parts': len(completed)}
+    except ClientError as e:
+        print(f"Error streaming upload to S3: {e}")
+        _abort_quietly(bucket, key, upload_id)
+        return None
+    except Exception:
+        # the producer failed (e.g. invalid base64); nothing useful was uploaded
+        _abort_quietly(bucket, key, upload_id)
+        raise
+
+
+def _abort_quietly(bucket: str, key: str, upload_id: Optional[str]) -> None:
+    if not upload_id:
+        return
+    try:
+        get_s3_client().abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+    except ClientError as e:
+        print(f"Error aborting multipart upload: {e}")
+
+
+def upload_lecture_material_base64(session_id: str, b64_content: str, filename: str) -> Optional[Dict]:
+    """
+    Stream a base64 request body to the session's lecture material key.
+
+    Returns:
+        {'key', 'size', 'parts'} or None if the upload fails
+
+    Raises:
+        ValueError: If the content is not valid base64
+    """
+    return upload_base64_stream(LECTURE_MATERIALS_BUCKET, lecture_material_key(session_id, filename), b64_content)
@@ -0,0 +1,45 @@
+"""
+Signing keys read from Secrets Manager at runtime.
+
+The stack passes only a secret's ARN (<NAME>_ARN) to the functions that need
+it, so the key never appears in the synthesized template or a function's
+environment. The value is fetched on first use and kept for the life of the
+container.
+"""
+import os
+import threading
+
+from . import aws_clients
+
+_lock = threading.Lock()
+_values = {}
+
+
+def get_secret(name: str) -> str:
+    """
+    Args:
+        name: Setting name, e.g. 'QR_SIGNING_SECRET'; the ARN is read from <name>_ARN
+
+    Returns:
+        The secret string, or '' when <name>_ARN is not set
+
+    Raises:
+        ClientError from Secrets Manager; callers fail closed
+    """
+    value = _values.get(name)
+    if value is not None:
+        return value
+
+    arn = os.environ.get(f"{name}_ARN")
+    if not arn:
+        return ''
+    with _lock:
+        value = _values.get(name)
+        if value is None:
+            value = aws_clients.client('secretsmanager').get_secret_value(SecretId=arn)['SecretString']
+            _values[name] = value
+    return value
+
+
+def clear_secret_cache() -> None:
+    _values.clear()
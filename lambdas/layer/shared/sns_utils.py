@@ -0,0 +1,239 @@
+import os
+import json
+import time
+import random
+from typing import Any, Dict, Iterable, List, Optional
+from botocore.exceptions import ClientError
+from datetime import datetime
+
+from . import aws_clients
+
+# SNS client, created on first use (see aws_clients)
+sns_client = None
+
+
+def get_sns_client():
+    global sns_client
+    if sns_client is None:
+        sns_client = aws_clients.client('sns')
+    return sns_client
+
+
+ATTENDANCE_TOPIC_ARN = os.environ.get('ATTENDANCE_TOPIC_ARN', '')
+
+PUBLISH_BATCH_SIZE = 10  # SNS PublishBatch limit
+PUBLISH_MAX_ATTEMPTS = int(os.environ.get('SNS_PUBLISH_MAX_ATTEMPTS', '3'))
+PUBLISH_RETRY_BASE_DELAY = float(os.environ.get('SNS_PUBLISH_RETRY_BASE_DELAY', '0.2'))
+
+
+def build_attendance_message(student_id: str, session_id: str, class_id: str,
+                             message_type: str = 'attendance_confirmed',
+                             lecture_material_url: Optional[str] = None,
+                             lecture_material_key: Optional[str] = None) -> Dict:
+    """
+    Returns:
+        Attendance notification body, shared by the single and batched publishers
+    """
+    return {
+        'message_type': message_type,
+        'student_id': student_id,
+        'session_id': session_id,
+        'class_id': class_id,
+        'timestamp': datetime.utcnow().isoformat(),
+        'has_lecture_materials': lecture_material_url is not None,
+        'lecture_material_url': lecture_material_url,
+        'lecture_material_key': lecture_material_key
+    }
+
+
+def attendance_subject(message_type: str) -> str:
+    return f'Attendance {message_type.replace("_", " ").title()}'
+
+
+def send_attendance_notification(student_id: str, session_id: str, class_id: str, 
+                                 message_type: str = 'attendance_confirmed',
+                                 lecture_material_url: Optional[str] = None,
+                                 lecture_material_key: Optional[str] = None) -> bool:
+    """
+    Send attendance notification via SNS including lecture material info if available
+    
+    Args:
+        student_id: Student identifier
+        session_id: Session identifier
+        class_id: Class identifier
+        message_type: Type of notification
+        lecture_material_url: Presigned URL for lecture material (optional)
+        lecture_material_key: S3 key for lecture material (optional)
+    
+    Returns:
+        True if successful or False otherwise
+    """
+    if not ATTENDANCE_TOPIC_ARN:
+        print("ATTENDANCE_TOPIC_ARN not configured, skipping notification")
+        return False
+    
+    try:
+        message = build_attendance_message(student_id, session_id, class_id, message_type,
+                                           lecture_material_url, lecture_material_key)
+        
+        response = get_sns_client().publish(
+            TopicArn=ATTENDANCE_TOPIC_ARN,
+            Message=json.dumps(message),
+            Subject=attendance_subject(message_type)
+        )
+        
+        return response.get('MessageId') is not None
+    except ClientError as e:
+        print(f"Error sending SNS notification: {e}")
+        return False
+
+
+def send_bulk_notification(message: Dict, topic_arn: Optional[str] = None) -> bool:
+    """
+    Args:
+        message: Message dictionary to send
+        topic_arn: SNS topic ARN (uses default if not provided)
+    
+    Returns:
+        True if successful or False otherwise
+    """
+    topic = topic_arn or ATTENDANCE_TOPIC_ARN
+    if not topic:
+        print("No SNS topic ARN configured")
+        return False
+    
+    try:
+        response = get_sns_client().publish(
+            TopicArn=topic,
+            Message=json.dumps(message)
+        )
+        return response.get('MessageId') is not None
+    except ClientError as e:
+        print(f"Error sending SNS notification: {e}")
+        return False
+
+
+class BatchPublisher:
+    """
+    Accumulates messages and sends them with publish_batch, ten per request.
+
+    Entries SNS reports as failed on its side (SenderFault false) and
+    throttled or failed requests are retried with exponential backoff and
+    jitter; entries rejected as invalid are not. Pending messages are sent
+    when a batch fills up, on flush(), and when used as a context manager,
+    on exit:
+
+        with BatchPublisher() as publisher:
+            for student_id in student_ids:
+                publisher.add({...})
+        print(publisher.sent, publisher.failed)
+    """
+
+    def __init__(self, topic_arn: Optional[str] = None, max_attempts: int = PUBLISH_MAX_ATTEMPTS,
+                 base_delay: float = PUBLISH_RETRY_BASE_DELAY):
+        """
+        Args:
+            topic_arn: SNS topic ARN (uses default if not provided)
+            max_attempts: Attempts per entry, including the first
+            base_delay: Seconds before the first retry; doubled on every further attempt
+        """
+        self.topic_arn = topic_arn or ATTENDANCE_TOPIC_ARN
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.sent = 0
+        self.failed: List[Dict[str, Any]] = []
+        self._pending: List[Dict[str, Any]] = []
+        self._next_id = 0
+
+    def add(self, message: Dict, subject: Optional[str] = None, key: Any = None) -> None:
+        """
+        Args:
+            message: Message dictionary to send
+            subject: Email subject (optional)
+            key: Caller reference reported back in failed (optional)
+        """
+        entry = {'Id': str(self._next_id), 'Message': json.dumps(message)}
+        if subject:
+            entry['Subject'] = subject
+        self._next_id += 1
+        self._pending.append({'entry': entry, 'key': key})
+        if len(self._pending) >= PUBLISH_BATCH_SIZE:
+            self._send(self._pending[:PUBLISH_BATCH_SIZE])
+            del self._pending[:PUBLISH_BATCH_SIZE]
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """
+        Send every pending message.
+
+        Returns:
+            All entries that failed so far: [{'key', 'code', 'message'}]
+        """
+        while self._pending:
+            self._send(self._pending[:PUBLISH_BATCH_SIZE])
+            del self._pending[:PUBLISH_BATCH_SIZE]
+        return self.failed
+
+    def _send(self, batch: List[Dict[str, Any]]) -> None:
+        if not self.topic_arn:
+            print("No SNS topic ARN configured")
+            self.failed.extend({'key': item['key'], 'code': 'NoTopic', 'message': 'no topic configured'}
+                               for item in batch)
+            return
+
+        for attempt in range(self.max_attempts):
+            if attempt:
+                time.sleep(self.base_delay * (2 ** (attempt - 1)) * (1 + random.random()))
+
+            by_id = {item['entry']['Id']: item for item in batch}
+            try:
+                response = get_sns_client().publish_batch(
+                    TopicArn=self.topic_arn,
+                    PublishBatchRequestEntries=[item['entry'] for item in batch]
+                )
+            except ClientError as e:
+                print(f"Error publishing SNS batch (attempt {attempt + 1}): {e}")
+                error = e.response.get('Error', {})
+                last_errors = {entry_id: (error.get('Code', 'ClientError'), str(e)) for entry_id in by_id}
+                continue
+
+            self.sent += len(response.get('Successful', []))
+            batch, last_errors = [], {}
+            for failure in response.get('Failed', []):
+                item = by_id[failure['Id']]
+                last_errors[failure['Id']] = (failure.get('Code'), failure.get('Message'))
+                if failure.get('SenderFault'):
+                    self.failed.append({'key': item['key'], 'code': failure.get('Code'),
+                                        'message': failure.get('Message')})
+                else:
+                    batch.append(item)
+            if not batch:
+                return
+
+        for item in batch:
+            code, message = last_errors.get(item['entry']['Id'], (None, None))
+            self.failed.append({'key': item['key'], 'code': code, 'message': message})
+
+    def __enter__(self) -> 'BatchPublisher':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.flush()
+
+
+def publish_messages(messages: Iterable[Dict], topic_arn: Optional[str] = None,
+                     subject: Optional[str] = None) -> Dict[str, int]:
+    """
+    Publish many messages (e.g. a broadcast to a whole class) ten per request.
+
+    Args:
+        messages: Message dictionaries to send
+        topic_arn: SNS topic ARN (uses default if not provided)
+        subject: Email subject for every message (optional)
+
+    Returns:
+        {'sent': n, 'failed': n}
+    """
+    with BatchPublisher(topic_arn) as publisher:
+        for message in messages:
+            publisher.add(message, subject=subject)
+    return {'sent': publisher.sent, 'failed': len(publisher.failed)}
@@ -1,25 +1,20 @@
 import json
-import os
-import sys
 import uuid
 from datetime import datetime
-import decimal  # 🟢 CRITICAL FIX: Ensure decimal is imported here
-from shared import auth_utils
-from shared import dynamodb_utils
-from shared import models
 from shared import qr_generator
-from shared import s3_utils
-from shared import sns_utils
+from shared import bulk_sessions
 
-# add shared directory to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared'))
-
-from dynamodb_utils import (
+from shared.dynamodb_utils import (
     create_session, get_session, update_session,
-    get_sessions_by_class, get_class,
-    get_attendance_count_by_session
+    get_sessions_page_by_class,
+    get_attendance_count_by_session, deactivate_session
+)
+from shared.json_utils import dumps
+from shared.pagination import page_params, encode_page_token, PageRequestError
+from shared.projection import requested_fields, select_fields, SESSION_FIELDS, FieldsRequestError
+from shared.auth_utils import (
+    get_user_from_event, require_professor, get_user_id, assert_owns_class, ClassAccessError
 )
-from auth_utils import get_user_from_event, require_professor, get_user_id
 
 # Define Universal CORS Headers
 CORS_HEADERS = {
@@ -28,20 +23,67 @@ CORS_HEADERS = {
     'Access-Control-Allow-Headers': 'Content-Type,Authorization'
 }
 
-def default_serializer(obj):
-    """Serialize DynamoDB types (like Decimal) to JSON compatible types."""
-    if isinstance(obj, decimal.Decimal):
-        if obj % 1 == 0:
-            return int(obj)
-        else:
-            return float(obj)
-    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+def attendance_count_for(session):
+    """Prefer the denormalized counter; only legacy sessions fall back to a COUNT query."""
+    if session.get('attendance_count') is not None:
+        return int(session['attendance_count'])
+    return get_attendance_count_by_session(session['session_id'])
+
+
+def is_bulk_request(event):
+    resource = event.get('resource') or event.get('path') or event.get('rawPath') or ''
+    return resource.rstrip('/').endswith('/sessions/bulk')
+
+
+def create_sessions_from_schedule(body, user_id, user=None):
+    """POST /sessions/bulk: pre-generate every session of a recurring schedule."""
+    class_id = body.get('class_id')
+    if not class_id:
+        return {
+            'statusCode': 400,
+            'headers': CORS_HEADERS,
+            'body': dumps({'error': 'class_id is required'})
+        }
+
+    assert_owns_class(user_id, class_id, user)
+
+    def log_progress(stage, done, total):
+        if done == total or done % 25 == 0:
+            print(f"[bulk-sessions] {class_id}: {stage} {done}/{total}")
+
+    try:
+        result = bulk_sessions.pregenerate_sessions(body, progress=log_progress)
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'headers': CORS_HEADERS,
+            'body': dumps({'error': str(e)})
+        }
+
+    if result['statusCode'] != 200:
+        return {
+            'statusCode': 500,
+            'headers': CORS_HEADERS,
+            'body': dumps({'error': 'failed to create sessions'})
+        }
+
+    return {
+        'statusCode': 201,
+        'headers': CORS_HEADERS,
+        'body': dumps({
+            'class_id': class_id,
+            'sessions': result['sessions'],
+            'count': result['created'],
+            'failed_uploads': result['failed_uploads']
+        })
+    }
 
 
 def lambda_handler(event, context):
     """
     - GET: List sessions (query params: class_id)
     - POST: Create a new session
+    - POST /sessions/bulk: Create every session of a recurring schedule
     - PUT: Update a session
     - DELETE: Deactivate a session
     """
@@ -51,7 +93,7 @@ def lambda_handler(event, context):
             return {
                 'statusCode': 401,
                 'headers': CORS_HEADERS,
-                'body': json.dumps({'error': 'unauthorized'}, default=default_serializer)
+                'body': dumps({'error': 'unauthorized'})
             }
 
         # only professors can manage sessions
@@ -59,7 +101,7 @@ def lambda_handler(event, context):
             return {
                 'statusCode': 403,
                 'headers': CORS_HEADERS,
-                'body': json.dumps({'error': 'only professors can manage sessions'}, default=default_serializer)
+                'body': dumps({'error': 'only professors can manage sessions'})
             }
 
         user_id = get_user_id(user)
@@ -71,6 +113,8 @@ def lambda_handler(event, context):
             class_id = query_params.get('class_id')
             path_params = event.get('pathParameters') or {}
             session_id = path_params.get('session_id') or query_params.get('session_id')
+            # attendance_count is always fetched: it is reported for every session
+            fields = requested_fields(query_params, SESSION_FIELDS, always=('session_id', 'attendance_count'))
 
             if session_id:
                 # get specific session
@@ -79,52 +123,35 @@ def lambda_handler(event, context):
                     return {
                         'statusCode': 404,
                         'headers': CORS_HEADERS,
-                        'body': json.dumps({'error': 'session not found'}, default=default_serializer)
+                        'body': dumps({'error': 'session not found'})
                     }
 
-                class_data = get_class(session['class_id'])
-                if class_data and class_data.get('professor_id') != user_id:
-                    return {
-                        'statusCode': 403,
-                        'headers': CORS_HEADERS,
-                        'body': json.dumps({'error': 'you do not own this class'}, default=default_serializer)
-                    }
+                assert_owns_class(user_id, session['class_id'], user)
 
                 try:
-                    session['attendance_count'] = get_attendance_count_by_session(session_id)
+                    session['attendance_count'] = attendance_count_for(session)
                 except:
                     session['attendance_count'] = 0
 
                 return {
                     'statusCode': 200,
                     'headers': CORS_HEADERS,
-                    'body': json.dumps(session, default=default_serializer)
+                    'body': dumps(select_fields(session, fields))
                 }
 
             elif class_id:
                 # get all sessions for a class
-                class_data = get_class(class_id)
-                if not class_data:
-                    return {
-                        'statusCode': 404,
-                        'headers': CORS_HEADERS,
-                        'body': json.dumps({'error': 'class not found'}, default=default_serializer)
-                    }
+                assert_owns_class(user_id, class_id, user)
 
-                if class_data.get('professor_id') != user_id:
-                    return {
-                        'statusCode': 403,
-                        'headers': CORS_HEADERS,
-                        'body': json.dumps({'error': 'you do not own this class'}, default=default_serializer)
-                    }
-
-                sessions = get_sessions_by_class(class_id)
+                scope = f"sessions:class:{class_id}"
+                limit, start_key = page_params(query_params, scope)
+                sessions, last_key = get_sessions_page_by_class(class_id, limit, start_key, fields)
 
                 enriched_sessions = []
                 for session in sessions:
                     session_id = session['session_id']
                     try:
-                        session['attendance_count'] = get_attendance_count_by_session(session_id)
+                        session['attendance_count'] = attendance_count_for(session)
                     except Exception as e:
                         print(f"Error fetching attendance count for {session_id}: {str(e)}")
                         session['attendance_count'] = 0
@@ -133,18 +160,19 @@ def lambda_handler(event, context):
                 return {
                     'statusCode': 200,
                     'headers': CORS_HEADERS,
-                    'body': json.dumps({
+                    'body': dumps({
                         'class_id': class_id,
                         'sessions': enriched_sessions,
-                        'count': len(enriched_sessions)
-                    }, default=default_serializer)
+                        'count': len(enriched_sessions),
+                        'next_token': encode_page_token(last_key, scope)
+                    })
                 }
 
             else:
                 return {
                     'statusCode': 400,
                     'headers': CORS_HEADERS,
-                    'body': json.dumps({'error': 'class_id or session_id is required'}, default=default_serializer)
+                    'body': dumps({'error': 'class_id or session_id is required'})
                 }
 
         # POST
@@ -154,6 +182,9 @@ def lambda_handler(event, context):
             else:
                 body = event.get('body', {})
 
+            if is_bulk_request(event):
+                return create_sessions_from_schedule(body, user_id, user)
+
             class_id = body.get('class_id')
             session_date = body.get('session_date')
             start_time = body.get('start_time')
@@ -163,23 +194,10 @@ def lambda_handler(event, context):
                 return {
                     'statusCode': 400,
                     'headers': CORS_HEADERS,
-                    'body': json.dumps({'error': 'class_id, session_date, and start_time are required'}, default=default_serializer)
-                }
-
-            class_data = get_class(class_id)
-            if not class_data:
-                return {
-                    'statusCode': 404,
-                    'headers': CORS_HEADERS,
-                    'body': json.dumps({'error': 'class not found'}, default=default_serializer)
+                    'body': dumps({'error': 'class_id, session_date, and start_time are required'})
                 }
 
-            if class_data.get('professor_id') != user_id:
-                return {
-                    'statusCode': 403,
-                    'headers': CORS_HEADERS,
-                    'body': json.dumps({'error': 'you do not own this class'}, default=default_serializer)
-                }
+            assert_owns_class(user_id, class_id, user)
 
             session_id = str(uuid.uuid4())
             created_at = datetime.utcnow().isoformat()
@@ -195,6 +213,7 @@ def lambda_handler(event, context):
                 'end_time': end_time,
                 'is_active': bool(qr_code_url),
                 'qr_code_url': qr_code_url,
+                'qr_code_data': qr_result.get('qr_code_string'),
                 'created_at': created_at
             }
 
@@ -204,13 +223,13 @@ def lambda_handler(event, context):
                 return {
                     'statusCode': 500,
                     'headers': CORS_HEADERS,
-                    'body': json.dumps({'error': 'failed to create session'}, default=default_serializer)
+                    'body': dumps({'error': 'failed to create session'})
                 }
 
             return {
                 'statusCode': 201,
                 'headers': CORS_HEADERS,
-                'body': json.dumps(session_data, default=default_serializer)
+                'body': dumps(session_data)
             }
 
         # PUT
@@ -225,7 +244,7 @@ def lambda_handler(event, context):
                 return {
                     'statusCode': 400,
                     'headers': CORS_HEADERS,
-                    'body': json.dumps({'error': 'session_id is required'}, default=default_serializer)
+                    'body': dumps({'error': 'session_id is required'})
                 }
 
             session = get_session(session_id)
@@ -234,17 +253,10 @@ def lambda_handler(event, context):
                 return {
                     'statusCode': 404,
                     'headers': CORS_HEADERS,
-                    'body': json.dumps({'error': 'session not found'}, default=default_serializer)
+                    'body': dumps({'error': 'session not found'})
                 }
 
-            class_data = get_class(session['class_id'])
-
-            if class_data and class_data.get('professor_id') != user_id:
-                return {
-                    'statusCode': 403,
-                    'headers': CORS_HEADERS,
-                    'body': json.dumps({'error': 'you do not own this class'}, default=default_serializer)
-                }
+            assert_owns_class(user_id, session['class_id'], user)
 
             updates = {}
             if 'session_date' in body:
@@ -260,24 +272,42 @@ def lambda_handler(event, context):
                 return {
                     'statusCode': 400,
                     'headers': CORS_HEADERS,
-                    'body': json.dumps({'error': 'no fields to update'}, default=default_serializer)
+                    'body': dumps({'error': 'no fields to update'})
                 }
 
-            updates['updated_at'] = datetime.utcnow().isoformat()
+            # reactivation issues a fresh QR code for the session's current activity
+            # epoch; codes from before the deactivation stay revoked
+            if updates.get('is_active') is True and not session.get('is_active', False):
+                qr_result = qr_generator.generate_and_upload_qr_code(
+                    session_id, session['class_id'],
+                    activity_epoch=int(session.get('activity_epoch', 0))
+                )
+                if qr_result.get('qr_code_url'):
+                    updates['qr_code_url'] = qr_result['qr_code_url']
+                    updates['qr_code_data'] = qr_result['qr_code_string']
+
+            # deactivation also revokes the session's signed QR codes (see deactivate_session)
+            deactivate = updates.get('is_active') is False
+            if deactivate:
+                del updates['is_active']
+            updated_at = datetime.utcnow().isoformat()
+            updates['updated_at'] = updated_at
 
             success = update_session(session_id, updates)
+            if success and deactivate:
+                success = deactivate_session(session_id, updated_at) is not None
             if not success:
                 return {
                     'statusCode': 500,
                     'headers': CORS_HEADERS,
-                    'body': json.dumps({'error': 'failed to update session'}, default=default_serializer)
+                    'body': dumps({'error': 'failed to update session'})
                 }
 
             updated_session = get_session(session_id)
             return {
                 'statusCode': 200,
                 'headers': CORS_HEADERS,
-                'body': json.dumps(updated_session, default=default_serializer)
+                'body': dumps(updated_session)
             }
 
         # DELETE
@@ -289,7 +319,7 @@ def lambda_handler(event, context):
                 return {
                     'statusCode': 400,
                     'headers': CORS_HEADERS,
-                    'body': json.dumps({'error': 'session_id is required'}, default=default_serializer)
+                    'body': dumps({'error': 'session_id is required'})
                 }
 
             session = get_session(session_id)
@@ -297,46 +327,51 @@ def lambda_handler(event, context):
                 return {
                     'statusCode': 404,
                     'headers': CORS_HEADERS,
-                    'body': json.dumps({'error': 'session not found'}, default=default_serializer)
+                    'body': dumps({'error': 'session not found'})
                 }
 
-            class_data = get_class(session['class_id'])
-            if class_data and class_data.get('professor_id') != user_id:
-                return {
-                    'statusCode': 403,
-                    'headers': CORS_HEADERS,
-                    'body': json.dumps({'error': 'you do not own this class'}, default=default_serializer)
-                }
-
-            success = update_session(session_id, {
-                'is_active': False,
-                'updated_at': datetime.utcnow().isoformat()
-            })
+            assert_owns_class(user_id, session['class_id'], user)
 
-            if not success:
+            # signed QR codes are validated without reading the session, so the
+            # deactivation is published on the revocation list in the same step
+            if deactivate_session(session_id, datetime.utcnow().isoformat()) is None:
                 return {
                     'statusCode': 500,
                     'headers': CORS_HEADERS,
-                    'body': json.dumps({'error': 'failed to deactivate session'}, default=default_serializer)
+                    'body': dumps({'error': 'failed to deactivate session'})
                 }
 
             return {
                 'statusCode': 200,
                 'headers': CORS_HEADERS,
-                'body': json.dumps({'message': 'session deactivated successfully'}, default=default_serializer)
+                'body': dumps({'message': 'session deactivated successfully'})
             }
 
         else:
             return {
                 'statusCode': 405,
                 'headers': CORS_HEADERS,
-                'body': json.dumps({'error': 'method not allowed'}, default=default_serializer)
+                'body': dumps({'error': 'method not allowed'})
             }
 
+    except (PageRequestError, FieldsRequestError) as e:
+        return {
+            'statusCode': 400,
+            'headers': CORS_HEADERS,
+            'body': dumps({'error': str(e)})
+        }
+
+    except ClassAccessError as e:
+        return {
+            'statusCode': e.status_code,
+            'headers': CORS_HEADERS,
+            'body': dumps({'error': e.message})
+        }
+
     except Exception as e:
         print(f"Error managing session: {str(e)}")
         return {
             'statusCode': 500,
             'headers': CORS_HEADERS,
-            'body': json.dumps({'error': 'internal server error', 'message': str(e)}, default=default_serializer)
+            'body': dumps({'error': 'internal server error', 'message': str(e)})
         }
\ No newline at end of file
@@ -0,0 +1,3 @@
+"""
+Reconcile attendance counters Lambda function
+"""
@@ -0,0 +1,49 @@
+import json
+
+from shared.dynamodb_utils import (
+    reconcile_session_attendance, get_sessions_by_class, iter_session_ids
+)
+
+
+def lambda_handler(event, context):
+    """
+    Recomputes the denormalized attendance_count / first_scan_at / last_scan_at
+    on session items from the session_id-index.
+
+    Event (all optional):
+    - session_id: reconcile a single session
+    - class_id: reconcile every session of a class
+    Without either, every session in the table is reconciled (scheduled run).
+    """
+    event = event or {}
+    try:
+        if event.get('session_id'):
+            session_ids = [event['session_id']]
+        elif event.get('class_id'):
+            session_ids = [s['session_id'] for s in get_sessions_by_class(event['class_id'])]
+        else:
+            session_ids = iter_session_ids()
+
+        reconciled = skipped = 0
+        failed = []
+        for session_id in session_ids:
+            result = reconcile_session_attendance(session_id)
+            if result is None:
+                failed.append(session_id)
+            elif result.get('skipped'):
+                skipped += 1
+            else:
+                reconciled += 1
+
+        print(f"[reconcile] reconciled={reconciled} skipped={skipped} failed={len(failed)}")
+        return {
+            'statusCode': 200,
+            'body': json.dumps({'reconciled': reconciled, 'skipped': skipped, 'failed': failed})
+        }
+
+    except Exception as e:
+        print(f"Error reconciling attendance counters: {str(e)}")
+        return {
+            'statusCode': 500,
+            'body': json.dumps({'error': 'internal server error', 'message': str(e)})
+        }
@@ -1,20 +1,13 @@
 import json
-import os
-import sys
-import uuid
 from datetime import datetime
 
-# add shared directory to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared'))
-
-from qr_generator import validate_qr_code_data
-from dynamodb_utils import (
-    get_session, create_attendance, check_attendance_exists,
-    get_class
+from shared.qr_generator import validate_qr_code_data
+from shared.dynamodb_utils import (
+    get_session, create_attendance, attendance_id_for,
+    get_class, increment_session_attendance, get_revoked_epoch
 )
-from auth_utils import get_user_from_event, require_student, get_user_id
-from sns_utils import send_attendance_notification
-from s3_utils import get_lecture_material_presigned_url
+from shared.auth_utils import get_user_from_event, require_student, get_user_id
+from shared.s3_utils import get_lecture_material_presigned_url
 
 # Define Universal CORS Headers
 CORS_HEADERS = {
@@ -23,6 +16,21 @@ CORS_HEADERS = {
     'Access-Control-Allow-Headers': 'Content-Type,Authorization'
 }
 
+
+def lecture_material_url(session_id, session=None):
+    """
+    Download link for the session's lecture material, if it has one. Signed
+    scans pass no session: it is read here, after the attendance write, and
+    only to find lecture_material_key (through the session item cache).
+    """
+    if session is None:
+        session = get_session(session_id) or {}
+    key = session.get('lecture_material_key')
+    if not key:
+        return None
+    return get_lecture_material_presigned_url(session_id=session_id, key=key, expiration=86400)
+
+
 def lambda_handler(event, context):
     try:
         user = get_user_from_event(event)
@@ -40,7 +48,7 @@ def lambda_handler(event, context):
             body = event.get('body', {})
 
         qr_code_string = body.get('qr_code_data')
-        qr_data = validate_qr_code_data(qr_code_string)
+        qr_data = validate_qr_code_data(qr_code_string, revoked_epoch=get_revoked_epoch)
         if not qr_data:
             return {
                 'statusCode': 400,
@@ -50,41 +58,23 @@ def lambda_handler(event, context):
 
         session_id = qr_data['session_id']
         class_id = qr_data['class_id']
-        session = get_session(session_id)
-
-        if not session or not session.get('is_active', False):
-            return {
-                'statusCode': 400,
-                'headers': CORS_HEADERS,
-                'body': json.dumps({'error': 'session not found or inactive'})
-            }
-
-        # 🟢 STEP 1: Calculate material URL early so it's available for 409 and 200
-        lecture_material_url = None
-        lecture_material_key = session.get('lecture_material_key')
-        if lecture_material_key:
-            lecture_material_url = get_lecture_material_presigned_url(
-                session_id=session_id,
-                key=lecture_material_key,
-                expiration=86400
-            )
 
-        # If student scanned before, return the material URL with a 409
-        if check_attendance_exists(session_id, student_id):
-            class_data = get_class(class_id)
-            return {
-                'statusCode': 409,
-                'headers': CORS_HEADERS,
-                'body': json.dumps({
-                    'message': 'you have already marked attendance for this session',
-                    'class_name': class_data.get('class_name') if class_data else 'Class',
-                    'scan_timestamp': datetime.utcnow().isoformat(),
-                    'download_url': lecture_material_url
-                })
-            }
+        # signed tokens were already checked for signature, expiry and revocation
+        # (every deactivation revokes, see deactivate_session), so they skip the
+        # session read; legacy JSON codes still need it for the is_active check
+        session = None
+        if not qr_data.get('signed'):
+            session = get_session(session_id)
+            if not session or not session.get('is_active', False):
+                return {
+                    'statusCode': 400,
+                    'headers': CORS_HEADERS,
+                    'body': json.dumps({'error': 'session not found or inactive'})
+                }
 
-        # 🟢 STEP 3: Record new attendance
-        attendance_id = str(uuid.uuid4())
+        # 🟢 STEP 1: Record new attendance. The id is derived from session + student,
+        # so the conditional put itself rejects a repeat scan (no read beforehand)
+        attendance_id = attendance_id_for(session_id, student_id)
         scan_timestamp = datetime.utcnow().isoformat()
         attendance_data = {
             'attendance_id': attendance_id,
@@ -97,20 +87,33 @@ def lambda_handler(event, context):
         }
 
         result = create_attendance(attendance_data)
+
+        # If student scanned before, return the material URL with a 409
+        if result.get('statusCode') == 409:
+            class_data = get_class(class_id)
+            download_url = lecture_material_url(session_id, session)
+            return {
+                'statusCode': 409,
+                'headers': CORS_HEADERS,
+                'body': json.dumps({
+                    'message': 'you have already marked attendance for this session',
+                    'class_name': class_data.get('class_name') if class_data else 'Class',
+                    'scan_timestamp': scan_timestamp,
+                    'download_url': download_url
+                })
+            }
+
         if result.get('statusCode') != 200:
             return {'statusCode': 500, 'headers': CORS_HEADERS, 'body': json.dumps({'error': 'failed to record'})}
 
-        # Send SNS notification
-        send_attendance_notification(
-            student_id=student_id,
-            session_id=session_id,
-            class_id=class_id,
-            message_type='attendance_confirmed',
-            lecture_material_url=lecture_material_url,
-            lecture_material_key=lecture_material_key
-        )
+        # keep the session's denormalized counter in step; the nightly
+        # reconciliation job repairs it if this update is ever lost
+        increment_session_attendance(session_id, scan_timestamp)
 
+        # no SNS publish here: attendance-notifier sends the confirmation from
+        # the attendance table's stream, off the scan path
         class_data = get_class(class_id)
+        download_url = lecture_material_url(session_id, session)
         return {
             'statusCode': 200,
             'headers': CORS_HEADERS,
@@ -118,7 +121,7 @@ def lambda_handler(event, context):
                 'attendance_id': attendance_id,
                 'class_name': class_data.get('class_name') if class_data else None,
                 'scan_timestamp': scan_timestamp,
-                'download_url': lecture_material_url, # 🟢 Included on success
+                'download_url': download_url, # 🟢 Included on success
                 'message': 'attendance recorded successfully'
             })
         }
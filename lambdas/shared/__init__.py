@@ -1,4 +0,0 @@
-"""
-Shared utils for QR Class Manager Lambda functions
-"""
-
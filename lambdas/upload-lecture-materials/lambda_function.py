@@ -1,15 +1,16 @@
 import json
-import os
-import sys
-import base64
 from datetime import datetime
 
-# add shared directory to path
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'shared'))
-
-from dynamodb_utils import get_session, update_session, get_class
-from auth_utils import get_user_from_event, require_professor, get_user_id
-from s3_utils import upload_lecture_material, delete_lecture_material
+from shared.dynamodb_utils import get_session, update_session
+from shared.auth_utils import (
+    get_user_from_event, require_professor, get_user_id, assert_owns_class, ClassAccessError
+)
+from shared.json_utils import json_response
+from shared.s3_utils import (
+    upload_lecture_material_base64, delete_lecture_material, lecture_material_key,
+    create_presigned_multipart_upload, complete_multipart_upload, abort_multipart_upload,
+    is_zip_object, MAX_LECTURE_MATERIAL_BYTES
+)
 
 # Define Universal CORS Headers
 CORS_HEADERS = {
@@ -18,23 +19,160 @@ CORS_HEADERS = {
     'Access-Control-Allow-Headers': 'Content-Type,Authorization'
 }
 
+
+def response(status_code, body):
+    return json_response(status_code, body, CORS_HEADERS)
+
+
+def route_for(event):
+    """'inline' (POST /materials), 'start', 'complete' or 'abort' (/materials/uploads...)."""
+    resource = (event.get('resource') or event.get('path') or event.get('rawPath') or '').rstrip('/')
+    method = event.get('httpMethod') or event.get('requestContext', {}).get('http', {}).get('method', 'POST')
+    if resource.endswith('/uploads/complete'):
+        return 'complete'
+    if resource.endswith('/uploads'):
+        return 'abort' if method == 'DELETE' else 'start'
+    return 'inline'
+
+
+def record_lecture_material(session, s3_key):
+    """Point the session at its new material and remove the file it replaces."""
+    existing_key = session.get('lecture_material_key')
+    if existing_key and existing_key != s3_key:
+        delete_lecture_material(existing_key)
+
+    return update_session(session['session_id'], {
+        'lecture_material_key': s3_key,
+        'updated_at': datetime.utcnow().isoformat()
+    })
+
+
+def inline_upload(body, session):
+    file_content_b64 = body.get('file_content')
+    filename = body.get('filename', 'lecture_materials.zip')
+
+    if not file_content_b64:
+        return response(400, {'error': 'session_id and file_content are required'})
+
+    # base64 carries 3 bytes per 4 characters; reject oversized bodies before decoding
+    if len(file_content_b64) * 3 // 4 > MAX_LECTURE_MATERIAL_BYTES:
+        return response(400, {'error': f"file exceeds {MAX_LECTURE_MATERIAL_BYTES} byte limit"})
+
+    # Decode and upload in fixed-size chunks so memory does not grow with the file
+    try:
+        result = upload_lecture_material_base64(session['session_id'], file_content_b64, filename)
+    except ValueError:
+        return response(400, {'error': 'invalid base64 content'})
+
+    if not result:
+        return response(500, {'error': 'failed to upload lecture material to s3'})
+
+    # Update Session Table with the new key, then remove the file it replaces
+    s3_key = result['key']
+    record_lecture_material(session, s3_key)
+
+    return response(200, {
+        'session_id': session['session_id'],
+        'lecture_material_key': s3_key,
+        'file_size': result['size'],
+        'message': 'lecture material uploaded successfully'
+    })
+
+
+def start_upload(body, session):
+    """POST /materials/uploads: presigned part URLs for a direct-to-S3 multipart upload."""
+    try:
+        file_size = int(body.get('file_size'))
+    except (TypeError, ValueError):
+        return response(400, {'error': 'file_size is required'})
+
+    if file_size <= 0 or file_size > MAX_LECTURE_MATERIAL_BYTES:
+        return response(400, {'error': f"file_size must be between 1 and {MAX_LECTURE_MATERIAL_BYTES} bytes"})
+
+    s3_key = lecture_material_key(session['session_id'], body.get('filename', 'lecture_materials.zip'))
+    upload = create_presigned_multipart_upload(s3_key, file_size)
+    if not upload:
+        return response(500, {'error': 'failed to start upload'})
+
+    return response(200, {'session_id': session['session_id'], **upload})
+
+
+def complete_upload(body, session):
+    """POST /materials/uploads/complete: assemble the parts, verify the object and record it."""
+    upload_id = body.get('upload_id')
+    s3_key = body.get('key')
+    parts = body.get('parts')
+
+    if not upload_id or not s3_key or not parts:
+        return response(400, {'error': 'upload_id, key and parts are required'})
+
+    # the key must be one start_upload could have issued for this session:
+    # a fresh staging key, never the material the session currently serves
+    if not s3_key.startswith(f"lectures/{session['session_id']}/"):
+        return response(403, {'error': 'key does not belong to this session'})
+    if s3_key == session.get('lecture_material_key'):
+        return response(400, {'error': 'key is the current lecture material; start a new upload'})
+
+    result = complete_multipart_upload(s3_key, upload_id, parts)
+    if not result:
+        return response(400, {'error': 'failed to complete upload'})
+
+    # only the staging object is discarded; the session keeps its current material
+    if result['size'] > MAX_LECTURE_MATERIAL_BYTES or not is_zip_object(s3_key):
+        delete_lecture_material(s3_key)
+        return response(400, {'error': 'uploaded file is not a valid zip archive within the size limit'})
+
+    if not record_lecture_material(session, s3_key):
+        return response(500, {'error': 'failed to record lecture material'})
+
+    return response(200, {
+        'session_id': session['session_id'],
+        'lecture_material_key': s3_key,
+        'file_size': result['size'],
+        'message': 'lecture material uploaded successfully'
+    })
+
+
+def abort_upload(body, session):
+    """DELETE /materials/uploads: discard the parts of an unfinished upload."""
+    upload_id = body.get('upload_id')
+    s3_key = body.get('key')
+
+    if not upload_id or not s3_key:
+        return response(400, {'error': 'upload_id and key are required'})
+
+    if not s3_key.startswith(f"lectures/{session['session_id']}/"):
+        return response(403, {'error': 'key does not belong to this session'})
+
+    if not abort_multipart_upload(s3_key, upload_id):
+        return response(500, {'error': 'failed to abort upload'})
+
+    return response(200, {'message': 'upload aborted'})
+
+
+HANDLERS = {
+    'inline': inline_upload,
+    'start': start_upload,
+    'complete': complete_upload,
+    'abort': abort_upload,
+}
+
+
 def lambda_handler(event, context):
+    """
+    - POST /materials: Upload a base64-encoded ZIP inline (streamed to S3 in parts)
+    - POST /materials/uploads: Start a direct-to-S3 multipart upload (presigned part URLs)
+    - POST /materials/uploads/complete: Complete the upload and attach it to the session
+    - DELETE /materials/uploads: Abort an unfinished upload
+    """
     try:
         user = get_user_from_event(event)
         if not user:
-            return {
-                'statusCode': 401,
-                'headers': CORS_HEADERS,
-                'body': json.dumps({'error': 'Unauthorized'})
-            }
+            return response(401, {'error': 'Unauthorized'})
 
         # Verify Professor Role
         if not require_professor(user):
-            return {
-                'statusCode': 403,
-                'headers': CORS_HEADERS,
-                'body': json.dumps({'error': 'Only professors can upload lecture materials'})
-            }
+            return response(403, {'error': 'Only professors can upload lecture materials'})
 
         professor_id = get_user_id(user)
 
@@ -45,87 +183,26 @@ def lambda_handler(event, context):
         elif event.get('body'):
             body = event['body']
 
+        route = route_for(event)
         session_id = body.get('session_id')
-        file_content_b64 = body.get('file_content')
-        filename = body.get('filename', 'lecture_materials.zip')
 
-        if not session_id or not file_content_b64:
-            return {
-                'statusCode': 400,
-                'headers': CORS_HEADERS,
-                'body': json.dumps({'error': 'session_id and file_content are required'})
-            }
+        if not session_id:
+            if route == 'inline':
+                return response(400, {'error': 'session_id and file_content are required'})
+            return response(400, {'error': 'session_id is required'})
 
         # Existence and Ownership Checks
         session = get_session(session_id)
         if not session:
-            return {
-                'statusCode': 404,
-                'headers': CORS_HEADERS,
-                'body': json.dumps({'error': 'session not found'})
-            }
-
-        class_data = get_class(session['class_id'])
-        if not class_data or class_data.get('professor_id') != professor_id:
-            return {
-                'statusCode': 403,
-                'headers': CORS_HEADERS,
-                'body': json.dumps({'error': 'you do not own this class'})
-            }
-
-        # Decoding base64 to binary for S3 upload
-        try:
-            file_content = base64.b64decode(file_content_b64)
-        except Exception as e:
-            return {
-                'statusCode': 400,
-                'headers': CORS_HEADERS,
-                'body': json.dumps({'error': 'invalid base64 content'})
-            }
-
-        # Size constraint check (50MB)
-        if len(file_content) > 50 * 1024 * 1024:
-            return {
-                'statusCode': 400,
-                'headers': CORS_HEADERS,
-                'body': json.dumps({'error': 'file exceeds 50MB limit'})
-            }
-
-        # Cleanup existing file
-        existing_key = session.get('lecture_material_key')
-        if existing_key:
-            delete_lecture_material(existing_key)
-
-        # Upload binary to S3
-        s3_key = upload_lecture_material(session_id, file_content, filename)
-
-        if not s3_key:
-            return {
-                'statusCode': 500,
-                'headers': CORS_HEADERS,
-                'body': json.dumps({'error': 'failed to upload lecture material to s3'})
-            }
-
-        # Update Session Table with the new key
-        update_session(session_id, {
-            'lecture_material_key': s3_key,
-            'updated_at': datetime.utcnow().isoformat()
-        })
-
-        return {
-            'statusCode': 200,
-            'headers': CORS_HEADERS,
-            'body': json.dumps({
-                'session_id': session_id,
-                'lecture_material_key': s3_key,
-                'message': 'lecture material uploaded successfully'
-            })
-        }
+            return response(404, {'error': 'session not found'})
+
+        assert_owns_class(professor_id, session['class_id'], user)
+
+        session = {**session, 'session_id': session_id}
+        return HANDLERS[route](body, session)
 
+    except ClassAccessError as e:
+        return response(e.status_code, {'error': e.message})
     except Exception as e:
         print(f"Error: {str(e)}")
-        return {
-            'statusCode': 500,
-            'headers': CORS_HEADERS,
-            'body': json.dumps({'error': 'internal server error', 'message': str(e)})
-        }
\ No newline at end of file
+        return response(500, {'error': 'internal server error', 'message': str(e)})